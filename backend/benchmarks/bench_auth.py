@@ -0,0 +1,79 @@
+"""
+Benchmark: token backends, PyJWT vs. the built-in src.hs256.
+
+Measures import time (fresh interpreter per sample) and the per-call cost
+of encode and of an uncached decode. Warm requests usually hit
+auth.token_cache instead, so decode cost matters on cold containers and
+for new tokens.
+
+Run from backend/:
+    python -m benchmarks.bench_auth [--calls N] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import jwt
+
+from src import hs256
+from src.auth import JWT_SECRET
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_ms(module: str, repeat: int) -> float:
+    code = f'import time; start = time.perf_counter(); import {module}; print((time.perf_counter() - start) * 1000)'
+    samples = [
+        float(subprocess.run(
+            [sys.executable, '-c', code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout)
+        for _ in range(repeat)
+    ]
+    return statistics.median(samples)
+
+
+def per_call_us(fn, calls: int, repeat: int) -> float:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter() - start) / calls * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    payload = {'sub': 'admin', 'exp': now + 3600, 'iat': now}
+    token = hs256.encode(payload, JWT_SECRET)
+    assert token == jwt.encode(payload, JWT_SECRET, algorithm='HS256')
+
+    backends = [
+        ('PyJWT', 'jwt',
+         lambda: jwt.encode(payload, JWT_SECRET, algorithm='HS256'),
+         lambda: jwt.decode(token, JWT_SECRET, algorithms=['HS256'])),
+        ('src.hs256', 'src.hs256',
+         lambda: hs256.encode(payload, JWT_SECRET),
+         lambda: hs256.decode(token, JWT_SECRET, algorithms=['HS256'])),
+    ]
+
+    print(f"{'backend':<12} {'import ms':>10} {'encode us':>10} {'decode us':>10}")
+    for label, module, encode, decode in backends:
+        print(
+            f'{label:<12} {import_ms(module, args.repeat):>10.1f} '
+            f'{per_call_us(encode, args.calls, args.repeat):>10.1f} '
+            f'{per_call_us(decode, args.calls, args.repeat):>10.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: response compression CPU cost vs. bytes saved.
+
+For typical payloads (product lists and customer order histories of
+several sizes) reports the JSON size, the size actually sent (compressed
+and base64 encoded, as API Gateway requires) and the time spent
+compressing, for gzip at a few levels and brotli when it is installed.
+
+Run from backend/:
+    python -m benchmarks.bench_compression [--repeat N]
+"""
+import argparse
+import base64
+import gzip
+from decimal import Decimal
+
+from benchmarks.bench_response import make_products, time_it
+from src.utils.response import brotli, encode_json
+
+
+def make_orders(count: int):
+    """Orders shaped like get_customer_orders output, three lines each"""
+    return [
+        {
+            'id': f'01HN{i:022d}',
+            'orderDate': f'2024-01-{i % 28 + 1:02d}T10:{i % 60:02d}:00+00:00',
+            'totalAmount': Decimal('123.45') + i,
+            'paidNow': Decimal('50'),
+            'debtChange': Decimal('73.45') + i,
+            'items': [
+                {
+                    'productId': f'{i * 3 + line:08d}-0000-4000-8000-000000000000',
+                    'productName': f'Product {i * 3 + line}',
+                    'quantity': Decimal(line + 1),
+                    'unitPrice': Decimal('12.50'),
+                    'lineTotal': Decimal('12.50') * (line + 1)
+                }
+                for line in range(3)
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = [
+        ('products x50', {'items': make_products(50), 'nextToken': None}),
+        ('products x500', {'items': make_products(500), 'nextToken': None}),
+        ('products x5000', {'items': make_products(5000), 'nextToken': None}),
+        ('orders x50', {'items': make_orders(50), 'nextToken': None}),
+        ('orders x500', {'items': make_orders(500), 'nextToken': None}),
+    ]
+
+    codecs = [(f'gzip-{level}', lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0))
+              for level in (1, 5, 6, 9)]
+    if brotli is not None:
+        codecs += [(f'br-{quality}', lambda data, quality=quality: brotli.compress(data, quality=quality))
+                   for quality in (1, 4, 6)]
+    else:
+        print('(brotli not installed; gzip only)')
+
+    print(f"{'payload':<16} {'codec':<8} {'json KB':>8} {'sent KB':>8} {'saved':>7} {'ms':>8}")
+    for label, body in payloads:
+        data = encode_json(body).encode('utf-8')
+        for codec, compress in codecs:
+            sent = len(base64.b64encode(compress(data)))
+            ms = time_it(lambda: compress(data), args.repeat)
+            print(
+                f'{label:<16} {codec:<8} {len(data) / 1024:>8.1f} {sent / 1024:>8.1f} '
+                f'{1 - sent / len(data):>6.0%} {ms:>8.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
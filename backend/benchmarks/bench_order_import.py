@@ -0,0 +1,134 @@
+"""
+Benchmark: creating a batch of orders one POST /orders at a time vs.
+order_import.import_orders.
+
+Runs against moto with a fixed delay added to every DynamoDB call, standing
+in for the round trip from Lambda. moto's backend is not thread-safe, so
+calls are processed one at a time after their delay; the delays of
+concurrent calls overlap as they would against DynamoDB. moto's own
+processing time grows with the table (each transaction copies it), which
+says nothing about DynamoDB, so it is measured and left out of the
+reported time.
+
+Run from backend/:
+    python -m benchmarks.bench_order_import [--orders N] [--customers N] [--latency-ms N]
+"""
+import argparse
+import os
+import random
+import threading
+import time
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'eu-central-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('CATALOG_CACHE_TTL_SECONDS', '0')
+
+from moto import mock_aws
+
+from src.db import dynamo_client
+from src.db.customer_repo import create_customer
+from src.db.product_repo import create_product
+from src.db.order_repo import create_order
+from src.db.order_import import import_orders
+
+
+def create_table():
+    dynamo_client.reset()
+    dynamodb = dynamo_client.get_dynamodb()
+    dynamo_client.table = dynamodb.create_table(
+        TableName=os.environ.get('DYNAMODB_TABLE_NAME', 'distribution-app-dev'),
+        KeySchema=[
+            {'AttributeName': 'pk', 'KeyType': 'HASH'},
+            {'AttributeName': 'sk', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'pk', 'AttributeType': 'S'},
+            {'AttributeName': 'sk', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+class Latency:
+    """Delays every call on the shared client and counts calls and moto time"""
+
+    def __init__(self, latency_ms: float):
+        self.calls = 0
+        self.moto_seconds = 0.0
+        client = dynamo_client.get_client()
+        real_call = client._make_api_call
+        lock = threading.Lock()
+
+        def delayed_call(operation_name, params):
+            time.sleep(latency_ms / 1000)
+            with lock:
+                start = time.perf_counter()
+                try:
+                    return real_call(operation_name, params)
+                finally:
+                    self.calls += 1
+                    self.moto_seconds += time.perf_counter() - start
+
+        client._make_api_call = delayed_call
+
+
+def make_orders(count: int, customer_ids, product_ids, seed: int):
+    rng = random.Random(seed)
+    return [
+        {
+            'customerId': rng.choice(customer_ids),
+            'items': [
+                {'productId': product_id, 'quantity': rng.randint(1, 10)}
+                for product_id in rng.sample(product_ids, rng.randint(1, 4))
+            ],
+            'paidNow': rng.choice([0, 5, 10])
+        }
+        for _ in range(count)
+    ]
+
+
+def run(orders, customer_count, product_count, latency_ms, seed):
+    """Time both ways of creating the orders on fresh tables; returns (seconds, calls) per way"""
+    timings = {}
+    for name in ('one by one', 'import'):
+        with mock_aws():
+            create_table()
+            customer_ids = [create_customer(f'Customer {i}', 'Location', '123')['id'] for i in range(customer_count)]
+            product_ids = [create_product(f'Product {i}', 1.0, 2.0)['id'] for i in range(product_count)]
+            bodies = make_orders(orders, customer_ids, product_ids, seed)
+            latency = Latency(latency_ms)
+
+            start = time.perf_counter()
+            if name == 'import':
+                report = import_orders([
+                    {'row': row, 'ref': None, 'body': body, 'error': None}
+                    for row, body in enumerate(bodies, start=1)
+                ])
+                assert report['summary']['created'] == orders, report['summary']
+            else:
+                for body in bodies:
+                    create_order(body['customerId'], None, body['items'], paid_now=body['paidNow'])
+            timings[name] = (time.perf_counter() - start - latency.moto_seconds, latency.calls)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--customers', type=int, default=20)
+    parser.add_argument('--products', type=int, default=40)
+    parser.add_argument('--latency-ms', type=float, default=10, help='added to every DynamoDB call')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    timings = run(args.orders, args.customers, args.products, args.latency_ms, args.seed)
+
+    print(f'{args.orders} orders, {args.customers} customers, {args.latency_ms:.0f} ms per call\n')
+    print(f'{"method":12} {"calls":>7} {"seconds":>9} {"orders/s":>10}')
+    for name, (seconds, calls) in timings.items():
+        print(f'{name:12} {calls:7d} {seconds:9.2f} {args.orders / seconds:10.0f}')
+
+
+if __name__ == '__main__':
+    main()
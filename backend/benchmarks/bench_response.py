@@ -0,0 +1,79 @@
+"""
+Benchmark: response body encoding for a 5,000-product list.
+
+Compares the previous encoder (json.dumps with a Python default callback)
+against utils.response.encode_json in both Decimal modes.
+
+Run from backend/:
+    python -m benchmarks.bench_response [--products N] [--repeat N]
+"""
+import argparse
+import json
+import statistics
+import time
+from decimal import Decimal
+
+from src.utils.response import decimal_default, encode_json
+
+
+def make_products(count: int):
+    """Products shaped like get_products output (DynamoDB Decimals plus computed floats)"""
+    return [
+        {
+            'pk': f'PRODUCT#{i:08d}',
+            'sk': 'META',
+            'entityType': 'PRODUCT',
+            'id': f'{i:08d}-0000-4000-8000-000000000000',
+            'name': f'Product {i}',
+            'baseBuyingPrice': Decimal('10.50') + i % 7,
+            'baseSellingPrice': Decimal('15.25') + i % 11,
+            'discountPercent': Decimal(i % 4 * 5),
+            'imageKey': None,
+            'isActive': True,
+            'createdAt': '2024-01-15T10:00:00+00:00',
+            'updatedAt': '2024-01-15T10:00:00+00:00',
+            'effectiveBuyingPrice': 9.975,
+            'effectiveSellingPrice': 14.4875
+        }
+        for i in range(count)
+    ]
+
+
+def time_it(fn, repeat: int):
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    body = {'items': make_products(args.products), 'nextToken': None}
+
+    # Sanity check: the number mode decodes to the same values as before
+    assert json.loads(encode_json(body)) == json.loads(json.dumps(body, default=decimal_default))
+
+    candidates = [
+        ('json.dumps + decimal_default (previous)', lambda: json.dumps(body, default=decimal_default)),
+        ("encode_json, decimal_encoding='number'", lambda: encode_json(body, 'number')),
+        ("encode_json, decimal_encoding='string'", lambda: encode_json(body, 'string')),
+    ]
+
+    baseline = None
+    print(f'{args.products} products, median of {args.repeat} runs')
+    print(f"{'encoder':<42} {'ms':>8} {'bytes':>10} {'speedup':>8}")
+    for label, fn in candidates:
+        ms = time_it(fn, args.repeat)
+        baseline = baseline or ms
+        print(f'{label:<42} {ms:>8.2f} {len(fn()):>10} {baseline / ms:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark: cold starts and latency, one function per route vs. src.router.
+
+Replays a traffic mix through a discrete-event model of Lambda containers:
+a container serves one request at a time, stays warm for --keep-alive
+seconds after its last request, and a request that finds no idle warm
+container starts a new one. A cold start costs the runtime init plus the
+import time of the code the container loads; with the router, a handler's
+import cost is paid the first time a container serves that route.
+
+Import times are measured here, each in a fresh interpreter, so they
+reflect this machine; the runtime init and warm service times are inputs.
+
+Traffic is either generated (Poisson arrivals, --rps, --hours, with the
+route weights below) or replayed from a file with one "<epoch seconds>
+<route key>" line per request, e.g. extracted from API Gateway access logs.
+
+Run from backend/:
+    python -m benchmarks.bench_router [--rps N] [--hours N] [--replay FILE]
+"""
+import argparse
+import heapq
+import os
+import random
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from src.router import ROUTES
+
+# Share of requests per route in a typical working day
+ROUTE_WEIGHTS = {
+    'GET /products': 30,
+    'GET /customers': 20,
+    'GET /customers/{id}': 15,
+    'POST /orders': 15,
+    'GET /customers/{id}/orders': 8,
+    'GET /products/{id}': 4,
+    'POST /login': 3,
+    'PATCH /products/{id}': 2,
+    'POST /customers/{id}/adjust-debt': 1.5,
+    'POST /customers': 1,
+    'POST /products': 0.5,
+}
+
+# Warm handler time in ms (mostly DynamoDB round trips)
+SERVICE_MS = {
+    'GET /products': 45,
+    'GET /customers': 40,
+    'GET /customers/{id}': 35,
+    'POST /orders': 60,
+    'GET /customers/{id}/orders': 30,
+    'GET /products/{id}': 12,
+    'POST /login': 15,
+    'PATCH /products/{id}': 35,
+    'POST /customers/{id}/adjust-debt': 25,
+    'POST /customers': 30,
+    'POST /products': 30,
+}
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import_ms(module: str, repeat: int) -> float:
+    """Median wall time to import a module in a fresh interpreter"""
+    code = (
+        'import time; start = time.perf_counter(); '
+        f'import {module}; '
+        'print((time.perf_counter() - start) * 1000)'
+    )
+    env = dict(os.environ, AWS_DEFAULT_REGION='eu-central-1')
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(float(result.stdout.strip()))
+    return statistics.median(samples)
+
+
+def generate_traffic(rps: float, hours: float, seed: int) -> List[Tuple[float, str]]:
+    rng = random.Random(seed)
+    routes = list(ROUTE_WEIGHTS)
+    weights = [ROUTE_WEIGHTS[route] for route in routes]
+    events = []
+    now = 0.0
+    end = hours * 3600
+    while True:
+        now += rng.expovariate(rps)
+        if now >= end:
+            return events
+        events.append((now, rng.choices(routes, weights)[0]))
+
+
+def load_traffic(path: str) -> List[Tuple[float, str]]:
+    events = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                timestamp, route_key = line.split(None, 1)
+                events.append((float(timestamp), route_key.strip()))
+    events.sort()
+    start = events[0][0] if events else 0.0
+    return [(timestamp - start, route_key) for timestamp, route_key in events]
+
+
+def simulate(
+    traffic: List[Tuple[float, str]],
+    function_of: Dict[str, str],
+    cold_ms: Dict[str, float],
+    lazy_ms: Dict[str, float],
+    keep_alive: float
+) -> Tuple[int, List[float]]:
+    """
+    Run the traffic through the container model.
+
+    Args:
+        function_of: route key -> function serving it
+        cold_ms: function -> cold start cost before any handler is loaded
+        lazy_ms: route key -> extra cost the first time a container serves it
+        keep_alive: seconds an idle container stays warm
+
+    Returns:
+        (cold start count, per-request latencies in ms)
+    """
+    # Per function: heap of (free_at, container id) and loaded routes per container
+    idle: Dict[str, List[Tuple[float, int]]] = {function: [] for function in set(function_of.values())}
+    loaded: Dict[int, set] = {}
+    cold_starts = 0
+    latencies = []
+
+    for arrival, route_key in traffic:
+        function = function_of[route_key]
+        pool = idle[function]
+        # Containers idle for longer than keep_alive have been reclaimed
+        while pool and pool[0][0] + keep_alive < arrival:
+            _, container = heapq.heappop(pool)
+            loaded.pop(container, None)
+
+        # The earliest free container is reused if it is free by now
+        if pool and pool[0][0] <= arrival:
+            _, container = heapq.heappop(pool)
+            latency = 0.0
+        else:
+            container = cold_starts
+            loaded[container] = set()
+            cold_starts += 1
+            latency = cold_ms[function]
+
+        if route_key not in loaded[container]:
+            loaded[container].add(route_key)
+            latency += lazy_ms.get(route_key, 0.0)
+        latency += SERVICE_MS.get(route_key, 30)
+
+        heapq.heappush(pool, (arrival + latency / 1000, container))
+        latencies.append(latency)
+
+    return cold_starts, latencies
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rps', type=float, default=0.5, help='mean requests per second (generated traffic)')
+    parser.add_argument('--hours', type=float, default=8)
+    parser.add_argument('--replay', help='file of "<epoch seconds> <route key>" lines')
+    parser.add_argument('--keep-alive', type=float, default=600, help='seconds an idle container stays warm')
+    parser.add_argument('--runtime-init-ms', type=float, default=250, help='sandbox and interpreter start')
+    parser.add_argument('--import-repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    traffic = load_traffic(args.replay) if args.replay else generate_traffic(args.rps, args.hours, args.seed)
+    if not traffic:
+        parser.error('no requests to replay')
+
+    print('Measuring import times...')
+    import_ms = {
+        module: measure_import_ms(f'src.handlers.{module}', args.import_repeat)
+        for module in sorted(set(ROUTES.values()))
+    }
+    router_ms = measure_import_ms('src.router', args.import_repeat)
+    for module, ms in import_ms.items():
+        print(f'  {module:24} {ms:7.1f} ms')
+    print(f'  {"router":24} {router_ms:7.1f} ms')
+
+    # Handlers share most of their imports (boto3, the repositories), so a
+    # router container pays the cheapest handler's imports once and each
+    # handler's excess over it the first time the container serves it
+    base_ms = min(import_ms.values())
+    per_route = simulate(
+        traffic,
+        function_of={route_key: module for route_key, module in ROUTES.items()},
+        cold_ms={module: args.runtime_init_ms + ms for module, ms in import_ms.items()},
+        lazy_ms={},
+        keep_alive=args.keep_alive
+    )
+    router = simulate(
+        traffic,
+        function_of={route_key: 'router' for route_key in ROUTES},
+        cold_ms={'router': args.runtime_init_ms + router_ms + base_ms},
+        lazy_ms={route_key: import_ms[module] - base_ms for route_key, module in ROUTES.items()},
+        keep_alive=args.keep_alive
+    )
+
+    print(f'\n{len(traffic)} requests, keep-alive {args.keep_alive:.0f}s\n')
+    print(f'{"layout":12} {"cold starts":>12} {"cold %":>8} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+    for name, (cold_starts, latencies) in (('per-route', per_route), ('router', router)):
+        print(
+            f'{name:12} {cold_starts:12d} {100 * cold_starts / len(latencies):7.2f}% '
+            f'{percentile(latencies, 50):8.1f} {percentile(latencies, 99):8.1f} {max(latencies):8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
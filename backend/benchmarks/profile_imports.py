@@ -0,0 +1,111 @@
+"""
+Cold-start import profile for every Lambda entry point.
+
+Each handler module (and src.router) is imported in a fresh interpreter
+with `python -X importtime`, once with LAZY_IMPORTS=0 and once with
+LAZY_IMPORTS=1. The report shows the init time per entry point in both
+modes and which top-level packages account for it, so a change that pulls
+a heavy dependency into init shows up as a new row or a larger number.
+
+Run from backend/:
+    python -m benchmarks.profile_imports [--repeat N] [--top N] [--budget-ms MS]
+
+With --budget-ms the exit status is 1 when any entry point's lazy-mode
+init time exceeds the budget, so the script can gate CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from src.router import ROUTES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def entry_points() -> List[str]:
+    return [f'src.handlers.{module}' for module in sorted(set(ROUTES.values()))] + ['src.router']
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        (module, self_us, cumulative_us) per imported module, in import order
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        timings, module = line[len('import time:'):].rsplit('|', 1)
+        self_us, cumulative_us = (int(value) for value in timings.split('|'))
+        rows.append((module.strip(), self_us, cumulative_us))
+    return rows
+
+
+def profile(module: str, lazy: bool) -> Tuple[int, Dict[str, int]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        (cumulative import time in us, self time in us per top-level package)
+    """
+    env = dict(os.environ, LAZY_IMPORTS='1' if lazy else '0', AWS_DEFAULT_REGION='eu-central-1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'importing {module} failed:\n{result.stderr[-2000:]}')
+
+    rows = parse_importtime(result.stderr)
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        package = name.split('.')[0]
+        if package == 'src':
+            package = '.'.join(name.split('.')[:2])
+        by_package[package] += self_us
+    total = next(cumulative for name, _, cumulative in reversed(rows) if name == module)
+    return total, dict(by_package)
+
+
+def profile_median(module: str, lazy: bool, repeat: int) -> Tuple[float, Dict[str, int]]:
+    runs = [profile(module, lazy) for _ in range(repeat)]
+    total_ms = statistics.median(total for total, _ in runs) / 1000
+    # Package breakdown from the run closest to the median
+    _, packages = min(runs, key=lambda run: abs(run[0] / 1000 - total_ms))
+    return total_ms, packages
+
+
+def format_packages(packages: Dict[str, int], top: int) -> str:
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return ', '.join(f'{name} {us / 1000:.0f}' for name, us in heaviest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters per entry point and mode')
+    parser.add_argument('--top', type=int, default=4, help='packages listed per entry point')
+    parser.add_argument('--budget-ms', type=float, help='fail when a lazy-mode init exceeds this')
+    args = parser.parse_args()
+
+    print(f'{"entry point":34} {"eager ms":>9} {"lazy ms":>8}  heaviest packages, lazy mode (self ms)')
+    over_budget = []
+    for module in entry_points():
+        eager_ms, _ = profile_median(module, lazy=False, repeat=args.repeat)
+        lazy_ms, packages = profile_median(module, lazy=True, repeat=args.repeat)
+        print(f'{module:34} {eager_ms:9.1f} {lazy_ms:8.1f}  {format_packages(packages, args.top)}')
+        if args.budget_ms is not None and lazy_ms > args.budget_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f'\nOver the {args.budget_ms:.0f} ms budget: {", ".join(over_budget)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
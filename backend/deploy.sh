@@ -1,9 +1,19 @@
 #!/bin/bash
 # Script to package Lambda functions for deployment
+#
+#   ./deploy.sh          package every function into deploy/
+#   ./deploy.sh migrate  after terraform apply: backfill the listing and
+#                        search indexes for items from older releases
 
 set -e
 
 cd "$(dirname "$0")"
+
+if [ "$1" == "migrate" ]; then
+  python3 -m scripts.migrate
+  exit 0
+fi
+
 mkdir -p deploy
 
 # Install dependencies (use pip3 if pip is not available)
@@ -24,13 +34,20 @@ LAMBDA_FUNCTIONS=(
   "get_products"
   "get_product"
   "update_product"
+  "bulk_update_products"
   "create_customer"
   "get_customers"
   "get_customer_detail"
   "create_order"
   "get_customer_orders"
+  "get_customer_ledger"
   "adjust_customer_debt"
+  "import_orders"
+  "get_sales_report"
+  "create_export"
+  "sales_rollup_stream"
   "login"
+  "router"
 )
 
 for func in "${LAMBDA_FUNCTIONS[@]}"; do
@@ -48,4 +65,5 @@ for func in "${LAMBDA_FUNCTIONS[@]}"; do
 done
 
 echo "All Lambda functions packaged successfully!"
+echo "After terraform apply, run ./deploy.sh migrate"
 
@@ -0,0 +1,41 @@
+"""
+Bring items written by older releases up to date with the current indexes.
+
+Default product/customer listings query ActiveEntityIndex and name search
+reads SEARCH# items, so products and customers created before those
+existed are invisible until they are backfilled. Every step only adds what
+is missing, so this is safe to run after each deploy (./deploy.sh migrate
+runs it once `terraform apply` has created the indexes).
+
+Uses the same environment as the Lambdas (DYNAMODB_TABLE_NAME,
+DYNAMODB_ENDPOINT_URL for DynamoDB Local, AWS credentials and region).
+
+Run from backend/:
+    python -m scripts.migrate
+"""
+import json
+from typing import Callable, Dict, List, Tuple
+
+from src.db.product_repo import backfill_active_products, rebuild_product_search_index
+from src.db.customer_repo import backfill_active_customers, rebuild_customer_search_index
+
+# (name, step) in the order they run; each returns how many items it touched
+MIGRATIONS: List[Tuple[str, Callable[[], int]]] = [
+    ('activeProducts', backfill_active_products),
+    ('activeCustomers', backfill_active_customers),
+    ('productSearchIndex', rebuild_product_search_index),
+    ('customerSearchIndex', rebuild_customer_search_index),
+]
+
+
+def run() -> Dict[str, int]:
+    """Run every migration step; returns the count of each"""
+    return {name: step() for name, step in MIGRATIONS}
+
+
+def main():
+    print(json.dumps(run(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
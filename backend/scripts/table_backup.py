@@ -0,0 +1,55 @@
+"""
+Export the app table to gzipped JSONL shards, or restore it from them.
+
+Uses the same environment as the Lambdas (DYNAMODB_TABLE_NAME,
+DYNAMODB_ENDPOINT_URL for DynamoDB Local, AWS credentials and region).
+An interrupted export resumes when run again with the same directory and
+--segments. See src/db/table_backup.py for the file layout.
+
+Run from backend/:
+    python -m scripts.table_backup export DIR [--segments N] [--workers N]
+    python -m scripts.table_backup restore DIR [--workers N] [--only TYPE ...] [--exclude TYPE ...]
+"""
+import argparse
+import json
+import time
+
+from src.db import table_backup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='scan the table into DIR')
+    export.add_argument('directory')
+    export.add_argument('--segments', type=int, default=table_backup.DEFAULT_TOTAL_SEGMENTS)
+    export.add_argument('--workers', type=int, default=table_backup.DEFAULT_WORKERS)
+    export.add_argument('--table', help='table name (default: DYNAMODB_TABLE_NAME)')
+    export.add_argument('--page-size', type=int, help='items per Scan request (default: 1 MB pages)')
+
+    restore = commands.add_parser('restore', help='write the items of the export in DIR')
+    restore.add_argument('directory')
+    restore.add_argument('--workers', type=int, default=table_backup.DEFAULT_WORKERS)
+    restore.add_argument('--table', help='table name (default: DYNAMODB_TABLE_NAME)')
+    restore.add_argument('--only', nargs='+', metavar='TYPE', help='entity types to restore')
+    restore.add_argument('--exclude', nargs='+', metavar='TYPE', default=[], help='entity types to skip')
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.command == 'export':
+        manifest = table_backup.export_table(
+            args.directory, args.segments, args.workers, table_name=args.table, page_size=args.page_size
+        )
+        counts = {name: entry['items'] for name, entry in manifest['entityTypes'].items()}
+    else:
+        counts = table_backup.restore_table(
+            args.directory, args.workers, table_name=args.table, entity_types=args.only, exclude_types=args.exclude
+        )
+
+    print(json.dumps(counts, indent=2, sort_keys=True))
+    print(f'{sum(counts.values())} items in {time.perf_counter() - start:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -18,23 +18,100 @@ src_path = os.path.join(task_root, 'src')
 if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
-# Now import jwt - it should be at src/jwt/ which is now in path as jwt/
-import jwt
 import time
+import hashlib
+from collections import OrderedDict
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
+from src import hs256
+from src.utils.lazy_import import lazy_module
+
+# Token backend: 'builtin' (src.hs256, standard library only) or 'pyjwt'.
+# Both produce identical tokens and accept each other's.
+JWT_BACKEND = os.environ.get('JWT_BACKEND', 'builtin')
+
+if JWT_BACKEND == 'pyjwt':
+    # Now import jwt - it should be at src/jwt/ which is now in path as jwt/
+    # (deferred to the first token operation unless LAZY_IMPORTS=0)
+    jwt = lazy_module('jwt')
+else:
+    jwt = hs256
 
 # TODO: Move this to SSM Parameter Store or AWS Secrets Manager for production
 JWT_SECRET = "CHANGE_ME_TO_A_LONG_RANDOM_SECRET_AT_LEAST_32_CHARACTERS_LONG_FOR_HS256"
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 12
 
+# Verified tokens remembered per warm container
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', '256'))
+
 
 class AuthenticationError(Exception):
     """Raised when authentication fails"""
     pass
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of token digests to decoded payloads.
+    
+    A token is reused for up to JWT_EXPIRATION_HOURS, so repeat requests on a
+    warm container can skip signature verification. Entries expire at the
+    token's own exp claim; only digests are kept, never the tokens.
+    """
+    
+    def __init__(self, max_size: int, clock=time.time):
+        self.max_size = max_size
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+    
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached payload, or None on a miss"""
+        if self.max_size <= 0:
+            return None
+        digest = self._digest(token)
+        payload = self._entries.get(digest)
+        if payload is None or payload['exp'] <= self.clock():
+            if payload is not None:
+                del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return dict(payload)
+    
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        """Remember a verified payload, evicting the least recently used"""
+        if self.max_size <= 0 or 'exp' not in payload:
+            return
+        digest = self._digest(token)
+        self._entries[digest] = dict(payload)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxSize': self.max_size
+        }
+
+
+token_cache = VerifiedTokenCache(TOKEN_CACHE_MAX_SIZE)
+
+
 def generate_token(user_identifier: str, expiration_hours: Optional[int] = None) -> str:
     """
     Generate a JWT token for a user.
@@ -75,8 +152,13 @@ def verify_token(token: str) -> Dict[str, Any]:
     Raises:
         AuthenticationError: If token is invalid or expired
     """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        token_cache.put(token, payload)
         return payload
     except jwt.ExpiredSignatureError:
         raise AuthenticationError("Token has expired")
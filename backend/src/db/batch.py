@@ -0,0 +1,39 @@
+import time
+from typing import Any, Dict, List
+from .dynamo_client import get_table, get_dynamodb
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_CHUNK_SIZE = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+
+
+def batch_get(keys: List[Dict[str, Any]], **read_params: Any) -> List[Dict[str, Any]]:
+    """
+    Fetch many items from the app table with BatchGetItem.
+    
+    Keys are sent in chunks of BATCH_GET_CHUNK_SIZE and unprocessed keys are
+    retried with exponential backoff. Missing items are simply absent from
+    the result, whose order is not guaranteed. read_params (such as
+    ProjectionExpression and ExpressionAttributeNames) apply to every chunk.
+    """
+    table_name = get_table().name
+    dynamodb = get_dynamodb()
+    items = []
+    
+    for start in range(0, len(keys), BATCH_GET_CHUNK_SIZE):
+        request_items = {
+            table_name: {'Keys': keys[start:start + BATCH_GET_CHUNK_SIZE], **read_params}
+        }
+        
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            items.extend(response.get('Responses', {}).get(table_name, []))
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+            if attempt == BATCH_GET_MAX_ATTEMPTS - 1:
+                raise RuntimeError('BatchGetItem left unprocessed keys after retries')
+            time.sleep(0.05 * (2 ** attempt))
+    
+    return items
@@ -0,0 +1,137 @@
+"""
+In-process product catalog cache for warm Lambda containers.
+
+Products change a few times a day, so reads are served from memory and
+validated cheaply: every check_interval_seconds the catalog version item
+(bumped by every product write) is read, and the cache is dropped when it
+moved. Independently of the version, nothing is served once it is older
+than ttl_seconds, which bounds staleness even for out-of-band edits.
+"""
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class CatalogCache:
+    """Product cache with TTL, version validation and hit/miss counters"""
+
+    def __init__(
+        self,
+        read_version: Callable[[], int],
+        ttl_seconds: float,
+        check_interval_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.read_version = read_version
+        self.ttl_seconds = ttl_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.version_checks = 0
+        self.invalidations = 0
+        self._reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _reset(self) -> None:
+        self._products: Dict[str, Dict[str, Any]] = {}
+        self._snapshot: Optional[List[Dict[str, Any]]] = None
+        self._version: Optional[int] = None
+        self._started_at: Optional[float] = None
+        self._checked_at: Optional[float] = None
+
+    def _validate(self) -> None:
+        """Drop expired or outdated data, then make sure a version is pinned"""
+        now = self.clock()
+        if self._started_at is not None:
+            if now - self._started_at >= self.ttl_seconds:
+                self.invalidate()
+            elif now - self._checked_at >= self.check_interval_seconds:
+                self.version_checks += 1
+                self._checked_at = now
+                if self.read_version() != self._version:
+                    self.invalidate()
+
+        if self._started_at is None:
+            # Pin the version before loading data so a concurrent write is
+            # caught by the next check rather than cached as current
+            self._version = self.read_version()
+            self._started_at = self._checked_at = now
+
+    def invalidate(self) -> None:
+        """Forget everything; the next read reloads from DynamoDB"""
+        if self._started_at is not None:
+            self.invalidations += 1
+        self._reset()
+
+    def clear(self) -> None:
+        """Forget everything and zero the counters"""
+        self._reset()
+        self.hits = self.misses = self.version_checks = self.invalidations = 0
+
+    def get(self, product_id: str, loader: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Return a copy of one product, loading it on a miss"""
+        if not self.enabled:
+            return loader()
+        self._validate()
+
+        if product_id in self._products:
+            self.hits += 1
+            return dict(self._products[product_id])
+
+        self.misses += 1
+        item = loader()
+        if item is not None:
+            self._products[product_id] = item
+            return dict(item)
+        return None
+
+    def get_many(
+        self,
+        product_ids: List[str],
+        loader: Callable[[List[str]], Dict[str, Dict[str, Any]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return copies of many products, loading only the missing ones"""
+        if not self.enabled:
+            return loader(product_ids)
+        self._validate()
+
+        missing = [product_id for product_id in product_ids if product_id not in self._products]
+        self.hits += len(product_ids) - len(missing)
+        if missing:
+            self.misses += len(missing)
+            self._products.update(loader(missing))
+
+        return {
+            product_id: dict(self._products[product_id])
+            for product_id in product_ids
+            if product_id in self._products
+        }
+
+    def snapshot(self, loader: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Return copies of every product, loading the full catalog on a miss"""
+        if not self.enabled:
+            return loader()
+        self._validate()
+
+        if self._snapshot is None:
+            self.misses += 1
+            self._snapshot = loader()
+            self._products.update((item['id'], item) for item in self._snapshot)
+        else:
+            self.hits += 1
+
+        return [dict(item) for item in self._snapshot]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for tuning the TTL and check interval"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'versionChecks': self.version_checks,
+            'invalidations': self.invalidations,
+            'cachedProducts': len(self._products),
+            'version': self._version
+        }
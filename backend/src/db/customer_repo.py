@@ -1,8 +1,29 @@
 import uuid
 from decimal import Decimal
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from .dynamo_client import get_table
+from .batch import batch_get
+from .pagination import take_page
+from .transactions import transact_write
+from .projection import projection_params
+from .entity_index import iter_entities, active_attributes, backfill_active
+from . import search_index
+
+# Attributes a client may request with fields=, and the default list shape
+CUSTOMER_FIELDS = (
+    'id', 'name', 'location', 'phone', 'email', 'notes', 'totalDebt',
+    'isActive', 'createdAt', 'updatedAt'
+)
+CUSTOMER_SUMMARY_FIELDS = ('id', 'name', 'location', 'phone', 'totalDebt', 'isActive')
+
+# Attributes the list filter looks at, read whatever fields were requested
+CUSTOMER_FILTER_ATTRIBUTES = ('name', 'isActive')
+
+
+class CustomerNotFoundError(ValueError):
+    """Raised when a write targets a customer that does not exist"""
+    pass
 
 
 def create_customer(
@@ -30,11 +51,14 @@ def create_customer(
         'notes': notes,
         'isActive': is_active,
         'createdAt': now,
-        'updatedAt': now
+        'updatedAt': now,
+        **active_attributes('CUSTOMER', is_active)
     }
     
-    table = get_table()
-    table.put_item(Item=item)
+    # Write the customer and its search index entries together
+    transact_write(
+        [{'Put': {'Item': item}}] + search_index.token_puts('CUSTOMER', customer_id, name)
+    )
     
     return item
 
@@ -51,6 +75,51 @@ def get_customer(customer_id: str) -> Optional[Dict[str, Any]]:
     return response.get('Item')
 
 
+def get_customers_by_ids(
+    customer_ids: List[str],
+    fields: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch many customers with BatchGetItem, fetching duplicate IDs once.
+    
+    Args:
+        customer_ids: Customer IDs
+        fields: Attributes to read (id is always read); None reads all
+    
+    Returns:
+        Mapping of customer ID to customer; missing customers are absent
+    """
+    unique_ids = list(dict.fromkeys(customer_ids))
+    items = batch_get(
+        [{'pk': f'CUSTOMER#{customer_id}', 'sk': 'META'} for customer_id in unique_ids],
+        **projection_params(fields, required=('id',))
+    )
+    return {item['id']: item for item in items}
+
+
+def customer_debt_update(customer_id: str, debt_change: Decimal) -> Dict[str, Any]:
+    """
+    Build the transactional update that applies a debt change to a customer.
+    
+    The update is conditioned on the customer existing, so the transaction
+    doubles as the existence check.
+    """
+    return {
+        'Update': {
+            'Key': {
+                'pk': f'CUSTOMER#{customer_id}',
+                'sk': 'META'
+            },
+            'UpdateExpression': 'ADD totalDebt :debtChange SET updatedAt = :updatedAt',
+            'ConditionExpression': 'attribute_exists(pk)',
+            'ExpressionAttributeValues': {
+                ':debtChange': Decimal(str(debt_change)),
+                ':updatedAt': datetime.now(timezone.utc).isoformat()
+            }
+        }
+    }
+
+
 def update_customer_debt(customer_id: str, debt_change: float) -> Optional[Dict[str, Any]]:
     """Update customer's total debt"""
     table = get_table()
@@ -71,36 +140,86 @@ def update_customer_debt(customer_id: str, debt_change: float) -> Optional[Dict[
     return response.get('Attributes')
 
 
-def list_customers(
-    search: Optional[str] = None,
-    include_inactive: bool = False
-) -> List[Dict[str, Any]]:
-    """List all customers with optional filtering"""
-    table = get_table()
-    
-    # Use GSI to query by entityType
-    response = table.query(
-        IndexName='EntityTypeIndex',
-        KeyConditionExpression='entityType = :entityType',
-        ExpressionAttributeValues={
-            ':entityType': 'CUSTOMER'
-        }
-    )
+def _customer_filter(search: Optional[str], include_inactive: bool):
+    """Build the in-memory predicate applied to listed customers"""
+    search_lower = search.lower() if search else None
+
+    def predicate(item: Dict[str, Any]) -> bool:
+        if not include_inactive and not item.get('isActive', True):
+            return False
+        if search_lower and search_lower not in item.get('name', '').lower():
+            return False
+        return True
+
+    return predicate
+
+
+def iter_customers(
+    start_key: Optional[Dict[str, Any]] = None,
+    fields: Optional[List[str]] = None,
+    active_only: bool = False
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Iterate over customers by name, following every page.
     
-    customers = response.get('Items', [])
+    active_only reads the sparse ActiveEntityIndex instead of every customer.
+    With fields, only those attributes plus the index keys are read.
+    """
+    return iter_entities('CUSTOMER', start_key, active_only=active_only, fields=fields)
+
+
+def list_customers_page(
+    limit: Optional[int] = None,
+    start_key: Optional[Dict[str, Any]] = None,
+    search: Optional[str] = None,
+    include_inactive: bool = False,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    List one page of customers, returning the items and the key to resume from.
     
-    # Filter by active status
-    if not include_inactive:
-        customers = [c for c in customers if c.get('isActive', True)]
+    A search is answered from the name search index rather than by reading
+    every customer; otherwise only active customers are read unless
+    include_inactive is set. With fields, DynamoDB returns only those attributes plus
+    the ones needed to filter and resume; callers trim the rest.
+    """
+    if fields is not None:
+        fields = list(dict.fromkeys([*fields, *CUSTOMER_FILTER_ATTRIBUTES]))
     
-    # Filter by search term
     if search:
-        search_lower = search.lower()
-        customers = [c for c in customers if search_lower in c.get('name', '').lower()]
+        items = search_index.hydrate(
+            search_index.iter_matches('CUSTOMER', search, start_key),
+            lambda customer_ids: get_customers_by_ids(customer_ids, fields)
+        )
+    else:
+        items = iter_customers(start_key, fields, active_only=not include_inactive)
     
+    return take_page(
+        items,
+        limit=limit,
+        predicate=_customer_filter(search, include_inactive)
+    )
+
+
+def list_customers(
+    search: Optional[str] = None,
+    include_inactive: bool = False
+) -> List[Dict[str, Any]]:
+    """List all customers with optional filtering"""
+    customers, _ = list_customers_page(search=search, include_inactive=include_inactive)
     return customers
 
 
+def rebuild_customer_search_index() -> int:
+    """Index the names of all existing customers; returns how many were indexed"""
+    return search_index.rebuild('CUSTOMER', (customer for customer, _ in iter_customers()))
+
+
+def backfill_active_customers() -> int:
+    """Add active customers created before ActiveEntityIndex to it; returns how many were added"""
+    return backfill_active('CUSTOMER')
+
+
 def get_customer_orders(customer_id: str, limit: int = 50) -> List[Dict[str, Any]]:
     """Get all orders for a customer"""
     table = get_table()
@@ -134,3 +253,126 @@ def get_customer_debt_adjustments(customer_id: str, limit: int = 50) -> List[Dic
     
     return response.get('Items', [])
 
+
+
+# Default number of each item type read by get_customer_activity
+ACTIVITY_DEFAULT_LIMIT = 10
+
+# Order summary attributes read by get_customer_activity (never line items)
+ACTIVITY_ORDER_ATTRIBUTES = ('sk', 'id', 'orderDate', 'totalAmount', 'paidNow', 'debtChange')
+
+# Debt adjustment attributes read by get_customer_activity
+ACTIVITY_DEBT_ATTRIBUTES = ('sk', 'id', 'timestamp', 'amount', 'reason', 'balanceAfter')
+
+
+def _recent_items(customer_id: str, prefix: str, limit: int, attributes: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Read the newest limit items of one sort key prefix in the customer's partition"""
+    if limit <= 0:
+        return []
+    response = get_table().query(
+        KeyConditionExpression='pk = :pk AND begins_with(sk, :sk_prefix)',
+        ExpressionAttributeValues={
+            ':pk': f'CUSTOMER#{customer_id}',
+            ':sk_prefix': prefix
+        },
+        ScanIndexForward=False,
+        Limit=limit,
+        **projection_params(attributes)
+    )
+    return response.get('Items', [])
+
+
+def get_customer_activity(
+    customer_id: str,
+    order_limit: int = ACTIVITY_DEFAULT_LIMIT,
+    debt_limit: int = ACTIVITY_DEFAULT_LIMIT
+) -> Optional[Dict[str, Any]]:
+    """
+    Get a customer with its most recent orders and debt adjustments.
+    
+    The META item, the newest ORDER# items and the newest DEBT# items are
+    read by three small bounded requests, so the cost depends on the limits
+    and not on how long the customer's history is. Orders are read without
+    their line items.
+    
+    Args:
+        customer_id: Customer ID
+        order_limit: Most recent orders to return
+        debt_limit: Most recent debt adjustments to return
+    
+    Returns:
+        {'customer', 'orders', 'debtAdjustments'}, newest first, or None if
+        the customer does not exist
+    """
+    customer = get_table().get_item(
+        Key={'pk': f'CUSTOMER#{customer_id}', 'sk': 'META'},
+        **projection_params(CUSTOMER_FIELDS)
+    ).get('Item')
+    if customer is None:
+        return None
+    
+    return {
+        'customer': customer,
+        'orders': _recent_items(customer_id, 'ORDER#', order_limit, ACTIVITY_ORDER_ATTRIBUTES),
+        'debtAdjustments': _recent_items(customer_id, 'DEBT#', debt_limit, ACTIVITY_DEBT_ATTRIBUTES)
+    }
+
+
+def _ledger_time(timestamp: Optional[str]) -> datetime:
+    if not timestamp:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def get_customer_ledger(customer_id: str, limit: int = 50) -> Optional[Dict[str, Any]]:
+    """
+    Get the most recent debt movements of a customer as one ledger.
+    
+    Orders and debt adjustments are merged newest first; each entry carries
+    the debt change it caused and the customer's total debt right after it,
+    derived backwards from the current total.
+    
+    Args:
+        customer_id: Customer ID
+        limit: Maximum number of entries
+    
+    Returns:
+        {'customer', 'entries'} or None if the customer does not exist
+    """
+    activity = get_customer_activity(customer_id, order_limit=limit, debt_limit=limit)
+    if activity is None:
+        return None
+    
+    entries = [
+        {
+            'type': 'ORDER',
+            'id': order.get('id'),
+            'timestamp': order.get('orderDate'),
+            'amount': order.get('debtChange', Decimal('0')),
+            'totalAmount': order.get('totalAmount'),
+            'paidNow': order.get('paidNow')
+        }
+        for order in activity['orders']
+    ] + [
+        {
+            'type': 'DEBT_ADJUSTMENT',
+            'id': adjustment.get('id'),
+            'timestamp': adjustment.get('timestamp'),
+            'amount': adjustment.get('amount', Decimal('0')),
+            'reason': adjustment.get('reason')
+        }
+        for adjustment in activity['debtAdjustments']
+    ]
+    entries.sort(key=lambda entry: _ledger_time(entry['timestamp']), reverse=True)
+    entries = entries[:limit]
+    
+    balance = activity['customer'].get('totalDebt', Decimal('0'))
+    for entry in entries:
+        entry['balanceAfter'] = balance
+        balance -= entry['amount']
+    
+    return {
+        'customer': activity['customer'],
+        'entries': entries
+    }
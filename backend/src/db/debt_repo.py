@@ -3,7 +3,27 @@ from decimal import Decimal
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from .dynamo_client import get_table
-from .customer_repo import update_customer_debt
+from .customer_repo import customer_debt_update, CustomerNotFoundError
+from .transactions import transact_write, TransactionConflict
+
+# Attempts when the customer's balance changes between reading and writing it
+DEBT_ADJUSTMENT_MAX_ATTEMPTS = 5
+
+
+def _read_total_debt(customer_id: str) -> Optional[Decimal]:
+    """Read the current balance; raises CustomerNotFoundError if there is no customer"""
+    response = get_table().get_item(
+        Key={
+            'pk': f'CUSTOMER#{customer_id}',
+            'sk': 'META'
+        },
+        ProjectionExpression='pk, totalDebt',
+        ConsistentRead=True
+    )
+    item = response.get('Item')
+    if item is None:
+        raise CustomerNotFoundError(f"Customer {customer_id} not found")
+    return item.get('totalDebt')
 
 
 def create_debt_adjustment(
@@ -12,7 +32,22 @@ def create_debt_adjustment(
     reason: str,
     timestamp: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Create a debt adjustment"""
+    """
+    Create a debt adjustment and apply it to the customer's total debt.
+    
+    The DEBT# item and the totalDebt change are written in one transaction
+    that is conditioned on the balance read just before it, so the new
+    balance is known without reading the customer back (it is stored on the
+    adjustment as balanceAfter). If the balance moved in between, the
+    adjustment is retried against the fresh balance.
+    
+    Returns:
+        The adjustment item
+    
+    Raises:
+        CustomerNotFoundError: If the customer does not exist
+        ValueError: If an adjustment already exists at the same timestamp
+    """
     adjustment_id = str(uuid.uuid4())
     
     if timestamp:
@@ -22,23 +57,50 @@ def create_debt_adjustment(
     
     timestamp_str = ts.isoformat()
     sk_timestamp = timestamp_str
+    debt_change = Decimal(str(amount))
     
-    adjustment_item = {
-        'pk': f'CUSTOMER#{customer_id}',
-        'sk': f'DEBT#{sk_timestamp}',
-        'entityType': 'DEBT_ADJUSTMENT',
-        'id': adjustment_id,
-        'customerId': customer_id,
-        'timestamp': timestamp_str,
-        'amount': Decimal(str(amount)),
-        'reason': reason
-    }
-    
-    table = get_table()
-    table.put_item(Item=adjustment_item)
+    last_conflict = None
+    for _ in range(DEBT_ADJUSTMENT_MAX_ATTEMPTS):
+        prior_debt = _read_total_debt(customer_id)
+        
+        adjustment_item = {
+            'pk': f'CUSTOMER#{customer_id}',
+            'sk': f'DEBT#{sk_timestamp}',
+            'entityType': 'DEBT_ADJUSTMENT',
+            'id': adjustment_id,
+            'customerId': customer_id,
+            'timestamp': timestamp_str,
+            'amount': debt_change,
+            'reason': reason,
+            'balanceAfter': (prior_debt or Decimal('0')) + debt_change
+        }
+        
+        # ADD stays relative; the extra condition pins the balance it applies to
+        update = customer_debt_update(customer_id, debt_change)
+        params = update['Update']
+        if prior_debt is None:
+            params['ConditionExpression'] += ' AND attribute_not_exists(totalDebt)'
+        else:
+            params['ConditionExpression'] += ' AND totalDebt = :priorDebt'
+            params['ExpressionAttributeValues'][':priorDebt'] = prior_debt
+        
+        try:
+            transact_write([
+                {
+                    'Put': {
+                        'Item': adjustment_item,
+                        'ConditionExpression': 'attribute_not_exists(pk)'
+                    }
+                },
+                update
+            ])
+            return adjustment_item
+        except TransactionConflict as e:
+            if e.reasons[:1] == ['ConditionalCheckFailed']:
+                raise ValueError(f"A debt adjustment already exists at {timestamp_str}")
+            if e.reasons[1:2] not in (['ConditionalCheckFailed'], ['TransactionConflict']):
+                raise
+            # The balance changed (or the customer vanished); re-read and retry
+            last_conflict = e
     
-    # Update customer debt
-    update_customer_debt(customer_id, amount)
-    
-    return adjustment_item
-
+    raise last_conflict
@@ -1,15 +1,110 @@
+"""
+Lazily created, tuned DynamoDB resource shared by all repositories.
+
+Nothing is built at import time, so functions that never touch DynamoDB
+(e.g. login) skip the cost at cold start. Settings come from the environment:
+
+    DYNAMODB_TABLE_NAME            table name (default distribution-app-dev)
+    DYNAMODB_ENDPOINT_URL          endpoint override, e.g. DynamoDB Local
+    DYNAMODB_MAX_POOL_CONNECTIONS  HTTP connection pool size (default 50)
+    DYNAMODB_CONNECT_TIMEOUT       seconds (default 2)
+    DYNAMODB_READ_TIMEOUT          seconds (default 5)
+    DYNAMODB_MAX_ATTEMPTS          attempts incl. the first, adaptive retry mode (default 5)
+
+boto3 itself is only imported when the resource is first built unless
+LAZY_IMPORTS=0 (see utils.lazy_import).
+"""
 import os
-import boto3
-from typing import Optional
+import threading
+from typing import Any, Dict
+from src.utils.lazy_import import lazy_module
+
+boto3 = lazy_module('boto3')
+botocore_config = lazy_module('botocore.config')
+
+# Built on first use; tests may assign these directly
+dynamodb = None
+table = None
+
+_lock = threading.Lock()
+
+
+def get_client_config() -> Dict[str, Any]:
+    """Client settings derived from the environment"""
+    return {
+        'region_name': os.environ.get('AWS_REGION', 'eu-central-1'),
+        'endpoint_url': os.environ.get('DYNAMODB_ENDPOINT_URL') or None,
+        'max_pool_connections': int(os.environ.get('DYNAMODB_MAX_POOL_CONNECTIONS', '50')),
+        'connect_timeout': float(os.environ.get('DYNAMODB_CONNECT_TIMEOUT', '2')),
+        'read_timeout': float(os.environ.get('DYNAMODB_READ_TIMEOUT', '5')),
+        'max_attempts': int(os.environ.get('DYNAMODB_MAX_ATTEMPTS', '5'))
+    }
+
+
+def _create_config(settings: Dict[str, Any]):
+    return botocore_config.Config(
+        max_pool_connections=settings['max_pool_connections'],
+        connect_timeout=settings['connect_timeout'],
+        read_timeout=settings['read_timeout'],
+        tcp_keepalive=True,
+        retries={'max_attempts': settings['max_attempts'], 'mode': 'adaptive'}
+    )
 
-# Initialize DynamoDB client
-_region = os.environ.get('AWS_REGION', 'eu-central-1')
-dynamodb = boto3.resource('dynamodb', region_name=_region)
-table_name = os.environ.get('DYNAMODB_TABLE_NAME', 'distribution-app-dev')
-table = dynamodb.Table(table_name)
+
+def _create_resource(settings: Dict[str, Any]):
+    return boto3.resource(
+        'dynamodb',
+        region_name=settings['region_name'],
+        endpoint_url=settings['endpoint_url'],
+        config=_create_config(settings)
+    )
+
+
+def get_dynamodb():
+    """Get the DynamoDB service resource (for batch and transactional calls)"""
+    global dynamodb
+    if dynamodb is None:
+        with _lock:
+            if dynamodb is None:
+                dynamodb = _create_resource(get_client_config())
+    return dynamodb
+
+
+def get_client():
+    """Get the tuned low-level DynamoDB client behind the resource"""
+    return get_dynamodb().meta.client
+
+
+def create_raw_client():
+    """
+    Create a new client that keeps items in DynamoDB JSON ({"S": ...}).
+
+    The resource's client converts items to Python values once a Table
+    exists, so callers that need the wire format get their own client.
+    """
+    settings = get_client_config()
+    return boto3.client(
+        'dynamodb',
+        region_name=settings['region_name'],
+        endpoint_url=settings['endpoint_url'],
+        config=_create_config(settings)
+    )
 
 
 def get_table():
     """Get the DynamoDB table instance"""
+    global table
+    if table is None:
+        resource = get_dynamodb()
+        with _lock:
+            if table is None:
+                table = resource.Table(os.environ.get('DYNAMODB_TABLE_NAME', 'distribution-app-dev'))
     return table
 
+
+def reset() -> None:
+    """Drop the cached resource and table, e.g. after changing the environment"""
+    global dynamodb, table
+    with _lock:
+        dynamodb = None
+        table = None
@@ -0,0 +1,103 @@
+"""
+Listing products and customers by name.
+
+Every product and customer is in EntityTypeIndex (entityType, name). Active
+ones also carry activeEntityType, a copy of entityType that is removed when
+the entity is deactivated, which makes them the only items in the sparse
+ActiveEntityIndex (activeEntityType, name). Default listings query that
+index, so their cost follows the active set however many inactive entities
+accumulate; listings that include inactive entities use EntityTypeIndex.
+
+Both indexes sort by name and cursors are exchangeable between them: the
+keys yielded here always have the EntityTypeIndex shape.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .dynamo_client import get_table
+from .pagination import iter_query
+from .projection import projection_params
+
+ENTITY_INDEX = 'EntityTypeIndex'
+ACTIVE_INDEX = 'ActiveEntityIndex'
+
+# Present (equal to entityType) only while an entity is active
+ACTIVE_ATTRIBUTE = 'activeEntityType'
+
+# Key attributes needed to resume a query on EntityTypeIndex
+ENTITY_INDEX_KEY_ATTRIBUTES = ('pk', 'sk', 'entityType', 'name')
+
+
+def active_attributes(entity_type: str, is_active: bool) -> Dict[str, Any]:
+    """Attributes to store on a new entity so it is listed while active"""
+    return {ACTIVE_ATTRIBUTE: entity_type} if is_active else {}
+
+
+def active_update(entity_type: str, is_active: bool) -> Tuple[List[str], List[str], Dict[str, Any]]:
+    """
+    Build the update parts that add an entity to or remove it from
+    ActiveEntityIndex, for merging into an UpdateExpression.
+
+    Returns:
+        (SET assignments, REMOVE attributes, expression attribute values)
+    """
+    if is_active:
+        return ['activeEntityType = :activeEntityType'], [], {':activeEntityType': entity_type}
+    return [], [ACTIVE_ATTRIBUTE], {}
+
+
+def _index_start_key(start_key: Dict[str, Any], hash_attribute: str, entity_type: str) -> Dict[str, Any]:
+    key = {attr: start_key[attr] for attr in ('pk', 'sk', 'name') if attr in start_key}
+    key[hash_attribute] = entity_type
+    return key
+
+
+def iter_entities(
+    entity_type: str,
+    start_key: Optional[Dict[str, Any]] = None,
+    active_only: bool = False,
+    fields: Optional[List[str]] = None
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Iterate over entities of a type by name, following every page.
+
+    Args:
+        entity_type: PRODUCT or CUSTOMER
+        start_key: Key yielded by an earlier iteration, from either index
+        active_only: Read ActiveEntityIndex instead of EntityTypeIndex
+        fields: Attributes to read (plus the index keys); None reads all
+
+    Yields:
+        (item, key) pairs for take_page
+    """
+    hash_attribute = ACTIVE_ATTRIBUTE if active_only else 'entityType'
+    if start_key:
+        start_key = _index_start_key(start_key, hash_attribute, entity_type)
+
+    return iter_query(
+        get_table(),
+        ENTITY_INDEX_KEY_ATTRIBUTES,
+        start_key=start_key,
+        IndexName=ACTIVE_INDEX if active_only else ENTITY_INDEX,
+        KeyConditionExpression=f'{hash_attribute} = :entityType',
+        ExpressionAttributeValues={
+            ':entityType': entity_type
+        },
+        **projection_params(fields, required=ENTITY_INDEX_KEY_ATTRIBUTES)
+    )
+
+
+def backfill_active(entity_type: str) -> int:
+    """
+    Add existing active entities (e.g. those created before ActiveEntityIndex
+    existed) to the index. Safe to re-run; returns the number of entities updated.
+    """
+    table = get_table()
+    count = 0
+    for item, _ in iter_entities(entity_type, fields=['isActive', ACTIVE_ATTRIBUTE]):
+        if item.get('isActive', True) and ACTIVE_ATTRIBUTE not in item:
+            table.update_item(
+                Key={'pk': item['pk'], 'sk': item['sk']},
+                UpdateExpression='SET activeEntityType = :activeEntityType',
+                ExpressionAttributeValues={':activeEntityType': entity_type}
+            )
+            count += 1
+    return count
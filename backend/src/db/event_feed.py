@@ -0,0 +1,95 @@
+"""
+DynamoDB stream records, and an in-process stand-in for the stream.
+
+Deployed, the table's stream delivers INSERT/MODIFY/REMOVE records to
+consumer Lambdas. Locally (moto, scripts, tests) there is no stream, so
+repositories also publish what they wrote to local_feed, which queues
+records shaped like the Lambda stream event when LOCAL_EVENT_FEED=1 and
+does nothing otherwise. Consumers take the same records either way.
+"""
+import itertools
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.utils.lazy_import import lazy_module
+
+dynamodb_types = lazy_module('boto3.dynamodb.types')
+
+
+def serialize_image(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a plain item to the attribute-value form used by stream images"""
+    serializer = dynamodb_types.TypeSerializer()
+    return {name: serializer.serialize(value) for name, value in item.items()}
+
+
+def deserialize_image(image: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Convert a stream image back to a plain item (numbers become Decimal)"""
+    if image is None:
+        return None
+    deserializer = dynamodb_types.TypeDeserializer()
+    return {name: deserializer.deserialize(value) for name, value in image.items()}
+
+
+def record_images(record: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Return the (new, old) items of a stream record"""
+    change = record.get('dynamodb', {})
+    return deserialize_image(change.get('NewImage')), deserialize_image(change.get('OldImage'))
+
+
+class LocalEventFeed:
+    """In-memory queue of stream records for running consumers without a stream"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._records: List[Dict[str, Any]] = []
+        self._sequence = itertools.count(1)
+
+    def publish(
+        self,
+        event_name: str,
+        new_item: Optional[Dict[str, Any]] = None,
+        old_item: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Queue a record for a write; a no-op while the feed is disabled"""
+        if not self.enabled:
+            return
+        item = new_item or old_item
+        sequence = str(next(self._sequence)).zfill(21)
+        change = {
+            'Keys': serialize_image({'pk': item['pk'], 'sk': item['sk']}),
+            'SequenceNumber': sequence,
+            'StreamViewType': 'NEW_IMAGE' if old_item is None else 'NEW_AND_OLD_IMAGES'
+        }
+        if new_item is not None:
+            change['NewImage'] = serialize_image(new_item)
+        if old_item is not None:
+            change['OldImage'] = serialize_image(old_item)
+        self._records.append({
+            'eventID': sequence,
+            'eventName': event_name,
+            'eventSource': 'aws:dynamodb',
+            'dynamodb': change
+        })
+
+    def pending(self) -> int:
+        return len(self._records)
+
+    def drain(self, consumer: Callable[[List[Dict[str, Any]]], Any], batch_size: int = 100) -> int:
+        """
+        Deliver queued records to consumer in batches, like a stream trigger.
+
+        Returns:
+            Number of records delivered
+        """
+        delivered = 0
+        while self._records:
+            batch = self._records[:batch_size]
+            consumer(batch)
+            del self._records[:len(batch)]
+            delivered += len(batch)
+        return delivered
+
+    def clear(self) -> None:
+        self._records.clear()
+
+
+local_feed = LocalEventFeed(enabled=os.environ.get('LOCAL_EVENT_FEED', '0') == '1')
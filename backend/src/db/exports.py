@@ -0,0 +1,108 @@
+"""
+CSV/JSONL exports of the product catalog and of customers with debt.
+
+An export is a generator pipeline: the paginated index reads yield rows,
+which are encoded line by line (utils.export_stream) and regrouped into
+parts that the target writes as they arrive (utils.export_targets). Only
+one page of items and one part of output are held at a time, however many
+rows there are, and the file is downloaded from the target rather than
+returned in the response.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List
+from src.utils.export_stream import encode_rows, chunked, CONTENT_TYPES
+from src.utils.export_targets import get_export_target, url_expires_seconds
+from src.utils.ulid import new_ulid
+from .entity_index import iter_entities
+from .product_repo import exact_effective_price, PRODUCT_FIELDS, PRODUCT_COMPUTED_FIELDS
+from .customer_repo import iter_customers, CUSTOMER_FIELDS
+
+EXPORT_DATASETS = ('products', 'customers')
+
+PRODUCT_EXPORT_COLUMNS = PRODUCT_FIELDS
+CUSTOMER_EXPORT_COLUMNS = CUSTOMER_FIELDS
+
+
+def product_rows(include_inactive: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield products by name, with their effective prices rounded to cents"""
+    stored = [field for field in PRODUCT_FIELDS if field not in PRODUCT_COMPUTED_FIELDS]
+    # Straight from the index: the catalog cache would hold every product at once
+    for product, _ in iter_entities('PRODUCT', active_only=not include_inactive, fields=stored):
+        discount = product.get('discountPercent', 0)
+        for computed, base in (('effectiveBuyingPrice', 'baseBuyingPrice'),
+                               ('effectiveSellingPrice', 'baseSellingPrice')):
+            if base in product:
+                product[computed] = exact_effective_price(product[base], discount)
+        yield product
+
+
+def customer_rows(include_inactive: bool = False, with_debt_only: bool = True) -> Iterator[Dict[str, Any]]:
+    """Yield customers by name, by default only those whose debt is not zero"""
+    for customer, _ in iter_customers(fields=list(CUSTOMER_FIELDS), active_only=not include_inactive):
+        if with_debt_only and not customer.get('totalDebt', Decimal(0)):
+            continue
+        yield customer
+
+
+def _counted(rows: Iterator[Dict[str, Any]], counter: List[int]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        counter[0] += 1
+        yield row
+
+
+def run_export(
+    dataset: str,
+    export_format: str = 'csv',
+    include_inactive: bool = False,
+    with_debt_only: bool = True,
+    target=None
+) -> Dict[str, Any]:
+    """
+    Write a dataset to the export target.
+
+    Args:
+        dataset: products or customers
+        export_format: csv or jsonl
+        include_inactive: Also export inactive products/customers
+        with_debt_only: Customers only; skip those without debt
+        target: Where to write (default: utils.export_targets.get_export_target())
+
+    Returns:
+        Row and byte counts, the object key and a download URL
+
+    Raises:
+        ValueError: For an unknown dataset or format
+    """
+    if dataset == 'products':
+        rows, columns = product_rows(include_inactive), PRODUCT_EXPORT_COLUMNS
+    elif dataset == 'customers':
+        rows, columns = customer_rows(include_inactive, with_debt_only), CUSTOMER_EXPORT_COLUMNS
+    else:
+        raise ValueError(f"dataset must be one of: {', '.join(EXPORT_DATASETS)}")
+    counter = [0]
+    pieces = encode_rows(_counted(rows, counter), columns, export_format)
+
+    target = target or get_export_target()
+    now = datetime.now(timezone.utc)
+    filename = f"{dataset}-{now.strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    key = f'exports/{dataset}/{new_ulid(now)}/{filename}'
+
+    size = target.write(
+        key,
+        chunked(pieces, target.part_size),
+        CONTENT_TYPES[export_format],
+        filename
+    )
+
+    return {
+        'dataset': dataset,
+        'format': export_format,
+        'rows': counter[0],
+        'bytes': size,
+        'key': key,
+        'filename': filename,
+        'url': target.url(key, filename),
+        'expiresIn': url_expires_seconds()
+    }
+
@@ -0,0 +1,204 @@
+"""
+Bulk creation of orders.
+
+An import validates every order with the rules of POST /orders, prices all
+of them from one batched product fetch and checks their customers with one
+batched read before anything is written. Valid orders are then grouped by
+customer: each group is written with a single debt update carrying the sum
+of its orders' debt changes, so a customer's total is updated once per
+import instead of once per order. Groups are packed into transactions of
+up to 100 operations, which run concurrently.
+
+A transaction commits its orders and debt updates together. When one
+fails (e.g. a customer was deleted meanwhile), its groups are retried one
+transaction each, so a single bad group only fails its own orders.
+Orders are reported per row as created, invalid (nothing was written) or
+failed (the write was attempted and did not commit).
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from src.utils.order_validation import validate_order, OrderValidationError
+from .product_repo import get_products_by_ids
+from .customer_repo import get_customers_by_ids, customer_debt_update
+from .order_repo import build_order_item, products_to_price
+from .transactions import transact_write, TransactionConflict
+from .event_feed import local_feed
+
+# Largest upload accepted in one import
+MAX_IMPORT_ORDERS = 5000
+
+# TransactWriteItems accepts at most 100 operations
+IMPORT_MAX_OPERATIONS_PER_TRANSACTION = 100
+
+# Transactions in flight at once
+IMPORT_MAX_WORKERS = 8
+
+# Attempts for a group whose transaction collides with a concurrent write
+IMPORT_MAX_ATTEMPTS = 3
+
+CREATED = 'created'
+INVALID = 'invalid'
+FAILED = 'failed'
+
+
+def _result(entry: Dict[str, Any], status: str, **details: Any) -> Dict[str, Any]:
+    result = {'row': entry['row'], 'ref': entry['ref'], 'status': status}
+    result.update({name: value for name, value in details.items() if value is not None})
+    return result
+
+
+def _group_operations(group: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Puts for a customer's orders followed by their coalesced debt update"""
+    orders = [order for _, order in group]
+    debt_change = sum((order['debtChange'] for order in orders), Decimal('0'))
+    return [{'Put': {'Item': order}} for order in orders] + [
+        customer_debt_update(orders[0]['customerId'], debt_change)
+    ]
+
+
+def _write_group(group: List[Dict[str, Any]]) -> Optional[str]:
+    """Write one customer group in its own transaction; returns an error or None"""
+    for attempt in range(IMPORT_MAX_ATTEMPTS):
+        try:
+            transact_write(_group_operations(group))
+            return None
+        except TransactionConflict as e:
+            if e.reasons[-1:] == ['ConditionalCheckFailed']:
+                return f"Customer {group[0][1]['customerId']} not found"
+            if attempt == IMPORT_MAX_ATTEMPTS - 1:
+                return str(e)
+            time.sleep(0.05 * (2 ** attempt))
+        except Exception as e:
+            return str(e)
+
+
+def _write_transaction(groups: List[List[Dict[str, Any]]]) -> List[Optional[str]]:
+    """
+    Write groups in one transaction; returns an error or None per group.
+
+    Only a cancelled transaction, which is known not to have committed, is
+    retried one group at a time. After any other error (throttling, a
+    timeout) it may have committed, and writing the groups again would
+    apply their debt twice, so they are reported as failed.
+    """
+    if len(groups) == 1:
+        return [_write_group(groups[0])]
+    try:
+        transact_write([operation for group in groups for operation in _group_operations(group)])
+        return [None] * len(groups)
+    except TransactionConflict:
+        return [_write_group(group) for group in groups]
+    except Exception as e:
+        return [str(e)] * len(groups)
+
+
+def _customer_groups(built: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Group (entry, order) pairs by customer, in order of first appearance.
+
+    A customer with more orders than fit a transaction next to its debt
+    update gets several groups.
+    """
+    by_customer: Dict[str, List[Dict[str, Any]]] = {}
+    for pair in built:
+        by_customer.setdefault(pair[1]['customerId'], []).append(pair)
+
+    size = IMPORT_MAX_OPERATIONS_PER_TRANSACTION - 1
+    return [
+        pairs[start:start + size]
+        for pairs in by_customer.values()
+        for start in range(0, len(pairs), size)
+    ]
+
+
+def _pack(groups: List[List[Dict[str, Any]]]) -> List[List[List[Dict[str, Any]]]]:
+    """Pack groups, in order, into transactions of at most the operation limit"""
+    transactions = []
+    current: List[List[Dict[str, Any]]] = []
+    operations = 0
+    for group in groups:
+        needed = len(group) + 1
+        if current and operations + needed > IMPORT_MAX_OPERATIONS_PER_TRANSACTION:
+            transactions.append(current)
+            current, operations = [], 0
+        current.append(group)
+        operations += needed
+    if current:
+        transactions.append(current)
+    return transactions
+
+
+def import_orders(entries: List[Dict[str, Any]], max_workers: int = IMPORT_MAX_WORKERS) -> Dict[str, Any]:
+    """
+    Create the orders of a parsed upload (see utils.order_batch).
+
+    Args:
+        entries: {'row', 'ref', 'body', 'error'} per order
+        max_workers: Transactions written concurrently
+
+    Returns:
+        {'summary': counts per status and total, 'results': one result per
+        entry in row order, with orderId when created and error/code otherwise}
+
+    Raises:
+        ValueError: If there are no orders or more than MAX_IMPORT_ORDERS
+    """
+    if not entries:
+        raise ValueError('The upload contains no orders')
+    if len(entries) > MAX_IMPORT_ORDERS:
+        raise ValueError(f'An import may contain at most {MAX_IMPORT_ORDERS} orders')
+
+    results: List[Dict[str, Any]] = []
+
+    # Validate everything before reading or writing anything
+    validated = []
+    for entry in entries:
+        if entry['error']:
+            results.append(_result(entry, INVALID, error=entry['error'], code='INVALID_INPUT'))
+            continue
+        try:
+            validated.append((entry, validate_order(entry['body'])))
+        except OrderValidationError as e:
+            results.append(_result(entry, INVALID, error=str(e), code=e.code))
+
+    # One batched read each for pricing and for customer existence
+    products = get_products_by_ids([
+        product_id for _, order_input in validated for product_id in products_to_price(order_input['items'])
+    ])
+    customers = get_customers_by_ids(
+        [order_input['customer_id'] for _, order_input in validated],
+        fields=['id']
+    )
+
+    built = []
+    for entry, order_input in validated:
+        if order_input['customer_id'] not in customers:
+            results.append(_result(
+                entry, INVALID, error=f"Customer {order_input['customer_id']} not found", code='NOT_FOUND'
+            ))
+            continue
+        try:
+            built.append((entry, build_order_item(products=products, **order_input)))
+        except ValueError as e:
+            results.append(_result(entry, INVALID, error=str(e), code='INVALID_INPUT'))
+
+    transactions = _pack(_customer_groups(built))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outcomes = list(executor.map(_write_transaction, transactions))
+
+    for groups, errors in zip(transactions, outcomes):
+        for group, error in zip(groups, errors):
+            for entry, order in group:
+                if error:
+                    results.append(_result(entry, FAILED, error=error, code='WRITE_FAILED'))
+                    continue
+                local_feed.publish('INSERT', order)
+                results.append(_result(entry, CREATED, orderId=order['id']))
+
+    results.sort(key=lambda result: result['row'])
+    summary = {'total': len(results), CREATED: 0, INVALID: 0, FAILED: 0}
+    for result in results:
+        summary[result['status']] += 1
+    return {'summary': summary, 'results': results}
@@ -1,29 +1,111 @@
-import uuid
 from decimal import Decimal
-from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime, time, timezone
+from typing import List, Dict, Any, Optional, Tuple
 from .dynamo_client import get_table
-from .product_repo import get_product, compute_effective_price
+from .product_repo import get_products_by_ids, compute_effective_price
+from .customer_repo import customer_debt_update, CustomerNotFoundError
+from .transactions import transact_write, TransactionConflict
+from .pagination import iter_query, take_page
+from .projection import projection_params
+from .event_feed import local_feed
+from src.utils.ulid import new_ulid, is_ulid, ulid_timestamp
 
+# Attributes a client may request with fields=, and the default list shape
+# (line items are only read when asked for)
+ORDER_FIELDS = (
+    'id', 'customerId', 'orderDate', 'items', 'subtotal', 'discount',
+    'totalAmount', 'paidNow', 'debtChange', 'notes'
+)
+ORDER_SUMMARY_FIELDS = ('id', 'orderDate', 'totalAmount', 'paidNow', 'debtChange')
 
-def create_order(
+
+def _sort_key_timestamp(timestamp: datetime) -> str:
+    return f"{timestamp.strftime('%Y-%m-%dT%H:%M:%S')}.{timestamp.microsecond // 1000:03d}Z"
+
+
+def order_sort_key(order_id: str) -> str:
+    """
+    Build the sort key of an order from its ULID.
+    
+    The key is ORDER#<UTC timestamp, ms precision>#<id>, so orders sort by
+    date, never collide, and can be addressed from the ID alone.
+    """
+    return f"ORDER#{_sort_key_timestamp(ulid_timestamp(order_id))}#{order_id}"
+
+
+def _parse_date_bound(value: str, end_of_day: bool) -> datetime:
+    """Parse YYYY-MM-DD (the start or end of that UTC day) or an ISO datetime"""
+    try:
+        if len(value) == 10:
+            moment = datetime.combine(
+                date.fromisoformat(value), time.max if end_of_day else time.min, tzinfo=timezone.utc
+            )
+        else:
+            moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f"Invalid date: {value}")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def order_date_range(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Translate an inclusive date window into sort key bounds for BETWEEN.
+    
+    Dates without a time cover the whole UTC day. The lower bound stops at
+    whole seconds, so it also sorts at or below the keys of orders written
+    before ULID IDs (ORDER#<isoformat>, with or without an offset). The
+    upper bound ends in '~', which sorts after the #<id> suffix of every
+    order in its last millisecond.
+    
+    Raises:
+        ValueError: If a date cannot be parsed or the window is reversed
+    """
+    lower = 'ORDER#'
+    upper = 'ORDER#~'
+    if date_from:
+        lower = f"ORDER#{_parse_date_bound(date_from, end_of_day=False).strftime('%Y-%m-%dT%H:%M:%S')}"
+    if date_to:
+        upper = f"ORDER#{_sort_key_timestamp(_parse_date_bound(date_to, end_of_day=True))}~"
+    if lower > upper:
+        raise ValueError("from must not be after to")
+    return lower, upper
+
+
+def products_to_price(items: List[Dict[str, Any]]) -> List[str]:
+    """IDs of the products whose current price a list of line items needs"""
+    return [item['productId'] for item in items if item.get('unitPrice') is None]
+
+
+def build_order_item(
     customer_id: str,
     order_date: Optional[str],
     items: List[Dict[str, Any]],
+    products: Dict[str, Dict[str, Any]],
     discount: float = 0.0,
     paid_now: float = 0.0,
     notes: Optional[str] = None
 ) -> Dict[str, Any]:
-    """Create a new order"""
-    order_id = str(uuid.uuid4())
+    """
+    Price an order and build its item, without writing anything.
+    
+    Args:
+        products: Products by ID, covering at least products_to_price(items)
     
+    Raises:
+        ValueError: If the order date is invalid or a product is not found
+    """
     if order_date:
         timestamp = datetime.fromisoformat(order_date.replace('Z', '+00:00'))
     else:
         timestamp = datetime.now(timezone.utc)
     
+    order_id = new_ulid(timestamp)
     order_date_str = timestamp.isoformat()
-    sk_timestamp = order_date_str
     
     # Process items and compute prices
     processed_items = []
@@ -34,9 +116,9 @@ def create_order(
         quantity = Decimal(str(item['quantity']))
         unit_price = item.get('unitPrice')
         
-        # If unitPrice not provided, fetch product and compute
+        # If unitPrice not provided, price from the fetched product
         if unit_price is None:
-            product = get_product(product_id)
+            product = products.get(product_id)
             if not product:
                 raise ValueError(f"Product {product_id} not found")
             
@@ -69,7 +151,7 @@ def create_order(
     
     order_item = {
         'pk': f'CUSTOMER#{customer_id}',
-        'sk': f'ORDER#{sk_timestamp}',
+        'sk': order_sort_key(order_id),
         'entityType': 'ORDER',
         'id': order_id,
         'customerId': customer_id,
@@ -83,38 +165,132 @@ def create_order(
         'notes': notes
     }
     
-    table = get_table()
-    table.put_item(Item=order_item)
+    return order_item
+
+
+def create_order(
+    customer_id: str,
+    order_date: Optional[str],
+    items: List[Dict[str, Any]],
+    discount: float = 0.0,
+    paid_now: float = 0.0,
+    notes: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create a new order"""
+    # Fetch every product that needs pricing in one batch
+    products = get_products_by_ids(products_to_price(items))
+    order_item = build_order_item(customer_id, order_date, items, products, discount, paid_now, notes)
+    debt_change = order_item['debtChange']
+    
+    # Write the order and apply its debt change atomically; the debt update
+    # fails its condition when the customer does not exist
+    try:
+        transact_write([
+            {'Put': {'Item': order_item}},
+            customer_debt_update(customer_id, debt_change)
+        ])
+    except TransactionConflict as e:
+        if e.reasons[1:2] == ['ConditionalCheckFailed']:
+            raise CustomerNotFoundError(f"Customer {customer_id} not found")
+        raise
     
-    # Update customer debt
-    from .customer_repo import update_customer_debt
-    update_customer_debt(customer_id, debt_change)
+    # Deployed, the table stream carries the write to consumers such as the
+    # sales rollups; locally the stand-in feed does
+    local_feed.publish('INSERT', order_item)
     
     return order_item
 
 
 def get_order(customer_id: str, order_id: str) -> Optional[Dict[str, Any]]:
-    """Get a specific order (requires scanning customer orders)"""
-    orders = get_customer_orders_list(customer_id, limit=1000)
-    for order in orders:
-        if order.get('id') == order_id:
-            return order
+    """Get a specific order by ID"""
+    table = get_table()
+    
+    if is_ulid(order_id):
+        response = table.get_item(
+            Key={
+                'pk': f'CUSTOMER#{customer_id}',
+                'sk': order_sort_key(order_id)
+            }
+        )
+        return response.get('Item')
+    
+    # Orders created before ULID IDs have random IDs and must be searched for
+    for order, _ in iter_query(
+        table,
+        ('pk', 'sk'),
+        KeyConditionExpression='pk = :pk AND begins_with(sk, :sk_prefix)',
+        FilterExpression='#id = :orderId',
+        ExpressionAttributeNames={'#id': 'id'},
+        ExpressionAttributeValues={
+            ':pk': f'CUSTOMER#{customer_id}',
+            ':sk_prefix': 'ORDER#',
+            ':orderId': order_id
+        }
+    ):
+        return order
     return None
 
 
-def get_customer_orders_list(customer_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-    """Get all orders for a customer"""
-    table = get_table()
+def get_customer_orders_page(
+    customer_id: str,
+    limit: Optional[int] = 50,
+    start_key: Optional[Dict[str, Any]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Get one page of a customer's orders, most recent first.
     
-    response = table.query(
-        KeyConditionExpression='pk = :pk AND begins_with(sk, :sk_prefix)',
+    A date window becomes a sk BETWEEN key condition, so only orders inside
+    it are read; each request reads at most limit + 1 orders.
+    
+    Args:
+        customer_id: Customer ID
+        limit: Maximum number of orders; None reads the whole window
+        start_key: Key returned with the previous page
+        date_from: Earliest order date, inclusive (YYYY-MM-DD or ISO datetime)
+        date_to: Latest order date, inclusive (YYYY-MM-DD or ISO datetime)
+        fields: Attributes to read; None reads whole orders
+    
+    Returns:
+        (orders, key to resume from or None)
+    
+    Raises:
+        ValueError: If the date window is invalid
+    """
+    lower, upper = order_date_range(date_from, date_to)
+    
+    orders = iter_query(
+        get_table(),
+        ('pk', 'sk'),
+        start_key=start_key,
+        page_size=limit + 1 if limit else None,
+        KeyConditionExpression='pk = :pk AND sk BETWEEN :lower AND :upper',
         ExpressionAttributeValues={
             ':pk': f'CUSTOMER#{customer_id}',
-            ':sk_prefix': 'ORDER#'
+            ':lower': lower,
+            ':upper': upper
         },
         ScanIndexForward=False,  # Most recent first
-        Limit=limit
+        **projection_params(fields, required=('pk', 'sk'))
     )
     
-    return response.get('Items', [])
+    return take_page(orders, limit=limit)
 
+
+def get_customer_orders_list(
+    customer_id: str,
+    limit: int = 50,
+    fields: Optional[List[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Get the most recent orders of a customer, optionally within a date window"""
+    orders, _ = get_customer_orders_page(
+        customer_id, limit=limit, date_from=date_from, date_to=date_to, fields=fields
+    )
+    if fields:
+        # The page reads the keys to resume from; a list has no next page
+        return [{name: value for name, value in order.items() if name in fields} for order in orders]
+    return orders
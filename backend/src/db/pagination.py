@@ -0,0 +1,56 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+def iter_query(
+    table,
+    key_attributes: Sequence[str],
+    start_key: Optional[Dict[str, Any]] = None,
+    page_size: Optional[int] = None,
+    **query_kwargs
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Iterate over every item returned by a query, following LastEvaluatedKey.
+
+    Yields (item, key) pairs where key holds the item's key_attributes, so a
+    caller can stop anywhere and resume later with it as start_key.
+    """
+    while True:
+        kwargs = dict(query_kwargs)
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        if page_size:
+            kwargs['Limit'] = page_size
+
+        response = table.query(**kwargs)
+
+        for item in response.get('Items', []):
+            yield item, {attr: item[attr] for attr in key_attributes if attr in item}
+
+        start_key = response.get('LastEvaluatedKey')
+        if not start_key:
+            return
+
+
+def take_page(
+    items: Iterator[Tuple[Dict[str, Any], Dict[str, Any]]],
+    limit: Optional[int] = None,
+    predicate: Optional[Callable[[Dict[str, Any]], bool]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Collect up to limit matching items from an iter_query stream.
+
+    Returns (items, next_key). next_key is the key of the last returned item
+    when more matching items remain, otherwise None.
+    """
+    page = []
+    last_key = None
+
+    for item, key in items:
+        if predicate and not predicate(item):
+            continue
+        if limit is not None and len(page) >= limit:
+            return page, last_key
+        page.append(item)
+        last_key = key
+
+    return page, None
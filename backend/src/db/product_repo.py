@@ -1,11 +1,101 @@
+import os
 import uuid
-from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
-from .dynamo_client import get_table
+from typing import Optional, List, Dict, Any, Callable, Iterator, Tuple
+from src.utils.product_validation import (
+    validate_new_product,
+    validate_product_changes,
+    ProductValidationError
+)
+from .dynamo_client import get_table, get_client
+from .batch import batch_get
+from .pagination import take_page
+from .transactions import transact_write
+from .entity_index import (
+    iter_entities,
+    active_attributes,
+    active_update,
+    backfill_active,
+    ENTITY_INDEX_KEY_ATTRIBUTES
+)
+from . import search_index
+from .catalog_cache import CatalogCache
 
+# Attributes a client may request with fields=, and the default list shape
+PRODUCT_FIELDS = (
+    'id', 'name', 'baseBuyingPrice', 'baseSellingPrice', 'discountPercent',
+    'effectiveBuyingPrice', 'effectiveSellingPrice', 'imageKey', 'isActive',
+    'createdAt', 'updatedAt'
+)
+PRODUCT_SUMMARY_FIELDS = (
+    'id', 'name', 'baseBuyingPrice', 'baseSellingPrice', 'discountPercent',
+    'effectiveBuyingPrice', 'effectiveSellingPrice', 'imageKey', 'isActive'
+)
 
-def create_product(
+# Response fields computed from stored attributes
+PRODUCT_COMPUTED_FIELDS = {
+    'effectiveBuyingPrice': ('baseBuyingPrice', 'discountPercent'),
+    'effectiveSellingPrice': ('baseSellingPrice', 'discountPercent')
+}
+
+# Attributes the list filter looks at, read whatever fields were requested
+PRODUCT_FILTER_ATTRIBUTES = ('name', 'isActive')
+
+# Item whose version attribute is bumped by every product write
+CATALOG_VERSION_KEY = {'pk': 'CATALOG', 'sk': 'VERSION'}
+
+# Most products one bulk upsert or price rule may touch
+MAX_BULK_PRODUCTS = 1000
+
+# Product writes in flight at once during bulk operations
+PRODUCT_BULK_MAX_WORKERS = 8
+
+# Prices set by price rules are rounded to cents
+PRICE_QUANTUM = Decimal('0.01')
+
+# update_product argument for each price a rule may change
+_PRICE_ARGUMENTS = {
+    'baseSellingPrice': 'base_selling_price',
+    'baseBuyingPrice': 'base_buying_price'
+}
+
+
+def get_catalog_version() -> int:
+    """Read the current catalog version (0 before the first product write)"""
+    table = get_table()
+    response = table.get_item(Key=CATALOG_VERSION_KEY, ProjectionExpression='version')
+    return int(response.get('Item', {}).get('version', 0))
+
+
+def catalog_version_bump() -> Dict[str, Any]:
+    """Build the transactional update that bumps the catalog version"""
+    return {
+        'Update': {
+            'Key': CATALOG_VERSION_KEY,
+            'UpdateExpression': 'ADD version :one',
+            'ExpressionAttributeValues': {':one': 1}
+        }
+    }
+
+
+# Warm containers serve product reads from memory. Staleness is bounded by
+# CATALOG_CACHE_CHECK_SECONDS for writes that bump the version and by
+# CATALOG_CACHE_TTL_SECONDS for anything else; a TTL of 0 disables the cache.
+catalog_cache = CatalogCache(
+    read_version=get_catalog_version,
+    ttl_seconds=float(os.environ.get('CATALOG_CACHE_TTL_SECONDS', '300')),
+    check_interval_seconds=float(os.environ.get('CATALOG_CACHE_CHECK_SECONDS', '15'))
+)
+
+
+def catalog_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the in-process catalog cache"""
+    return catalog_cache.stats()
+
+
+def _new_product_item(
     name: str,
     base_buying_price: float,
     base_selling_price: float,
@@ -13,7 +103,6 @@ def create_product(
     image_key: Optional[str] = None,
     is_active: bool = True
 ) -> Dict[str, Any]:
-    """Create a new product"""
     product_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc).isoformat()
     
@@ -31,17 +120,34 @@ def create_product(
         'imageKey': image_key,
         'isActive': is_active,
         'createdAt': now,
-        'updatedAt': now
+        'updatedAt': now,
+        **active_attributes('PRODUCT', is_active)
     }
+    return item
+
+
+def create_product(
+    name: str,
+    base_buying_price: float,
+    base_selling_price: float,
+    discount_percent: Optional[float] = None,
+    image_key: Optional[str] = None,
+    is_active: bool = True
+) -> Dict[str, Any]:
+    """Create a new product"""
+    item = _new_product_item(name, base_buying_price, base_selling_price, discount_percent, image_key, is_active)
     
-    table = get_table()
-    table.put_item(Item=item)
+    # Write the product, its search index entries and the version bump together
+    transact_write(
+        [{'Put': {'Item': item}}, catalog_version_bump()]
+        + search_index.token_puts('PRODUCT', item['id'], name)
+    )
+    catalog_cache.invalidate()
     
     return item
 
 
-def get_product(product_id: str) -> Optional[Dict[str, Any]]:
-    """Get a product by ID"""
+def _load_product(product_id: str) -> Optional[Dict[str, Any]]:
     table = get_table()
     response = table.get_item(
         Key={
@@ -52,7 +158,28 @@ def get_product(product_id: str) -> Optional[Dict[str, Any]]:
     return response.get('Item')
 
 
-def update_product(
+def _load_products_by_ids(product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    items = batch_get([{'pk': f'PRODUCT#{product_id}', 'sk': 'META'} for product_id in product_ids])
+    return {item['id']: item for item in items}
+
+
+def get_product(product_id: str) -> Optional[Dict[str, Any]]:
+    """Get a product by ID"""
+    return catalog_cache.get(product_id, lambda: _load_product(product_id))
+
+
+def get_products_by_ids(product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch many products with BatchGetItem, fetching duplicate IDs once.
+    
+    Returns:
+        Mapping of product ID to product; missing products are absent
+    """
+    unique_ids = list(dict.fromkeys(product_ids))
+    return catalog_cache.get_many(unique_ids, _load_products_by_ids)
+
+
+def _product_update_params(
     product_id: str,
     name: Optional[str] = None,
     base_buying_price: Optional[float] = None,
@@ -61,10 +188,9 @@ def update_product(
     image_key: Optional[str] = None,
     is_active: Optional[bool] = None
 ) -> Optional[Dict[str, Any]]:
-    """Update a product"""
-    table = get_table()
-    
+    """Build the update_item parameters for the given changes; None when nothing changes"""
     update_expression_parts = []
+    remove_parts = []
     expression_attribute_names = {}
     expression_attribute_values = {}
     
@@ -92,59 +218,176 @@ def update_product(
     if is_active is not None:
         update_expression_parts.append('isActive = :isActive')
         expression_attribute_values[':isActive'] = is_active
+        # Keep ActiveEntityIndex membership in step with isActive
+        active_sets, active_removes, active_values = active_update('PRODUCT', is_active)
+        update_expression_parts.extend(active_sets)
+        remove_parts.extend(active_removes)
+        expression_attribute_values.update(active_values)
     
     if not update_expression_parts:
-        return get_product(product_id)
+        return None
     
     update_expression_parts.append('updatedAt = :updatedAt')
     expression_attribute_values[':updatedAt'] = datetime.now(timezone.utc).isoformat()
     
     update_expression = 'SET ' + ', '.join(update_expression_parts)
+    if remove_parts:
+        update_expression += ' REMOVE ' + ', '.join(remove_parts)
     
-    response = table.update_item(
-        Key={
+    params = {
+        'Key': {
             'pk': f'PRODUCT#{product_id}',
             'sk': 'META'
         },
-        UpdateExpression=update_expression,
-        ExpressionAttributeNames=expression_attribute_names if expression_attribute_names else None,
-        ExpressionAttributeValues=expression_attribute_values,
-        ReturnValues='ALL_NEW'
+        'UpdateExpression': update_expression,
+        'ExpressionAttributeValues': expression_attribute_values,
+        'ReturnValues': 'ALL_NEW'
+    }
+    # boto3 rejects ExpressionAttributeNames=None, so only pass it when used
+    if expression_attribute_names:
+        params['ExpressionAttributeNames'] = expression_attribute_names
+    return params
+
+
+def update_product(
+    product_id: str,
+    name: Optional[str] = None,
+    base_buying_price: Optional[float] = None,
+    base_selling_price: Optional[float] = None,
+    discount_percent: Optional[float] = None,
+    image_key: Optional[str] = None,
+    is_active: Optional[bool] = None
+) -> Optional[Dict[str, Any]]:
+    """Update a product"""
+    table = get_table()
+    
+    params = _product_update_params(
+        product_id, name, base_buying_price, base_selling_price, discount_percent, image_key, is_active
     )
+    if params is None:
+        return get_product(product_id)
+    
+    # A rename has to replace the search index entries of the old name
+    previous = _load_product(product_id) if name is not None else None
+    
+    response = table.update_item(**params)
+    
+    if name is not None:
+        search_index.reindex('PRODUCT', product_id, previous.get('name') if previous else None, name)
+    
+    table.update_item(**catalog_version_bump()['Update'])
+    catalog_cache.invalidate()
     
     return response.get('Attributes')
 
 
-def list_products(
-    search: Optional[str] = None,
-    include_inactive: bool = False
-) -> List[Dict[str, Any]]:
-    """List all products with optional filtering"""
-    table = get_table()
-    
-    # Use GSI to query by entityType
-    response = table.query(
-        IndexName='EntityTypeIndex',
-        KeyConditionExpression='entityType = :entityType',
-        ExpressionAttributeValues={
-            ':entityType': 'PRODUCT'
-        }
+def _product_filter(search: Optional[str], include_inactive: bool):
+    """Build the in-memory predicate applied to listed products"""
+    search_lower = search.lower() if search else None
+
+    def predicate(item: Dict[str, Any]) -> bool:
+        if not include_inactive and not item.get('isActive', True):
+            return False
+        if search_lower and search_lower not in item.get('name', '').lower():
+            return False
+        return True
+
+    return predicate
+
+
+def _iter_cached_products(start_key: Optional[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    products = catalog_cache.snapshot(
+        lambda: [product for product, _ in iter_entities('PRODUCT', active_only=True)]
     )
+    keyed = [
+        (product, {attr: product[attr] for attr in ENTITY_INDEX_KEY_ATTRIBUTES})
+        for product in products
+    ]
     
-    products = response.get('Items', [])
+    position = 0
+    if start_key:
+        position = next((i + 1 for i, (_, key) in enumerate(keyed) if key == start_key), None)
+        if position is None:
+            # The product the cursor points at is gone; resume from DynamoDB
+            yield from iter_entities('PRODUCT', start_key, active_only=True)
+            return
     
-    # Filter by active status
-    if not include_inactive:
-        products = [p for p in products if p.get('isActive', True)]
+    yield from keyed[position:]
+
+
+def iter_products(
+    start_key: Optional[Dict[str, Any]] = None,
+    fields: Optional[List[str]] = None,
+    active_only: bool = False
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Iterate over products by name, following every page.
+    
+    active_only reads the sparse ActiveEntityIndex instead of every product;
+    that listing is what the catalog cache holds, so cached items may carry
+    more than fields asked for.
+    """
+    if active_only and catalog_cache.enabled:
+        return _iter_cached_products(start_key)
+    return iter_entities('PRODUCT', start_key, active_only=active_only, fields=fields)
+
+
+def list_products_page(
+    limit: Optional[int] = None,
+    start_key: Optional[Dict[str, Any]] = None,
+    search: Optional[str] = None,
+    include_inactive: bool = False,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    List one page of products, returning the items and the key to resume from.
+    
+    A search is answered from the name search index rather than by reading
+    every product; otherwise only active products are read unless
+    include_inactive is set. fields names the stored attributes the caller needs;
+    items may carry more, and callers trim them.
+    """
+    if fields is not None:
+        fields = list(dict.fromkeys([*fields, *PRODUCT_FILTER_ATTRIBUTES]))
     
-    # Filter by search term
     if search:
-        search_lower = search.lower()
-        products = [p for p in products if search_lower in p.get('name', '').lower()]
+        items = search_index.hydrate(
+            search_index.iter_matches('PRODUCT', search, start_key),
+            get_products_by_ids
+        )
+    else:
+        items = iter_products(start_key, fields, active_only=not include_inactive)
     
+    return take_page(
+        items,
+        limit=limit,
+        predicate=_product_filter(search, include_inactive)
+    )
+
+
+def list_products(
+    search: Optional[str] = None,
+    include_inactive: bool = False
+) -> List[Dict[str, Any]]:
+    """List all products with optional filtering"""
+    products, _ = list_products_page(search=search, include_inactive=include_inactive)
     return products
 
 
+def rebuild_product_search_index() -> int:
+    """Index the names of all existing products; returns how many were indexed"""
+    return search_index.rebuild('PRODUCT', (product for product, _ in iter_products()))
+
+
+def backfill_active_products() -> int:
+    """Add active products created before ActiveEntityIndex to it; returns how many were added"""
+    count = backfill_active('PRODUCT')
+    if count:
+        get_table().update_item(**catalog_version_bump()['Update'])
+        catalog_cache.invalidate()
+    return count
+
+
 def compute_effective_price(base_price: float, discount_percent: Optional[float]) -> float:
     """Compute effective price after discount"""
     from decimal import Decimal
@@ -157,3 +400,248 @@ def compute_effective_price(base_price: float, discount_percent: Optional[float]
         return base_price
     return base_price * (1 - discount_percent / 100)
 
+
+def exact_effective_price(base_price: Decimal, discount_percent: Optional[Decimal]) -> Decimal:
+    """Effective price after discount in Decimal, rounded to PRICE_QUANTUM"""
+    price = Decimal(str(base_price))
+    if discount_percent:
+        price = price * (1 - Decimal(str(discount_percent)) / 100)
+    return price.quantize(PRICE_QUANTUM, rounding=ROUND_HALF_UP)
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    return getattr(error, 'response', {}).get('Error', {}).get('Code')
+
+
+def _update_product_item(params: Dict[str, Any]) -> None:
+    # Runs on worker threads, where only the client (not the Table resource) is safe to share
+    get_client().update_item(TableName=get_table().name, **params)
+
+
+def _run_bounded(write: Callable[[Any], Dict[str, Any]], items: List[Any], max_workers: int) -> List[Dict[str, Any]]:
+    """Apply write to every item on at most max_workers threads, keeping order"""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(write, items))
+
+
+def _finish_bulk(results: List[Dict[str, Any]], statuses: Tuple[str, ...]) -> Dict[str, Any]:
+    """Bump the catalog version once if anything was written, and summarize"""
+    if any(result['status'] in ('created', 'updated') for result in results):
+        get_table().update_item(**catalog_version_bump()['Update'])
+        catalog_cache.invalidate()
+    summary = {'total': len(results), **{status: 0 for status in statuses}}
+    for result in results:
+        summary[result['status']] += 1
+    return {'summary': summary, 'results': results}
+
+
+def _check_bulk_size(count: int) -> None:
+    if count == 0:
+        raise ValueError('No products to change')
+    if count > MAX_BULK_PRODUCTS:
+        raise ValueError(f'A bulk change may touch at most {MAX_BULK_PRODUCTS} products')
+
+
+def _write_new_product(entry: Tuple[int, Dict[str, Any]]) -> Dict[str, Any]:
+    index, item = entry
+    try:
+        transact_write(
+            [{'Put': {'Item': item, 'ConditionExpression': 'attribute_not_exists(pk)'}}]
+            + search_index.token_puts('PRODUCT', item['id'], item['name'])
+        )
+        return {'index': index, 'id': item['id'], 'status': 'created'}
+    except Exception as e:
+        return {'index': index, 'status': 'failed', 'error': str(e), 'code': 'WRITE_FAILED'}
+
+
+def _write_product_changes(entry: Tuple[int, str, Dict[str, Any], Dict[str, Any]]) -> Dict[str, Any]:
+    index, product_id, changes, previous = entry
+    result = {'index': index, 'id': product_id}
+    params = _product_update_params(product_id, **changes)
+    if params is None:
+        return {**result, 'status': 'unchanged'}
+    
+    # Never recreate a product deleted since it was read
+    params['ConditionExpression'] = 'attribute_exists(pk)'
+    try:
+        _update_product_item(params)
+        return {**result, 'status': 'updated'}
+    except Exception as e:
+        if _error_code(e) == 'ConditionalCheckFailedException':
+            return {**result, 'status': 'failed', 'error': f'Product {product_id} not found', 'code': 'NOT_FOUND'}
+        return {**result, 'status': 'failed', 'error': str(e), 'code': 'WRITE_FAILED'}
+
+
+def bulk_upsert_products(
+    products: List[Dict[str, Any]],
+    max_workers: int = PRODUCT_BULK_MAX_WORKERS
+) -> Dict[str, Any]:
+    """
+    Create and update many products, writing in parallel.
+    
+    Entries with an id are PATCH /products/{id} payloads for that product,
+    entries without one are POST /products payloads, validated with the same
+    rules. Products to update are read in one batch first. Writes are
+    independent, so one failing does not stop the others, and the catalog
+    version is bumped (and the cache invalidated) once for the whole call.
+    
+    Returns:
+        {'summary': counts per status and total, 'results': one result per
+        entry in input order with index, id and status (created, updated,
+        unchanged, invalid or failed), plus error and code when not written}
+    
+    Raises:
+        ValueError: If there are no entries or more than MAX_BULK_PRODUCTS
+    """
+    _check_bulk_size(len(products))
+    
+    results: List[Optional[Dict[str, Any]]] = [None] * len(products)
+    creates = []
+    updates = []
+    seen_ids = set()
+    for index, body in enumerate(products):
+        product_id = body.get('id')
+        try:
+            if product_id in seen_ids:
+                raise ProductValidationError(f'Product {product_id} appears more than once')
+            if product_id:
+                seen_ids.add(product_id)
+                updates.append((index, product_id, validate_product_changes(body)))
+            else:
+                creates.append((index, _new_product_item(**validate_new_product(body))))
+        except ProductValidationError as e:
+            results[index] = {'index': index, 'id': product_id, 'status': 'invalid', 'error': str(e), 'code': e.code}
+    
+    # Current items, for the existence check and the old names of renames
+    existing = _load_products_by_ids([product_id for _, product_id, _ in updates])
+    writes = []
+    for index, product_id, changes in updates:
+        if product_id not in existing:
+            results[index] = {
+                'index': index, 'id': product_id, 'status': 'invalid',
+                'error': f'Product {product_id} not found', 'code': 'NOT_FOUND'
+            }
+            continue
+        writes.append((index, product_id, changes, existing[product_id]))
+    
+    for result in _run_bounded(_write_new_product, creates, max_workers):
+        results[result['index']] = result
+    for result in _run_bounded(_write_product_changes, writes, max_workers):
+        results[result['index']] = result
+    
+    # Renames are reindexed here: the index is written through the Table resource
+    for index, product_id, changes, previous in writes:
+        if results[index]['status'] == 'updated' and changes.get('name') is not None:
+            search_index.reindex('PRODUCT', product_id, previous.get('name'), changes['name'])
+    
+    return _finish_bulk(results, ('created', 'updated', 'unchanged', 'invalid', 'failed'))
+
+
+def _adjusted_price(price: Decimal, percent: Optional[float], amount: Optional[float]) -> Decimal:
+    if percent is not None:
+        price = price * (1 + Decimal(str(percent)) / 100)
+    if amount is not None:
+        price = price + Decimal(str(amount))
+    return price.quantize(PRICE_QUANTUM, rounding=ROUND_HALF_UP)
+
+
+def _write_price_change(entry: Tuple[Dict[str, Any], Dict[str, Dict[str, Decimal]]]) -> Dict[str, Any]:
+    product, prices = entry
+    result = {'id': product['id'], 'name': product.get('name'), 'prices': prices}
+    params = _product_update_params(product['id'], **{
+        _PRICE_ARGUMENTS[field]: change['to'] for field, change in prices.items()
+    })
+    
+    # Only apply the change to the prices it was computed from
+    conditions = ['attribute_exists(pk)']
+    for field, change in prices.items():
+        conditions.append(f'{field} = :previous{field}')
+        params['ExpressionAttributeValues'][f':previous{field}'] = change['from']
+    params['ConditionExpression'] = ' AND '.join(conditions)
+    
+    try:
+        _update_product_item(params)
+        return {**result, 'status': 'updated'}
+    except Exception as e:
+        if _error_code(e) == 'ConditionalCheckFailedException':
+            return {**result, 'status': 'failed', 'error': 'Product changed or was deleted during the update', 'code': 'CONFLICT'}
+        return {**result, 'status': 'failed', 'error': str(e), 'code': 'WRITE_FAILED'}
+
+
+def apply_price_rule(
+    fields: List[str],
+    percent: Optional[float] = None,
+    amount: Optional[float] = None,
+    search: Optional[str] = None,
+    product_ids: Optional[List[str]] = None,
+    include_inactive: bool = False,
+    dry_run: bool = False,
+    max_workers: int = PRODUCT_BULK_MAX_WORKERS
+) -> Dict[str, Any]:
+    """
+    Change the prices of many products by a percentage and/or fixed amount.
+    
+    Products are selected by product_ids, else by a name search, else all
+    of them (only active ones unless include_inactive). Their current
+    prices are read in one batch; each new price is the old one times
+    (1 + percent/100) plus amount, rounded to cents. Each product is
+    written with a condition on the prices it was computed from, so a
+    concurrent edit fails that product instead of being overwritten. The
+    catalog version is bumped once for the whole call.
+    
+    Args:
+        fields: Prices to change (baseSellingPrice and/or baseBuyingPrice)
+        dry_run: Compute and report the changes without writing
+    
+    Returns:
+        {'summary', 'results'}; each result has id, name, status (updated,
+        preview or failed) and prices {field: {'from', 'to'}}
+    
+    Raises:
+        ValueError: If no product or more than MAX_BULK_PRODUCTS match
+    """
+    if product_ids:
+        candidate_ids = list(dict.fromkeys(product_ids))
+    elif search:
+        matches, _ = list_products_page(search=search, include_inactive=include_inactive)
+        candidate_ids = [product['id'] for product in matches]
+    else:
+        candidate_ids = [
+            product['id'] for product, _ in iter_products(fields=['id'], active_only=not include_inactive)
+        ]
+    _check_bulk_size(len(candidate_ids))
+    
+    # Fresh reads, not the cache: the writes are conditioned on these prices
+    products = _load_products_by_ids(candidate_ids)
+    
+    results = []
+    writes = []
+    for product_id in candidate_ids:
+        product = products.get(product_id)
+        if product is None:
+            results.append({'id': product_id, 'status': 'failed', 'error': f'Product {product_id} not found', 'code': 'NOT_FOUND'})
+            continue
+        missing = [field for field in fields if product.get(field) is None]
+        if missing:
+            results.append({
+                'id': product_id, 'name': product.get('name'), 'status': 'failed',
+                'error': f'Product has no {missing[0]}', 'code': 'INVALID_INPUT'
+            })
+            continue
+        prices = {
+            field: {'from': product[field], 'to': _adjusted_price(product[field], percent, amount)}
+            for field in fields
+        }
+        negative = [field for field, change in prices.items() if change['to'] < 0]
+        if negative:
+            results.append({
+                'id': product_id, 'name': product.get('name'), 'prices': prices, 'status': 'failed',
+                'error': f'{negative[0]} would become negative', 'code': 'INVALID_INPUT'
+            })
+        elif dry_run:
+            results.append({'id': product_id, 'name': product.get('name'), 'prices': prices, 'status': 'preview'})
+        else:
+            writes.append((product, prices))
+    
+    results.extend(_run_bounded(_write_price_change, writes, max_workers))
+    return _finish_bulk(results, ('updated', 'preview', 'failed'))
@@ -0,0 +1,89 @@
+"""
+Sparse fieldsets for list responses.
+
+A fields=a,b,c query parameter names the attributes a client needs. The
+repositories turn the stored ones into a ProjectionExpression, adding any
+attribute they need themselves (keys to resume a page, attributes a filter
+looks at), and handlers trim each item to the requested fields at the end.
+
+DynamoDB bills a read by the size of the stored item whatever the
+projection, so this shrinks what crosses the network and what the Lambda
+parses and serializes rather than consumed read capacity.
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+# fields value asking for every attribute
+ALL_FIELDS = '*'
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a fields parameter names an unknown attribute"""
+    pass
+
+
+def parse_fields(
+    value: Optional[str],
+    allowed: Sequence[str],
+    default: Sequence[str]
+) -> Optional[List[str]]:
+    """
+    Parse a comma-separated fields parameter.
+
+    Returns:
+        The requested fields, default when the parameter is absent, or None
+        for '*' (every attribute)
+
+    Raises:
+        InvalidFieldsError: If a field is not in allowed
+    """
+    if value is None or not value.strip():
+        return list(default)
+    if value.strip() == ALL_FIELDS:
+        return None
+
+    fields = list(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def stored_fields(
+    fields: Optional[Iterable[str]],
+    computed: Mapping[str, Sequence[str]] = None
+) -> Optional[List[str]]:
+    """Replace computed response fields by the stored attributes they derive from"""
+    if fields is None:
+        return None
+    computed = computed or {}
+    result = []
+    for field in fields:
+        result.extend(computed.get(field, (field,)))
+    return list(dict.fromkeys(result))
+
+
+def projection_params(
+    fields: Optional[Iterable[str]],
+    required: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """
+    Build ProjectionExpression keyword arguments for a query or get.
+
+    Every attribute is aliased, so reserved words such as name need no
+    special care. Returns {} (all attributes) when fields is None.
+    """
+    if fields is None:
+        return {}
+    names = list(dict.fromkeys([*fields, *required]))
+    aliases = {f'#p{i}': name for i, name in enumerate(names)}
+    return {
+        'ProjectionExpression': ', '.join(aliases),
+        'ExpressionAttributeNames': aliases
+    }
+
+
+def project(item: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Trim an item to the requested fields (all of them when fields is None)"""
+    if fields is None:
+        return item
+    return {field: item[field] for field in fields if field in item}
@@ -0,0 +1,331 @@
+"""
+Pre-aggregated daily sales, maintained from the stream of order writes.
+
+Every new order is folded into three kinds of items with atomic ADD
+counters, keyed by the order's UTC day:
+
+    pk = SALES#DAILY               sk = <day>             whole-day totals
+    pk = SALES#DAY#<day>           sk = PRODUCT#<id>      per product for a day
+    pk = SALES#PRODUCT#<id>        sk = <day>             per day for a product
+
+so a date range of totals, a day's product breakdown or one product's
+history is a single query. Stream delivery is at-least-once and ADD is not
+idempotent, so the counters are updated in a transaction with a marker item
+(pk = ROLLUP#<orderId>) that may only be created once; a redelivered order
+fails the marker's condition and is skipped. Markers expire after
+ROLLUP_MARKER_TTL_DAYS, well past the stream's 24 hour retention.
+
+backfill_sales_rollups folds in orders from before the stream consumer
+existed. It cannot rely on expiring markers, since it reads every order
+ever written, so its own markers are permanent and it runs to completion
+only once (recorded in BACKFILL_STATE_KEY). Whole-day items record when an
+order was last folded into them (lastAppliedAt), which tells the backfill
+whether markers of orders counted by the stream may have expired.
+"""
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .dynamo_client import get_table
+from .event_feed import record_images
+from .pagination import iter_query
+from .transactions import transact_write, TransactionConflict
+
+ROLLUP_MARKER_TTL_DAYS = 7
+
+# TransactWriteItems accepts at most 100 operations, one of them the marker
+ROLLUP_MAX_UPDATES_PER_TRANSACTION = 99
+
+# Attempts when a transaction collides with a concurrent rollup update
+ROLLUP_MAX_ATTEMPTS = 5
+
+# Longest window get_daily_sales and get_product_sales will read
+MAX_REPORT_DAYS = 366
+
+DAILY_PK = 'SALES#DAILY'
+
+# Progress of backfill_sales_rollups: startedAt, then completedAt
+BACKFILL_STATE_KEY = {'pk': 'ROLLUP#BACKFILL', 'sk': 'STATE'}
+
+
+def order_day(order: Dict[str, Any]) -> str:
+    """UTC day (YYYY-MM-DD) an order is counted under"""
+    moment = datetime.fromisoformat(order['orderDate'].replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).date().isoformat()
+
+
+def _add_update(key: Dict[str, str], counters: Dict[str, Decimal], labels: Dict[str, str]) -> Dict[str, Any]:
+    """Build a transactional update adding counters and setting labels"""
+    names = {}
+    values = {}
+    adds = []
+    sets = []
+    for i, (attribute, amount) in enumerate(counters.items()):
+        names[f'#c{i}'] = attribute
+        values[f':c{i}'] = amount
+        adds.append(f'#c{i} :c{i}')
+    for i, (attribute, label) in enumerate(labels.items()):
+        names[f'#l{i}'] = attribute
+        values[f':l{i}'] = label
+        sets.append(f'#l{i} = :l{i}')
+
+    expression = 'ADD ' + ', '.join(adds)
+    if sets:
+        expression += ' SET ' + ', '.join(sets)
+    return {
+        'Update': {
+            'Key': key,
+            'UpdateExpression': expression,
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': values
+        }
+    }
+
+
+def order_rollup_updates(order: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Build the counter updates that fold one order into the rollups"""
+    day = order_day(order)
+    applied_at = datetime.now(timezone.utc).isoformat()
+    updates = [
+        _add_update(
+            {'pk': DAILY_PK, 'sk': day},
+            {
+                'orderCount': Decimal('1'),
+                'totalAmount': Decimal(str(order.get('totalAmount', 0))),
+                'paidNow': Decimal(str(order.get('paidNow', 0))),
+                'debtChange': Decimal(str(order.get('debtChange', 0))),
+                'discount': Decimal(str(order.get('discount', 0)))
+            },
+            {'day': day, 'lastAppliedAt': applied_at}
+        )
+    ]
+
+    # Lines of the same product are counted together
+    products: Dict[str, Dict[str, Any]] = {}
+    for line in order.get('items', []):
+        totals = products.setdefault(line['productId'], {
+            'name': line.get('productNameSnapshot'),
+            'quantity': Decimal('0'),
+            'revenue': Decimal('0')
+        })
+        totals['quantity'] += Decimal(str(line.get('quantity', 0)))
+        totals['revenue'] += Decimal(str(line.get('lineTotal', 0)))
+
+    for product_id, totals in products.items():
+        counters = {
+            'quantity': totals['quantity'],
+            'revenue': totals['revenue'],
+            'orderCount': Decimal('1')
+        }
+        labels = {'day': day, 'productId': product_id}
+        if totals['name']:
+            labels['productName'] = totals['name']
+        updates.append(_add_update({'pk': f'SALES#DAY#{day}', 'sk': f'PRODUCT#{product_id}'}, counters, labels))
+        updates.append(_add_update({'pk': f'SALES#PRODUCT#{product_id}', 'sk': day}, counters, labels))
+
+    return updates
+
+
+def apply_order(order: Dict[str, Any], permanent: bool = False) -> bool:
+    """
+    Fold an order into the rollups exactly once.
+
+    Orders needing more than one transaction are applied in chunks, each
+    with its own marker, so a retry after a partial failure only applies
+    the missing chunks. Markers expire after ROLLUP_MARKER_TTL_DAYS unless
+    permanent is set.
+
+    Returns:
+        True if anything was applied, False if the order was already counted
+    """
+    updates = order_rollup_updates(order)
+    expires_at = int(time.time()) + ROLLUP_MARKER_TTL_DAYS * 86400
+    applied = False
+
+    for chunk_number, start in enumerate(range(0, len(updates), ROLLUP_MAX_UPDATES_PER_TRANSACTION)):
+        marker_item = {'pk': f"ROLLUP#{order['id']}", 'sk': f'CHUNK#{chunk_number}'}
+        if not permanent:
+            marker_item['expiresAt'] = expires_at
+        marker = {
+            'Put': {
+                'Item': marker_item,
+                'ConditionExpression': 'attribute_not_exists(pk)'
+            }
+        }
+        chunk = updates[start:start + ROLLUP_MAX_UPDATES_PER_TRANSACTION]
+
+        for attempt in range(ROLLUP_MAX_ATTEMPTS):
+            try:
+                transact_write([marker] + chunk)
+                applied = True
+                break
+            except TransactionConflict as e:
+                if e.reasons[:1] == ['ConditionalCheckFailed']:
+                    break  # Counted by an earlier delivery
+                if attempt == ROLLUP_MAX_ATTEMPTS - 1:
+                    raise
+                time.sleep(0.05 * (2 ** attempt))
+
+    return applied
+
+
+def _is_new_order(record: Dict[str, Any]) -> bool:
+    if record.get('eventName') != 'INSERT':
+        return False
+    keys = record.get('dynamodb', {}).get('Keys', {})
+    return keys.get('sk', {}).get('S', '').startswith('ORDER#')
+
+
+def process_records(records: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Fold the new orders among stream records into the rollups.
+
+    Records are handled in order and any error propagates, so the stream
+    (or local feed) delivers the failed record again.
+
+    Returns:
+        {'applied', 'duplicates', 'skipped'} record counts
+    """
+    counts = {'applied': 0, 'duplicates': 0, 'skipped': 0}
+    for record in records:
+        if not _is_new_order(record):
+            counts['skipped'] += 1
+            continue
+        order, _ = record_images(record)
+        if apply_order(order):
+            counts['applied'] += 1
+        else:
+            counts['duplicates'] += 1
+    return counts
+
+
+def backfill_sales_rollups(now: Optional[datetime] = None) -> int:
+    """
+    Fold orders written before the rollups existed into them.
+
+    Scans the table for orders and applies each with a permanent marker,
+    so an interrupted backfill can be run again at any time. Once it has
+    completed, later calls do nothing: every newer order is counted by the
+    stream consumer, whose markers expire, and counting those orders again
+    would double them.
+
+    Returns:
+        The number of orders applied (0 once a backfill has completed)
+
+    Raises:
+        RuntimeError: If no backfill has started yet but an order was folded
+            into the rollups more than ROLLUP_MARKER_TTL_DAYS ago; its
+            marker may have expired, so it could be counted twice
+    """
+    table = get_table()
+    state = table.get_item(Key=BACKFILL_STATE_KEY).get('Item')
+    if state and state.get('completedAt'):
+        return 0
+
+    if state is None:
+        # The day of an order says nothing about when it was counted (orders
+        # may be backdated), so look at when each day was last applied
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - timedelta(days=ROLLUP_MARKER_TTL_DAYS)).isoformat()
+        older = next(iter_query(
+            table,
+            ('pk', 'sk'),
+            KeyConditionExpression='pk = :pk',
+            FilterExpression='lastAppliedAt < :cutoff',
+            ExpressionAttributeValues={':pk': DAILY_PK, ':cutoff': cutoff}
+        ), None)
+        if older:
+            raise RuntimeError(
+                f"Orders of {older[0]['sk']} were counted before {cutoff} and their markers may have expired; "
+                'a backfill would count those orders twice'
+            )
+        table.put_item(Item={**BACKFILL_STATE_KEY, 'startedAt': datetime.now(timezone.utc).isoformat()})
+
+    applied = 0
+    kwargs = {
+        'FilterExpression': 'entityType = :order',
+        'ExpressionAttributeValues': {':order': 'ORDER'}
+    }
+    while True:
+        response = table.scan(**kwargs)
+        for order in response.get('Items', []):
+            if apply_order(order, permanent=True):
+                applied += 1
+        if not response.get('LastEvaluatedKey'):
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    table.update_item(
+        Key=BACKFILL_STATE_KEY,
+        UpdateExpression='SET completedAt = :now',
+        ExpressionAttributeValues={':now': datetime.now(timezone.utc).isoformat()}
+    )
+    return applied
+
+
+def _validate_window(date_from: str, date_to: str) -> None:
+    try:
+        first = date.fromisoformat(date_from)
+        last = date.fromisoformat(date_to)
+    except ValueError:
+        raise ValueError("from and to must be dates (YYYY-MM-DD)")
+    if first > last:
+        raise ValueError("from must not be after to")
+    if (last - first).days >= MAX_REPORT_DAYS:
+        raise ValueError(f"The window may span at most {MAX_REPORT_DAYS} days")
+
+
+def _without_keys(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in item.items() if name not in ('pk', 'sk', 'lastAppliedAt')}
+
+
+def _query_days(pk: str, date_from: str, date_to: str) -> List[Dict[str, Any]]:
+    _validate_window(date_from, date_to)
+    return [
+        _without_keys(item)
+        for item, _ in iter_query(
+            get_table(),
+            ('pk', 'sk'),
+            KeyConditionExpression='pk = :pk AND sk BETWEEN :from AND :to',
+            ExpressionAttributeValues={':pk': pk, ':from': date_from, ':to': date_to}
+        )
+    ]
+
+
+def get_daily_sales(date_from: str, date_to: str) -> List[Dict[str, Any]]:
+    """
+    Get whole-day totals for an inclusive window of days, oldest first.
+
+    Days without orders are absent.
+
+    Raises:
+        ValueError: If the window is invalid or longer than MAX_REPORT_DAYS
+    """
+    return _query_days(DAILY_PK, date_from, date_to)
+
+
+def get_product_sales(product_id: str, date_from: str, date_to: str) -> List[Dict[str, Any]]:
+    """Get one product's per-day totals for an inclusive window of days, oldest first"""
+    return _query_days(f'SALES#PRODUCT#{product_id}', date_from, date_to)
+
+
+def get_day_product_sales(day: str) -> List[Dict[str, Any]]:
+    """Get the per-product totals of one day"""
+    _validate_window(day, day)
+    return [
+        _without_keys(item)
+        for item, _ in iter_query(
+            get_table(),
+            ('pk', 'sk'),
+            KeyConditionExpression='pk = :pk',
+            ExpressionAttributeValues={':pk': f'SALES#DAY#{day}'}
+        )
+    ]
+
+
+def default_report_window(days: int = 30, today: Optional[date] = None) -> Tuple[str, str]:
+    """The window of the last days days up to today (UTC), as (from, to)"""
+    today = today or datetime.now(timezone.utc).date()
+    return (today - timedelta(days=days - 1)).isoformat(), today.isoformat()
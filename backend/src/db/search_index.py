@@ -0,0 +1,149 @@
+"""
+Name search index for products and customers.
+
+Every word of an entity's name is stored as its own item:
+
+    pk = SEARCH#<entityType>#<first letter>    sk = <word>#<name>#<entityId>
+
+so a search term is answered with one begins_with query on the sort key,
+reading only the matching words instead of every entity. Words are
+lowercased; a term matches names containing a word that starts with it,
+and hits for the same word come back ordered by name. Names are limited
+to MAX_NAME_LENGTH characters so that the sort key stays under DynamoDB's
+1024 byte limit and an entity with its index items fits in one transaction.
+"""
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .dynamo_client import get_table
+from .pagination import iter_query
+
+SEARCH_ENTITY_TYPE = 'SEARCH_TOKEN'
+
+# Matches fetched per BatchGetItem when resolving search hits to entities
+HYDRATE_BATCH_SIZE = 25
+
+# Longest indexed name: at most 50 words, and 4 bytes per character for both
+# the word and the name in the sort key
+MAX_NAME_LENGTH = 100
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into unique lowercase words, in order of appearance"""
+    return list(dict.fromkeys(_WORD.findall((text or '').lower())))
+
+
+def _token_key(entity_type: str, token: str, name: str, entity_id: str) -> Dict[str, str]:
+    return {
+        'pk': f'SEARCH#{entity_type}#{token[0]}',
+        'sk': f'{token}#{name.lower()}#{entity_id}'
+    }
+
+
+def _token_item(entity_type: str, token: str, name: str, entity_id: str) -> Dict[str, Any]:
+    # No 'name' attribute, so token items stay out of EntityTypeIndex
+    return {
+        **_token_key(entity_type, token, name, entity_id),
+        'entityType': SEARCH_ENTITY_TYPE,
+        'indexedType': entity_type,
+        'entityId': entity_id,
+        'token': token
+    }
+
+
+def token_puts(entity_type: str, entity_id: str, name: str) -> List[Dict[str, Any]]:
+    """Build transactional Put operations indexing an entity's name"""
+    return [
+        {'Put': {'Item': _token_item(entity_type, token, name, entity_id)}}
+        for token in tokenize(name)
+    ]
+
+
+def reindex(entity_type: str, entity_id: str, old_name: Optional[str], new_name: Optional[str]) -> None:
+    """Replace the index items of an entity after its name changed"""
+    if old_name == new_name:
+        return
+
+    with get_table().batch_writer() as batch:
+        for token in tokenize(old_name):
+            batch.delete_item(Key=_token_key(entity_type, token, old_name, entity_id))
+        for token in tokenize(new_name):
+            batch.put_item(Item=_token_item(entity_type, token, new_name, entity_id))
+
+
+def rebuild(entity_type: str, entities: Iterable[Dict[str, Any]]) -> int:
+    """
+    Write index items for existing entities (e.g. those created before the
+    index existed). Safe to re-run; returns the number of entities indexed.
+    """
+    count = 0
+    with get_table().batch_writer() as batch:
+        for entity in entities:
+            for token in tokenize(entity.get('name')):
+                batch.put_item(Item=_token_item(entity_type, token, entity['name'], entity['id']))
+            count += 1
+    return count
+
+
+def iter_matches(
+    entity_type: str,
+    search: str,
+    start_key: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Iterate over IDs of entities with a word starting with the search term.
+
+    For multi-word terms the longest word is looked up; callers are expected
+    to check the full term against the entity. Yields (entity_id, key) pairs
+    suitable for take_page.
+
+    An entity with several words starting with the term (e.g. "Coca Cola"
+    for "co") has one index hit per word. Only the hit for its first such
+    word in sort key order is yielded, so the entity appears once even when
+    the hits fall on different pages.
+    """
+    tokens = tokenize(search)
+    if not tokens:
+        return
+    lead = max(tokens, key=len)
+
+    for item, key in iter_query(
+        get_table(),
+        ('pk', 'sk'),
+        start_key=start_key,
+        KeyConditionExpression='pk = :pk AND begins_with(sk, :prefix)',
+        ExpressionAttributeValues={
+            ':pk': f'SEARCH#{entity_type}#{lead[0]}',
+            ':prefix': lead
+        }
+    ):
+        # sk is <word>#<lowercased name>#<entityId>; words never contain '#'
+        token = item['token']
+        name = item['sk'][len(token) + 1:item['sk'].rindex('#')]
+        if token != min(word for word in tokenize(name) if word.startswith(lead)):
+            continue
+        yield item['entityId'], key
+
+
+def hydrate(
+    matches: Iterator[Tuple[str, Dict[str, Any]]],
+    fetch_by_ids: Callable[[List[str]], Dict[str, Dict[str, Any]]],
+    batch_size: int = HYDRATE_BATCH_SIZE
+) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Resolve (entity_id, key) matches into (entity, key) pairs in batches"""
+    pending = []
+
+    def flush():
+        entities = fetch_by_ids([entity_id for entity_id, _ in pending])
+        for entity_id, key in pending:
+            if entity_id in entities:
+                yield entities[entity_id], key
+        pending.clear()
+
+    for match in matches:
+        pending.append(match)
+        if len(pending) >= batch_size:
+            yield from flush()
+    if pending:
+        yield from flush()
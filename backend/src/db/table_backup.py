@@ -0,0 +1,342 @@
+"""
+Export of the whole table to gzipped JSONL files, and restore from them.
+
+An export is a parallel Scan: the table is split into total_segments
+segments (Segment/TotalSegments) scanned by a pool of workers, each writing
+its items into one shard per entity type:
+
+    <directory>/export.json                              parameters
+    <directory>/data/<ENTITY_TYPE>/segment-0003.jsonl.gz items
+    <directory>/checkpoints/segment-0003.json            progress
+    <directory>/manifest.json                            written when complete
+
+Items are stored in DynamoDB JSON ({"S": ...}, {"N": ...}), exactly as the
+low-level client returns them, so nothing is lost or converted. The entity
+type is the entityType attribute, or the pk prefix for items without one
+(CATALOG, SALES, ROLLUP).
+
+Every scanned page is appended to the shards as its own gzip member, and
+then the segment's checkpoint is replaced with the page's LastEvaluatedKey
+and the shard sizes. Running the export again into the same directory
+resumes each segment from its checkpoint. Shards are first cut back to the
+recorded sizes, which drops anything written after the last checkpoint.
+
+A Scan is not a point-in-time snapshot: writes made while it runs may or
+may not be included. Use on-demand backups or point-in-time recovery when
+that matters.
+
+Restore reads a complete export's shards in parallel and writes their
+items with BatchWriteItem. Puts overwrite items with the same key, so a
+restore can simply be run again after an interruption.
+"""
+import base64
+import gzip
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .dynamo_client import get_table, create_raw_client
+
+EXPORT_FORMAT_VERSION = 1
+
+DEFAULT_TOTAL_SEGMENTS = 8
+DEFAULT_WORKERS = 8
+
+# BatchWriteItem accepts at most 25 items per request
+BATCH_WRITE_CHUNK_SIZE = 25
+BATCH_WRITE_MAX_ATTEMPTS = 8
+
+_UNSAFE_NAME = re.compile(r'[^A-Za-z0-9_-]')
+
+
+def item_entity_type(item: Dict[str, Any]) -> str:
+    """Shard name of a raw (DynamoDB JSON) item"""
+    entity_type = item.get('entityType', {}).get('S') or item.get('pk', {}).get('S', '').split('#', 1)[0]
+    return _UNSAFE_NAME.sub('_', entity_type) or 'UNKNOWN'
+
+
+def _map_values(value: Any, convert) -> Any:
+    """Apply convert to the B/BS parts of an attribute value, at any depth"""
+    (kind, inner), = value.items()
+    if kind == 'B':
+        return {kind: convert(inner)}
+    if kind == 'BS':
+        return {kind: [convert(part) for part in inner]}
+    if kind == 'M':
+        return {kind: {name: _map_values(part, convert) for name, part in inner.items()}}
+    if kind == 'L':
+        return {kind: [_map_values(part, convert) for part in inner]}
+    return value
+
+
+def encode_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Make a raw item JSON-serializable (binary values become base64)"""
+    return {name: _map_values(value, lambda data: base64.b64encode(data).decode('ascii')) for name, value in item.items()}
+
+
+def decode_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Reverse encode_item"""
+    return {name: _map_values(value, base64.b64decode) for name, value in item.items()}
+
+
+def read_shard(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the raw items of a shard"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield decode_item(json.loads(line))
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Replace a JSON file atomically"""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def _segment_name(segment: int) -> str:
+    return f'segment-{segment:04d}'
+
+
+def _segment_shards(directory: str, segment: int) -> List[str]:
+    """Paths (relative to directory, '/'-separated) of the shards a segment has written"""
+    data = os.path.join(directory, 'data')
+    if not os.path.isdir(data):
+        return []
+    name = f'{_segment_name(segment)}.jsonl.gz'
+    return sorted(
+        f'data/{entity_type}/{name}'
+        for entity_type in os.listdir(data)
+        if os.path.exists(os.path.join(data, entity_type, name))
+    )
+
+
+def _rewind_segment(directory: str, segment: int, sizes: Dict[str, int]) -> None:
+    """Cut a segment's shards back to their sizes at the last checkpoint"""
+    for shard in _segment_shards(directory, segment):
+        path = os.path.join(directory, shard)
+        if shard not in sizes:
+            os.remove(path)
+        elif os.path.getsize(path) < sizes[shard]:
+            raise RuntimeError(f'{path} is shorter than its checkpoint; delete the export and start over')
+        elif os.path.getsize(path) > sizes[shard]:
+            with open(path, 'r+b') as f:
+                f.truncate(sizes[shard])
+
+
+def _append_page(directory: str, segment: int, items: List[Dict[str, Any]], checkpoint: Dict[str, Any]) -> None:
+    """Append one scanned page to the segment's shards, as a gzip member per shard"""
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for item in items:
+        by_type.setdefault(item_entity_type(item), []).append(item)
+
+    for entity_type, typed_items in by_type.items():
+        shard = f'data/{entity_type}/{_segment_name(segment)}.jsonl.gz'
+        path = os.path.join(directory, shard)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines = ''.join(json.dumps(encode_item(item), separators=(',', ':')) + '\n' for item in typed_items)
+        with open(path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='ab') as f:
+                f.write(lines.encode('utf-8'))
+            # On disk before the checkpoint that counts it
+            raw.flush()
+            os.fsync(raw.fileno())
+        checkpoint['counts'][entity_type] = checkpoint['counts'].get(entity_type, 0) + len(typed_items)
+        checkpoint['sizes'][shard] = os.path.getsize(path)
+
+
+def _export_segment(
+    client,
+    directory: str,
+    table_name: str,
+    segment: int,
+    total_segments: int,
+    page_size: Optional[int]
+) -> Dict[str, Any]:
+    """Scan one segment into its shards, resuming from its checkpoint"""
+    checkpoint_path = os.path.join(directory, 'checkpoints', f'{_segment_name(segment)}.json')
+    checkpoint = _read_json(checkpoint_path) or {
+        'segment': segment, 'done': False, 'lastEvaluatedKey': None, 'counts': {}, 'sizes': {}
+    }
+    if checkpoint['done']:
+        return checkpoint
+    _rewind_segment(directory, segment, checkpoint['sizes'])
+
+    params = {'TableName': table_name, 'Segment': segment, 'TotalSegments': total_segments}
+    if page_size:
+        params['Limit'] = page_size
+    if checkpoint['lastEvaluatedKey']:
+        params['ExclusiveStartKey'] = decode_item(checkpoint['lastEvaluatedKey'])
+
+    while True:
+        response = client.scan(**params)
+        _append_page(directory, segment, response.get('Items', []), checkpoint)
+
+        last_key = response.get('LastEvaluatedKey')
+        checkpoint['lastEvaluatedKey'] = encode_item(last_key) if last_key else None
+        checkpoint['done'] = not last_key
+        _write_json(checkpoint_path, checkpoint)
+        if not last_key:
+            return checkpoint
+        params['ExclusiveStartKey'] = last_key
+
+
+def export_table(
+    directory: str,
+    total_segments: int = DEFAULT_TOTAL_SEGMENTS,
+    max_workers: int = DEFAULT_WORKERS,
+    table_name: Optional[str] = None,
+    page_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Export the table (or resume an interrupted export) into directory.
+
+    Args:
+        total_segments: Parallel scan segments; fixed for the life of an export
+        max_workers: Segments scanned at once
+        table_name: Table to export (default: the app table)
+        page_size: Scan Limit per request (default: DynamoDB's 1 MB pages)
+
+    Returns:
+        The manifest: counts and shard paths per entity type
+
+    Raises:
+        ValueError: If directory holds an export of another table or with
+            another number of segments
+    """
+    table_name = table_name or get_table().name
+    os.makedirs(os.path.join(directory, 'checkpoints'), exist_ok=True)
+
+    manifest_path = os.path.join(directory, 'manifest.json')
+    manifest = _read_json(manifest_path)
+    parameters = _read_json(os.path.join(directory, 'export.json'))
+    if parameters is None:
+        parameters = {
+            'formatVersion': EXPORT_FORMAT_VERSION,
+            'table': table_name,
+            'totalSegments': total_segments,
+            'startedAt': datetime.now(timezone.utc).isoformat()
+        }
+        _write_json(os.path.join(directory, 'export.json'), parameters)
+    elif (parameters['table'], parameters['totalSegments']) != (table_name, total_segments):
+        raise ValueError(
+            f"{directory} holds an export of {parameters['table']} in {parameters['totalSegments']} segments"
+        )
+    if manifest is not None:
+        return manifest
+
+    client = create_raw_client()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        checkpoints = list(executor.map(
+            lambda segment: _export_segment(client, directory, table_name, segment, total_segments, page_size),
+            range(total_segments)
+        ))
+
+    entity_types: Dict[str, Dict[str, Any]] = {}
+    for checkpoint in checkpoints:
+        for entity_type, count in checkpoint['counts'].items():
+            entry = entity_types.setdefault(entity_type, {'items': 0, 'shards': []})
+            entry['items'] += count
+        for shard in checkpoint['sizes']:
+            entity_types[shard.split('/')[1]]['shards'].append(shard)
+
+    manifest = {
+        **parameters,
+        'finishedAt': datetime.now(timezone.utc).isoformat(),
+        'itemCount': sum(entry['items'] for entry in entity_types.values()),
+        'entityTypes': {name: entity_types[name] for name in sorted(entity_types)}
+    }
+    _write_json(manifest_path, manifest)
+    return manifest
+
+
+def _batch_write(client, table_name: str, items: List[Dict[str, Any]]) -> None:
+    """Put up to BATCH_WRITE_CHUNK_SIZE raw items, retrying unprocessed ones with backoff"""
+    request_items = {table_name: [{'PutRequest': {'Item': item}} for item in items]}
+    for attempt in range(BATCH_WRITE_MAX_ATTEMPTS):
+        response = client.batch_write_item(RequestItems=request_items)
+        request_items = response.get('UnprocessedItems') or {}
+        if not request_items:
+            return
+        time.sleep(min(0.05 * (2 ** attempt), 2))
+    raise RuntimeError('BatchWriteItem left unprocessed items after retries')
+
+
+def _chunks(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _restore_shard(client, directory: str, table_name: str, shard: str) -> int:
+    count = 0
+    for chunk in _chunks(read_shard(os.path.join(directory, shard)), BATCH_WRITE_CHUNK_SIZE):
+        _batch_write(client, table_name, chunk)
+        count += len(chunk)
+    return count
+
+
+def restore_table(
+    directory: str,
+    max_workers: int = DEFAULT_WORKERS,
+    table_name: Optional[str] = None,
+    entity_types: Optional[Iterable[str]] = None,
+    exclude_types: Iterable[str] = ()
+) -> Dict[str, int]:
+    """
+    Write the items of a complete export into a table.
+
+    Shards are restored in parallel, each streamed in BatchWriteItem
+    requests of BATCH_WRITE_CHUNK_SIZE.
+
+    Args:
+        max_workers: Shards restored at once
+        table_name: Target table (default: the app table)
+        entity_types: Only restore these entity types (default: all)
+        exclude_types: Entity types to skip
+
+    Returns:
+        Items written per entity type
+
+    Raises:
+        ValueError: If directory holds no complete export
+    """
+    manifest = _read_json(os.path.join(directory, 'manifest.json'))
+    if manifest is None:
+        raise ValueError(f'{directory} holds no complete export')
+    table_name = table_name or get_table().name
+
+    wanted = set(entity_types) if entity_types is not None else set(manifest['entityTypes'])
+    wanted -= set(exclude_types)
+    shards: List[Tuple[str, str]] = [
+        (entity_type, shard)
+        for entity_type, entry in manifest['entityTypes'].items() if entity_type in wanted
+        for shard in entry['shards']
+    ]
+
+    client = create_raw_client()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        counts = list(executor.map(lambda pair: _restore_shard(client, directory, table_name, pair[1]), shards))
+
+    restored: Dict[str, int] = {}
+    for (entity_type, _), count in zip(shards, counts):
+        restored[entity_type] = restored.get(entity_type, 0) + count
+    return restored
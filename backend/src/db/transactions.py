@@ -0,0 +1,46 @@
+from typing import Any, Dict, List, Optional
+from src.utils.lazy_import import lazy_module
+from .dynamo_client import get_table, get_client
+
+botocore_exceptions = lazy_module('botocore.exceptions')
+
+
+class TransactionConflict(Exception):
+    """Raised when a transaction is cancelled; reasons holds one code per operation"""
+
+    def __init__(self, reasons: List[Optional[str]]):
+        self.reasons = reasons
+        super().__init__(f'Transaction cancelled: {reasons}')
+
+
+def transact_write(operations: List[Dict[str, Any]]) -> None:
+    """
+    Run TransactWriteItems against the app table.
+
+    Each operation is written like a Table call, e.g.
+    {'Put': {'Item': {...}, 'ConditionExpression': ...}} or
+    {'Update': {'Key': {...}, 'UpdateExpression': ..., ...}}; values are
+    plain Python/Decimal (the resource's client marshals them) and the
+    table name is filled in.
+
+    Raises:
+        TransactionConflict: If any condition fails or the transaction is cancelled
+    """
+    table_name = get_table().name
+    transact_items = []
+
+    for operation in operations:
+        (action, params), = operation.items()
+        transact_items.append({action: {'TableName': table_name, **params}})
+
+    client = get_client()
+    try:
+        client.transact_write_items(TransactItems=transact_items)
+    except botocore_exceptions.ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+            raise
+        reasons = [
+            reason.get('Code') if reason.get('Code') != 'None' else None
+            for reason in e.response.get('CancellationReasons', [])
+        ]
+        raise TransactionConflict(reasons)
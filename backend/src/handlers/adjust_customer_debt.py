@@ -1,6 +1,6 @@
 import json
 from src.db.debt_repo import create_debt_adjustment
-from src.db.customer_repo import get_customer
+from src.db.customer_repo import CustomerNotFoundError
 from src.utils.response import success_response, error_response
 from src.auth import extract_and_verify_token, AuthenticationError
 
@@ -19,11 +19,6 @@ def handler(event, context):
         if not customer_id:
             return error_response(400, 'Customer ID is required', 'MISSING_PARAMETER')
         
-        # Verify customer exists
-        customer = get_customer(customer_id)
-        if not customer:
-            return error_response(404, f'Customer {customer_id} not found', 'NOT_FOUND')
-        
         body = json.loads(event.get('body', '{}'))
         
         # Validate required fields
@@ -41,22 +36,21 @@ def handler(event, context):
         except (ValueError, TypeError):
             return error_response(400, 'amount must be a valid number', 'INVALID_INPUT')
         
-        # Create adjustment
+        # Create adjustment; the transaction checks the customer exists and
+        # the new balance comes back with it
         adjustment = create_debt_adjustment(
             customer_id=customer_id,
             amount=amount,
             reason=reason
         )
         
-        # Get updated customer to get new totalDebt
-        updated_customer = get_customer(customer_id)
-        new_total_debt = updated_customer.get('totalDebt', 0) if updated_customer else 0
-        
         return success_response(201, {
             **adjustment,
-            'newTotalDebt': new_total_debt
+            'newTotalDebt': adjustment['balanceAfter']
         })
     
+    except CustomerNotFoundError as e:
+        return error_response(404, str(e), 'NOT_FOUND')
     except json.JSONDecodeError:
         return error_response(400, 'Invalid JSON in request body', 'INVALID_JSON')
     except Exception as e:
@@ -0,0 +1,38 @@
+import json
+from src.db.product_repo import bulk_upsert_products, apply_price_rule
+from src.utils.product_validation import validate_price_rule, ProductValidationError
+from src.utils.response import success_response, error_response
+from src.auth import extract_and_verify_token, AuthenticationError
+
+
+def handler(event, context):
+    """Create/update many products, or change prices by a rule"""
+    # Verify JWT token
+    try:
+        extract_and_verify_token(event)
+    except AuthenticationError as e:
+        return error_response(401, str(e), 'UNAUTHORIZED')
+
+    try:
+        body = json.loads(event.get('body', '{}'))
+
+        # {"products": [...]} upserts, {"rule": {...}} changes prices
+        if isinstance(body.get('rule'), dict):
+            try:
+                rule = validate_price_rule(body['rule'])
+            except ProductValidationError as e:
+                return error_response(400, str(e), e.code)
+            report = apply_price_rule(**rule)
+        elif isinstance(body.get('products'), list) and all(isinstance(p, dict) for p in body['products']):
+            report = bulk_upsert_products(body['products'])
+        else:
+            return error_response(400, 'Send a products array or a rule object', 'MISSING_FIELD')
+
+        return success_response(200, report, event=event)
+
+    except json.JSONDecodeError:
+        return error_response(400, 'Invalid JSON in request body', 'INVALID_JSON')
+    except ValueError as e:
+        return error_response(400, str(e), 'INVALID_INPUT')
+    except Exception as e:
+        return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
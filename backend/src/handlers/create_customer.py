@@ -1,5 +1,6 @@
 import json
 from src.db.customer_repo import create_customer
+from src.db.search_index import MAX_NAME_LENGTH
 from src.utils.response import success_response, error_response
 from src.auth import extract_and_verify_token, AuthenticationError
 
@@ -22,6 +23,8 @@ def handler(event, context):
         
         if not name:
             return error_response(400, 'name is required', 'MISSING_FIELD')
+        if len(str(name)) > MAX_NAME_LENGTH:
+            return error_response(400, f'name must be at most {MAX_NAME_LENGTH} characters', 'INVALID_INPUT')
         if not location:
             return error_response(400, 'location is required', 'MISSING_FIELD')
         if not phone:
@@ -0,0 +1,45 @@
+from src.db.exports import run_export
+from src.utils.response import success_response, error_response
+from src.auth import extract_and_verify_token, AuthenticationError
+
+
+def handler(event, context):
+    """Export products or customers to a file and return its download URL"""
+    # Handle CORS preflight (OPTIONS) requests
+    if event.get('requestContext', {}).get('http', {}).get('method') == 'OPTIONS' or \
+       event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': ''
+        }
+
+    # Verify JWT token
+    try:
+        extract_and_verify_token(event)
+    except AuthenticationError as e:
+        return error_response(401, str(e), 'UNAUTHORIZED')
+
+    try:
+        dataset = (event.get('pathParameters') or {}).get('dataset')
+        query_params = event.get('queryStringParameters') or {}
+
+        report = run_export(
+            dataset,
+            export_format=query_params.get('format', 'csv').lower(),
+            include_inactive=query_params.get('includeInactive', 'false').lower() == 'true',
+            # Customer exports list debtors unless allCustomers=true
+            with_debt_only=query_params.get('allCustomers', 'false').lower() != 'true'
+        )
+
+        return success_response(200, report, event=event)
+
+    except ValueError as e:
+        return error_response(400, str(e), 'INVALID_INPUT')
+    except Exception as e:
+        return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
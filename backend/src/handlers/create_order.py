@@ -1,5 +1,7 @@
 import json
 from src.db.order_repo import create_order
+from src.db.customer_repo import CustomerNotFoundError
+from src.utils.order_validation import validate_order, OrderValidationError
 from src.utils.response import success_response, error_response
 from src.auth import extract_and_verify_token, AuthenticationError
 
@@ -29,74 +31,21 @@ def handler(event, context):
     try:
         body = json.loads(event.get('body', '{}'))
         
-        # Validate required fields
-        customer_id = body.get('customerId')
-        items = body.get('items', [])
-        
-        if not customer_id:
-            return error_response(400, 'customerId is required', 'MISSING_FIELD')
-        if not items or len(items) == 0:
-            return error_response(400, 'items array is required and cannot be empty', 'MISSING_FIELD')
-        
-        # Validate items
-        for item in items:
-            if not item.get('productId'):
-                return error_response(400, 'Each item must have a productId', 'INVALID_INPUT')
-            quantity = item.get('quantity')
-            if quantity is None:
-                return error_response(400, 'Each item must have a quantity', 'INVALID_INPUT')
-            try:
-                quantity = float(quantity)
-                if quantity <= 0:
-                    return error_response(400, 'Quantity must be positive', 'INVALID_INPUT')
-                item['quantity'] = quantity
-            except (ValueError, TypeError):
-                return error_response(400, 'Quantity must be a valid number', 'INVALID_INPUT')
-            
-            # Validate unitPrice if provided
-            if 'unitPrice' in item and item['unitPrice'] is not None:
-                try:
-                    unit_price = float(item['unitPrice'])
-                    if unit_price < 0:
-                        return error_response(400, 'unitPrice must be non-negative', 'INVALID_INPUT')
-                    item['unitPrice'] = unit_price
-                except (ValueError, TypeError):
-                    return error_response(400, 'unitPrice must be a valid number', 'INVALID_INPUT')
-        
-        # Validate numeric fields
-        discount = body.get('discount', 0)
+        # Same rules as the bulk import
         try:
-            discount = float(discount)
-            if discount < 0:
-                return error_response(400, 'discount must be non-negative', 'INVALID_INPUT')
-        except (ValueError, TypeError):
-            return error_response(400, 'discount must be a valid number', 'INVALID_INPUT')
-        
-        paid_now = body.get('paidNow', 0)
-        try:
-            paid_now = float(paid_now)
-            if paid_now < 0:
-                return error_response(400, 'paidNow must be non-negative', 'INVALID_INPUT')
-        except (ValueError, TypeError):
-            return error_response(400, 'paidNow must be a valid number', 'INVALID_INPUT')
-        
-        order_date = body.get('orderDate')
-        notes = body.get('notes')
+            order_input = validate_order(body)
+        except OrderValidationError as e:
+            return error_response(400, str(e), e.code)
         
         # Create order
-        order = create_order(
-            customer_id=customer_id,
-            order_date=order_date,
-            items=items,
-            discount=discount,
-            paid_now=paid_now,
-            notes=notes
-        )
+        order = create_order(**order_input)
         
         return success_response(201, order)
     
     except json.JSONDecodeError:
         return error_response(400, 'Invalid JSON in request body', 'INVALID_JSON')
+    except CustomerNotFoundError as e:
+        return error_response(404, str(e), 'NOT_FOUND')
     except ValueError as e:
         return error_response(400, str(e), 'INVALID_INPUT')
     except Exception as e:
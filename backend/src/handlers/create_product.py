@@ -1,5 +1,6 @@
 import json
 from src.db.product_repo import create_product, compute_effective_price
+from src.utils.product_validation import validate_new_product, ProductValidationError
 from src.utils.response import success_response, error_response
 from src.auth import extract_and_verify_token, AuthenticationError
 
@@ -15,49 +16,14 @@ def handler(event, context):
     try:
         body = json.loads(event.get('body', '{}'))
         
-        # Validate required fields
-        name = body.get('name')
-        base_buying_price = body.get('baseBuyingPrice')
-        base_selling_price = body.get('baseSellingPrice')
-        
-        if not name:
-            return error_response(400, 'name is required', 'MISSING_FIELD')
-        if base_buying_price is None:
-            return error_response(400, 'baseBuyingPrice is required', 'MISSING_FIELD')
-        if base_selling_price is None:
-            return error_response(400, 'baseSellingPrice is required', 'MISSING_FIELD')
-        
-        # Validate numeric fields
+        # Same rules as bulk upserts
         try:
-            base_buying_price = float(base_buying_price)
-            base_selling_price = float(base_selling_price)
-        except (ValueError, TypeError):
-            return error_response(400, 'Prices must be valid numbers', 'INVALID_INPUT')
-        
-        if base_buying_price < 0 or base_selling_price < 0:
-            return error_response(400, 'Prices must be non-negative', 'INVALID_INPUT')
-        
-        discount_percent = body.get('discountPercent')
-        if discount_percent is not None:
-            try:
-                discount_percent = float(discount_percent)
-                if discount_percent < 0 or discount_percent > 100:
-                    return error_response(400, 'discountPercent must be between 0 and 100', 'INVALID_INPUT')
-            except (ValueError, TypeError):
-                return error_response(400, 'discountPercent must be a valid number', 'INVALID_INPUT')
-        
-        image_key = body.get('imageKey')
-        is_active = body.get('isActive', True)
+            product_input = validate_new_product(body)
+        except ProductValidationError as e:
+            return error_response(400, str(e), e.code)
         
         # Create product
-        product = create_product(
-            name=name,
-            base_buying_price=base_buying_price,
-            base_selling_price=base_selling_price,
-            discount_percent=discount_percent,
-            image_key=image_key,
-            is_active=is_active
-        )
+        product = create_product(**product_input)
         
         # Add computed effective prices (convert Decimal to float for computation)
         from decimal import Decimal
@@ -1,11 +1,11 @@
 import json
-from src.db.customer_repo import get_customer, get_customer_orders
-from src.utils.response import success_response, error_response
+from src.db.customer_repo import get_customer_activity
+from src.utils.response import conditional_response, error_response
 from src.auth import extract_and_verify_token, AuthenticationError
 
 
 def handler(event, context):
-    """Get customer detail with recent orders"""
+    """Get customer detail with recent orders and debt adjustments"""
     # Verify JWT token
     try:
         extract_and_verify_token(event)
@@ -18,14 +18,12 @@ def handler(event, context):
         if not customer_id:
             return error_response(400, 'Customer ID is required', 'MISSING_PARAMETER')
         
-        customer = get_customer(customer_id)
+        # Customer, recent orders and recent debt adjustments in one query
+        activity = get_customer_activity(customer_id, order_limit=10, debt_limit=10)
         
-        if not customer:
+        if not activity:
             return error_response(404, f'Customer {customer_id} not found', 'NOT_FOUND')
         
-        # Get recent orders
-        orders = get_customer_orders(customer_id, limit=10)
-        
         # Format orders for response (simplified)
         recent_orders = [
             {
@@ -35,13 +33,24 @@ def handler(event, context):
                 'paidNow': order.get('paidNow'),
                 'debtChange': order.get('debtChange')
             }
-            for order in orders
+            for order in activity['orders']
+        ]
+        
+        recent_debt_adjustments = [
+            {
+                'id': adjustment.get('id'),
+                'timestamp': adjustment.get('timestamp'),
+                'amount': adjustment.get('amount'),
+                'reason': adjustment.get('reason')
+            }
+            for adjustment in activity['debtAdjustments']
         ]
         
-        return success_response(200, {
-            'customer': customer,
-            'recentOrders': recent_orders
-        })
+        return conditional_response(event, {
+            'customer': activity['customer'],
+            'recentOrders': recent_orders,
+            'recentDebtAdjustments': recent_debt_adjustments
+        }, 'customers')
     
     except Exception as e:
         return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
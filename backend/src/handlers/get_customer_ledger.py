@@ -0,0 +1,38 @@
+import json
+from src.db.customer_repo import get_customer_ledger
+from src.utils.response import success_response, error_response
+from src.utils.pagination import InvalidPaginationToken, parse_limit
+from src.auth import extract_and_verify_token, AuthenticationError
+
+
+def handler(event, context):
+    """Get a customer's orders and debt adjustments as one ledger, newest first"""
+    # Verify JWT token
+    try:
+        extract_and_verify_token(event)
+    except AuthenticationError as e:
+        return error_response(401, str(e), 'UNAUTHORIZED')
+    
+    try:
+        customer_id = (event.get('pathParameters') or {}).get('id')
+        
+        if not customer_id:
+            return error_response(400, 'Customer ID is required', 'MISSING_PARAMETER')
+        
+        query_params = event.get('queryStringParameters') or {}
+        limit = parse_limit(query_params.get('limit'))
+        
+        ledger = get_customer_ledger(customer_id, limit=limit)
+        
+        if not ledger:
+            return error_response(404, f'Customer {customer_id} not found', 'NOT_FOUND')
+        
+        return success_response(200, {
+            'customer': ledger['customer'],
+            'items': ledger['entries']
+        }, event=event)
+    
+    except InvalidPaginationToken as e:
+        return error_response(400, str(e), 'INVALID_INPUT')
+    except Exception as e:
+        return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
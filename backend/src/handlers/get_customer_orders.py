@@ -1,6 +1,8 @@
 import json
-from src.db.order_repo import get_customer_orders_list
+from src.db.order_repo import get_customer_orders_page, ORDER_FIELDS, ORDER_SUMMARY_FIELDS
+from src.db.projection import parse_fields, project
 from src.utils.response import success_response, error_response
+from src.utils.pagination import decode_next_token, encode_next_token, parse_limit
 from src.auth import extract_and_verify_token, AuthenticationError
 
 
@@ -19,28 +21,36 @@ def handler(event, context):
             return error_response(400, 'Customer ID is required', 'MISSING_PARAMETER')
         
         query_params = event.get('queryStringParameters') or {}
-        limit = int(query_params.get('limit', 50))
+        limit = parse_limit(query_params.get('limit'))
         
-        orders = get_customer_orders_list(customer_id, limit=limit)
+        # Inclusive date window (YYYY-MM-DD or ISO datetime), read with a
+        # sort key range; a token only resumes the customer and window it
+        # was issued for
+        date_from = query_params.get('from')
+        date_to = query_params.get('to')
+        scope = f"orders:{customer_id}:{date_from or ''}:{date_to or ''}"
+        start_key = decode_next_token(query_params.get('nextToken'), scope)
         
-        # Return simplified order info
-        order_list = [
-            {
-                'id': order.get('id'),
-                'orderDate': order.get('orderDate'),
-                'totalAmount': order.get('totalAmount'),
-                'paidNow': order.get('paidNow'),
-                'debtChange': order.get('debtChange'),
-                'items': order.get('items', [])
-            }
-            for order in orders
-        ]
+        # Order summaries by default; fields=...,items adds line items, fields=* everything
+        fields = parse_fields(query_params.get('fields'), ORDER_FIELDS, ORDER_SUMMARY_FIELDS)
+        
+        orders, next_key = get_customer_orders_page(
+            customer_id,
+            limit=limit,
+            start_key=start_key,
+            date_from=date_from,
+            date_to=date_to,
+            fields=fields
+        )
         
         return success_response(200, {
-            'items': order_list,
-            'nextToken': None
-        })
+            'items': [project(order, fields or ORDER_FIELDS) for order in orders],
+            'nextToken': encode_next_token(next_key, scope)
+        }, event=event)
     
+    except ValueError as e:
+        # Invalid limit, nextToken, fields or date window
+        return error_response(400, str(e), 'INVALID_INPUT')
     except Exception as e:
         return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
 
@@ -1,6 +1,14 @@
 import json
-from src.db.customer_repo import list_customers
-from src.utils.response import success_response, error_response
+from src.db.customer_repo import list_customers_page, CUSTOMER_FIELDS, CUSTOMER_SUMMARY_FIELDS
+from src.db.projection import parse_fields, project, InvalidFieldsError
+from src.utils.response import conditional_response, error_response
+from src.utils.pagination import (
+    decode_next_token,
+    encode_next_token,
+    parse_limit,
+    InvalidPaginationToken,
+    DEFAULT_PAGE_LIMIT
+)
 from src.auth import extract_and_verify_token, AuthenticationError
 
 
@@ -32,13 +40,32 @@ def handler(event, context):
         search = query_params.get('search')
         include_inactive = query_params.get('includeInactive', 'false').lower() == 'true'
         
-        customers = list_customers(search=search, include_inactive=include_inactive)
+        # Without limit or nextToken the whole list is returned in one response
+        next_token = query_params.get('nextToken')
+        limit = parse_limit(
+            query_params.get('limit'),
+            default=DEFAULT_PAGE_LIMIT if next_token else None
+        )
+        start_key = decode_next_token(next_token, 'customers')
         
-        return success_response(200, {
-            'items': customers,
-            'nextToken': None
-        })
+        # fields=a,b narrows each item, fields=* returns whole customers
+        fields = parse_fields(query_params.get('fields'), CUSTOMER_FIELDS, CUSTOMER_SUMMARY_FIELDS)
+        
+        customers, next_key = list_customers_page(
+            limit=limit,
+            start_key=start_key,
+            search=search,
+            include_inactive=include_inactive,
+            fields=fields
+        )
+        
+        return conditional_response(event, {
+            'items': [project(customer, fields) for customer in customers],
+            'nextToken': encode_next_token(next_key, 'customers')
+        }, 'customers')
     
+    except (InvalidPaginationToken, InvalidFieldsError) as e:
+        return error_response(400, str(e), 'INVALID_INPUT')
     except Exception as e:
         return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
 
@@ -1,6 +1,6 @@
 import json
 from src.db.product_repo import get_product, compute_effective_price
-from src.utils.response import success_response, error_response
+from src.utils.response import conditional_response, error_response
 from src.auth import extract_and_verify_token, AuthenticationError
 
 
@@ -32,7 +32,7 @@ def handler(event, context):
         product['effectiveBuyingPrice'] = compute_effective_price(base_buying, discount)
         product['effectiveSellingPrice'] = compute_effective_price(base_selling, discount)
         
-        return success_response(200, product)
+        return conditional_response(event, product, 'products')
     
     except Exception as e:
         return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
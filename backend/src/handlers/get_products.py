@@ -1,6 +1,20 @@
 import json
-from src.db.product_repo import list_products, compute_effective_price
-from src.utils.response import success_response, error_response
+from src.db.product_repo import (
+    list_products_page,
+    compute_effective_price,
+    PRODUCT_FIELDS,
+    PRODUCT_SUMMARY_FIELDS,
+    PRODUCT_COMPUTED_FIELDS
+)
+from src.db.projection import parse_fields, stored_fields, project, InvalidFieldsError
+from src.utils.response import conditional_response, error_response
+from src.utils.pagination import (
+    decode_next_token,
+    encode_next_token,
+    parse_limit,
+    InvalidPaginationToken,
+    DEFAULT_PAGE_LIMIT
+)
 from src.auth import extract_and_verify_token, AuthenticationError
 
 
@@ -32,23 +46,40 @@ def handler(event, context):
         search = query_params.get('search')
         include_inactive = query_params.get('includeInactive', 'false').lower() == 'true'
         
-        products = list_products(search=search, include_inactive=include_inactive)
+        # Without limit or nextToken the whole list is returned in one response
+        next_token = query_params.get('nextToken')
+        limit = parse_limit(
+            query_params.get('limit'),
+            default=DEFAULT_PAGE_LIMIT if next_token else None
+        )
+        start_key = decode_next_token(next_token, 'products')
         
-        # Add computed effective prices (convert Decimal to float for computation)
-        from decimal import Decimal
+        # fields=a,b narrows each item, fields=* returns whole products
+        fields = parse_fields(query_params.get('fields'), PRODUCT_FIELDS, PRODUCT_SUMMARY_FIELDS)
+        
+        products, next_key = list_products_page(
+            limit=limit,
+            start_key=start_key,
+            search=search,
+            include_inactive=include_inactive,
+            fields=stored_fields(fields, PRODUCT_COMPUTED_FIELDS)
+        )
+        
+        # Add computed effective prices from whichever base prices were read
+        # (compute_effective_price converts Decimal to float)
         for product in products:
-            base_buying = float(product['baseBuyingPrice']) if isinstance(product['baseBuyingPrice'], Decimal) else product['baseBuyingPrice']
-            base_selling = float(product['baseSellingPrice']) if isinstance(product['baseSellingPrice'], Decimal) else product['baseSellingPrice']
-            discount = float(product.get('discountPercent', 0)) if isinstance(product.get('discountPercent', 0), Decimal) else product.get('discountPercent', 0)
-            
-            product['effectiveBuyingPrice'] = compute_effective_price(base_buying, discount)
-            product['effectiveSellingPrice'] = compute_effective_price(base_selling, discount)
+            for computed, base in (('effectiveBuyingPrice', 'baseBuyingPrice'),
+                                   ('effectiveSellingPrice', 'baseSellingPrice')):
+                if base in product:
+                    product[computed] = compute_effective_price(product[base], product.get('discountPercent', 0))
         
-        return success_response(200, {
-            'items': products,
-            'nextToken': None
-        })
+        return conditional_response(event, {
+            'items': [project(product, fields) for product in products],
+            'nextToken': encode_next_token(next_key, 'products')
+        }, 'products')
     
+    except (InvalidPaginationToken, InvalidFieldsError) as e:
+        return error_response(400, str(e), 'INVALID_INPUT')
     except Exception as e:
         return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
 
@@ -0,0 +1,50 @@
+import json
+from src.db.sales_rollup import (
+    get_daily_sales,
+    get_product_sales,
+    get_day_product_sales,
+    default_report_window
+)
+from src.utils.response import success_response, error_response
+from src.auth import extract_and_verify_token, AuthenticationError
+
+
+def handler(event, context):
+    """Get pre-aggregated sales: daily totals, one product's history or one day by product"""
+    # Verify JWT token
+    try:
+        extract_and_verify_token(event)
+    except AuthenticationError as e:
+        return error_response(401, str(e), 'UNAUTHORIZED')
+    
+    try:
+        query_params = event.get('queryStringParameters') or {}
+        
+        day = query_params.get('day')
+        if day:
+            return success_response(200, {
+                'day': day,
+                'items': get_day_product_sales(day)
+            }, event=event)
+        
+        # Inclusive window of days, the last 30 by default
+        default_from, default_to = default_report_window()
+        date_from = query_params.get('from') or default_from
+        date_to = query_params.get('to') or default_to
+        
+        product_id = query_params.get('productId')
+        if product_id:
+            items = get_product_sales(product_id, date_from, date_to)
+        else:
+            items = get_daily_sales(date_from, date_to)
+        
+        return success_response(200, {
+            'from': date_from,
+            'to': date_to,
+            'items': items
+        }, event=event)
+    
+    except ValueError as e:
+        return error_response(400, str(e), 'INVALID_INPUT')
+    except Exception as e:
+        return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
@@ -0,0 +1,65 @@
+import base64
+from src.db.order_import import import_orders
+from src.utils.order_batch import parse_order_batch
+from src.utils.response import success_response, error_response, get_header
+from src.auth import extract_and_verify_token, AuthenticationError
+
+# Content types recognised when no format= is given
+CONTENT_TYPE_FORMATS = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'jsonl',
+    'application/jsonl': 'jsonl',
+    'application/x-jsonlines': 'jsonl'
+}
+
+
+def request_format(event) -> str:
+    """The upload format, from ?format= or else the Content-Type"""
+    query_params = event.get('queryStringParameters') or {}
+    if query_params.get('format'):
+        return query_params['format'].lower()
+    content_type = (get_header(event, 'Content-Type') or '').split(';')[0].strip().lower()
+    if content_type not in CONTENT_TYPE_FORMATS:
+        raise ValueError('Send text/csv or application/x-ndjson, or set format=csv|jsonl')
+    return CONTENT_TYPE_FORMATS[content_type]
+
+
+def handler(event, context):
+    """Create many orders from a CSV or JSONL upload"""
+    # Handle CORS preflight (OPTIONS) requests
+    if event.get('requestContext', {}).get('http', {}).get('method') == 'OPTIONS' or \
+       event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': ''
+        }
+
+    # Verify JWT token
+    try:
+        extract_and_verify_token(event)
+    except AuthenticationError as e:
+        return error_response(401, str(e), 'UNAUTHORIZED')
+
+    try:
+        batch_format = request_format(event)
+
+        body = event.get('body') or ''
+        if event.get('isBase64Encoded'):
+            body = base64.b64decode(body).decode('utf-8')
+        body = body.lstrip('\ufeff')
+
+        # Rows are reported individually; only an unreadable upload is rejected
+        report = import_orders(parse_order_batch(body, batch_format))
+
+        return success_response(200, report, event=event)
+
+    except ValueError as e:
+        return error_response(400, str(e), 'INVALID_INPUT')
+    except Exception as e:
+        return error_response(500, f'Internal server error: {str(e)}', 'INTERNAL_ERROR')
@@ -1,10 +1,51 @@
 import json
-import boto3
+import os
 from src.auth import generate_token
+from src.secret_provider import CachedSecret, constant_time_equals
+from src.utils.lazy_import import LAZY_IMPORTS, lazy_module
 from src.utils.response import success_response, error_response
 
-# Initialize SSM client
-ssm_client = boto3.client('ssm')
+boto3 = lazy_module('boto3')
+botocore_exceptions = lazy_module('botocore.exceptions')
+
+
+def _create_ssm_client():
+    return boto3.client('ssm', region_name=os.environ.get('AWS_REGION', 'eu-central-1'))
+
+
+# SSM client; created on the first password fetch in lazy-import mode
+ssm_client = None if LAZY_IMPORTS else _create_ssm_client()
+
+
+def get_ssm_client():
+    """Get the SSM client, creating it on first use"""
+    global ssm_client
+    if ssm_client is None:
+        ssm_client = _create_ssm_client()
+    return ssm_client
+
+
+PASSWORD_PARAMETER_NAME = '/distribution-app/password'
+PASSWORD_CACHE_TTL_SECONDS = float(os.environ.get('PASSWORD_CACHE_TTL_SECONDS', '300'))
+
+
+def _fetch_password() -> str:
+    response = get_ssm_client().get_parameter(
+        Name=PASSWORD_PARAMETER_NAME,
+        WithDecryption=True
+    )
+    return response['Parameter']['Value']
+
+
+# Logins in a warm container reuse the decrypted password; it is refreshed in
+# the background near the end of the TTL and re-fetched early when a login
+# fails, so a rotated password is picked up immediately
+stored_password_secret = CachedSecret(
+    fetch=_fetch_password,
+    ttl_seconds=PASSWORD_CACHE_TTL_SECONDS,
+    refresh_ahead_seconds=PASSWORD_CACHE_TTL_SECONDS / 5,
+    forced_refresh_interval_seconds=float(os.environ.get('PASSWORD_FORCED_REFRESH_SECONDS', '30'))
+)
 
 
 def handler(event, context):
@@ -32,21 +73,21 @@ def handler(event, context):
         if not password:
             return error_response(400, 'password is required', 'MISSING_FIELD')
         
-        # Get password from SSM Parameter Store
+        # Get password from SSM Parameter Store (cached per container)
         try:
-            parameter_name = '/distribution-app/password'
-            response = ssm_client.get_parameter(
-                Name=parameter_name,
-                WithDecryption=True
-            )
-            stored_password = response['Parameter']['Value']
-        except ssm_client.exceptions.ParameterNotFound:
-            return error_response(500, 'Password parameter not found in SSM', 'SSM_ERROR')
+            valid = constant_time_equals(password, stored_password_secret.get())
+            if not valid:
+                # The password may have been rotated since it was cached
+                refreshed = stored_password_secret.refresh_after_mismatch()
+                valid = refreshed is not None and constant_time_equals(password, refreshed)
+        except botocore_exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ParameterNotFound':
+                return error_response(500, 'Password parameter not found in SSM', 'SSM_ERROR')
+            return error_response(500, f'Failed to retrieve password from SSM: {str(e)}', 'SSM_ERROR')
         except Exception as e:
             return error_response(500, f'Failed to retrieve password from SSM: {str(e)}', 'SSM_ERROR')
         
-        # Compare passwords
-        if password != stored_password:
+        if not valid:
             return error_response(401, 'Invalid credentials', 'INVALID_CREDENTIALS')
         
         # Generate JWT token
@@ -0,0 +1,11 @@
+from src.db.sales_rollup import process_records
+
+
+def handler(event, context):
+    """
+    Fold new orders from the table's stream into the daily sales rollups.
+    
+    Any error fails the whole batch, which the stream then redelivers;
+    orders that were already counted are skipped on the retry.
+    """
+    return process_records(event.get('Records', []))
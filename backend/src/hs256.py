@@ -0,0 +1,157 @@
+"""
+Minimal HS256 JSON Web Tokens on the standard library.
+
+The API only ever issues and accepts HS256 tokens signed with its own
+secret, so this module covers exactly that: encode/decode mirror the PyJWT
+calls used by src.auth (same arguments, same exception names) and produce
+byte-identical tokens, without importing PyJWT and its dependencies.
+
+decode validates the signature and, like PyJWT's defaults, the exp, iat and
+nbf claims when present.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from calendar import timegm
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+ALGORITHM = 'HS256'
+
+# PyJWT sorts header keys and writes compact JSON
+_HEADER_SEGMENT = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b'=')
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token cannot be trusted"""
+    pass
+
+
+class DecodeError(InvalidTokenError):
+    """Raised when a token is malformed or its signature does not match"""
+    pass
+
+
+class InvalidAlgorithmError(InvalidTokenError):
+    """Raised when a token is not signed with HS256"""
+    pass
+
+
+class ExpiredSignatureError(InvalidTokenError):
+    """Raised when a token's exp claim has passed"""
+    pass
+
+
+class ImmatureSignatureError(InvalidTokenError):
+    """Raised when a token's iat or nbf claim lies in the future"""
+    pass
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _b64decode(segment: bytes) -> bytes:
+    return base64.urlsafe_b64decode(segment + b'=' * (-len(segment) % 4))
+
+
+def _key_bytes(key: Union[str, bytes]) -> bytes:
+    return key.encode('utf-8') if isinstance(key, str) else key
+
+
+def _sign(signing_input: bytes, key: Union[str, bytes]) -> bytes:
+    return hmac.new(_key_bytes(key), signing_input, hashlib.sha256).digest()
+
+
+def encode(payload: Dict[str, Any], key: Union[str, bytes], algorithm: str = ALGORITHM) -> str:
+    """
+    Sign a payload as an HS256 JWT.
+
+    Args:
+        payload: Claims; datetime exp/iat/nbf values are converted to timestamps
+        key: HMAC secret
+        algorithm: Must be HS256
+
+    Returns:
+        Token string, identical to jwt.encode(payload, key, algorithm='HS256')
+    """
+    if algorithm != ALGORITHM:
+        raise NotImplementedError('Algorithm not supported')
+    if not isinstance(payload, dict):
+        raise TypeError('Expecting a dict object, as JWT only supports JSON objects as payloads.')
+
+    payload = payload.copy()
+    for claim in ('exp', 'iat', 'nbf'):
+        if isinstance(payload.get(claim), datetime):
+            payload[claim] = timegm(payload[claim].utctimetuple())
+
+    payload_segment = _b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    signing_input = _HEADER_SEGMENT + b'.' + payload_segment
+    return (signing_input + b'.' + _b64encode(_sign(signing_input, key))).decode('utf-8')
+
+
+def _int_claim(payload: Dict[str, Any], claim: str) -> int:
+    try:
+        return int(payload[claim])
+    except (ValueError, TypeError, OverflowError):
+        raise DecodeError(f'{claim} claim must be an integer.') from None
+
+
+def decode(
+    token: Union[str, bytes],
+    key: Union[str, bytes],
+    algorithms: Optional[List[str]] = None,
+    leeway: float = 0,
+    now: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Verify an HS256 JWT and return its claims.
+
+    Args:
+        token: Token string
+        key: HMAC secret
+        algorithms: Accepted algorithms; must include HS256
+        leeway: Seconds of clock skew tolerated for exp, iat and nbf
+        now: Current Unix time (defaults to time.time())
+
+    Returns:
+        Decoded payload dictionary
+
+    Raises:
+        InvalidTokenError: Or a subclass, if the token is malformed, not
+            HS256, wrongly signed, expired or not yet valid
+    """
+    if algorithms is not None and ALGORITHM not in algorithms:
+        raise InvalidAlgorithmError('The specified alg value is not allowed')
+
+    if isinstance(token, str):
+        token = token.encode('utf-8')
+    try:
+        signing_input, signature_segment = token.rsplit(b'.', 1)
+        header_segment, payload_segment = signing_input.split(b'.', 1)
+        header = json.loads(_b64decode(header_segment))
+        payload = json.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except (ValueError, binascii.Error):
+        raise DecodeError('Not enough segments or invalid encoding') from None
+
+    if not isinstance(header, dict) or header.get('alg') != ALGORITHM:
+        raise InvalidAlgorithmError('The specified alg value is not allowed')
+    if not hmac.compare_digest(signature, _sign(signing_input, key)):
+        raise DecodeError('Signature verification failed')
+    if not isinstance(payload, dict):
+        raise DecodeError('Invalid payload string: must be a json object')
+
+    if now is None:
+        now = time.time()
+    if 'iat' in payload and _int_claim(payload, 'iat') > now + leeway:
+        raise ImmatureSignatureError('The token is not yet valid (iat)')
+    if 'nbf' in payload and _int_claim(payload, 'nbf') > now + leeway:
+        raise ImmatureSignatureError('The token is not yet valid (nbf)')
+    if 'exp' in payload and _int_claim(payload, 'exp') <= now - leeway:
+        raise ExpiredSignatureError('Signature has expired')
+
+    return payload
@@ -0,0 +1,101 @@
+"""
+Single Lambda entry point for the HTTP API.
+
+API Gateway (HTTP API, payload v2) routes every request in ROUTES to this
+function, which dispatches on the route key to the existing handler modules. Handler
+modules are imported on first use, so a container only pays for the routes
+it actually serves, and those routes share the same warm containers.
+"""
+import importlib
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.response import error_response
+
+# Route key -> module in src.handlers exposing handler(event, context).
+# Routes that need more memory than the router has always target their own
+# function (see infra/apigw.tf), so they are not listed here.
+ROUTES = {
+    'POST /login': 'login',
+    'POST /products': 'create_product',
+    'GET /products': 'get_products',
+    'GET /products/{id}': 'get_product',
+    'PATCH /products/{id}': 'update_product',
+    'POST /customers': 'create_customer',
+    'GET /customers': 'get_customers',
+    'GET /customers/{id}': 'get_customer_detail',
+    'GET /customers/{id}/orders': 'get_customer_orders',
+    'GET /customers/{id}/ledger': 'get_customer_ledger',
+    'POST /customers/{id}/adjust-debt': 'adjust_customer_debt',
+    'POST /orders': 'create_order',
+    'GET /reports/sales': 'get_sales_report',
+}
+
+PREFLIGHT_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PATCH, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+    'Access-Control-Max-Age': '86400'
+}
+
+_handlers: Dict[str, Callable] = {}
+
+
+def _compile(route_key: str) -> Tuple[str, re.Pattern]:
+    method, path = route_key.split(' ', 1)
+    pattern = re.sub(r'\\{(\w+)\\}', r'(?P<\1>[^/]+)', re.escape(path))
+    return method, re.compile(f'^{pattern}$')
+
+
+_PATTERNS: List[Tuple[str, re.Pattern, str]] = [
+    (*_compile(route_key), route_key) for route_key in ROUTES
+]
+
+
+def get_handler(module_name: str) -> Callable:
+    """Import a handler module on first use and cache its handler"""
+    handler = _handlers.get(module_name)
+    if handler is None:
+        handler = importlib.import_module(f'src.handlers.{module_name}').handler
+        _handlers[module_name] = handler
+    return handler
+
+
+def resolve(event: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, str]]:
+    """
+    Find the route for an event.
+
+    Uses the routeKey set by API Gateway when it names a known route and
+    otherwise matches method and path (e.g. behind a $default route).
+
+    Returns:
+        (route_key, path_parameters); route_key is None when nothing matches
+    """
+    route_key = event.get('routeKey') or event.get('requestContext', {}).get('routeKey')
+    if route_key in ROUTES:
+        return route_key, event.get('pathParameters') or {}
+
+    http = event.get('requestContext', {}).get('http', {})
+    method = http.get('method') or event.get('httpMethod')
+    path = event.get('rawPath') or http.get('path') or event.get('path') or ''
+    for route_method, pattern, key in _PATTERNS:
+        if route_method == method:
+            match = pattern.match(path.rstrip('/') or '/')
+            if match:
+                return key, match.groupdict()
+    return None, {}
+
+
+def handler(event, context):
+    """Dispatch an API Gateway event to the handler for its route"""
+    http = event.get('requestContext', {}).get('http', {})
+    if http.get('method') == 'OPTIONS' or event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': dict(PREFLIGHT_HEADERS), 'body': ''}
+
+    route_key, path_parameters = resolve(event)
+    if route_key is None:
+        return error_response(404, 'Route not found', 'NOT_FOUND')
+
+    if path_parameters and not event.get('pathParameters'):
+        event = {**event, 'pathParameters': path_parameters}
+    return get_handler(ROUTES[route_key])(event, context)
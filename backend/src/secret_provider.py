@@ -0,0 +1,107 @@
+"""
+TTL-cached secret retrieval for warm Lambda containers.
+
+Fetching a SecureString from SSM costs a KMS-decrypting round-trip and counts
+against SSM's request rate, so the value is kept in memory:
+
+- within ttl_seconds the cached value is returned without any call;
+- in the last refresh_ahead_seconds of the TTL a background refresh is
+  started while the cached value keeps being served;
+- after the TTL the value is fetched synchronously;
+- callers that see a mismatch (e.g. right after a rotation) can force a
+  refresh, rate-limited so wrong guesses cannot hammer SSM.
+"""
+import hmac
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+def constant_time_equals(candidate: str, expected: str) -> bool:
+    """Compare two secrets without leaking where they differ through timing"""
+    if not isinstance(candidate, str) or not isinstance(expected, str):
+        return False
+    return hmac.compare_digest(candidate.encode('utf-8'), expected.encode('utf-8'))
+
+
+class CachedSecret:
+    """A secret fetched on demand and cached with TTL and background refresh"""
+
+    def __init__(
+        self,
+        fetch: Callable[[], str],
+        ttl_seconds: float,
+        refresh_ahead_seconds: float = 0,
+        forced_refresh_interval_seconds: float = 30,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.fetch = fetch
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.forced_refresh_interval_seconds = forced_refresh_interval_seconds
+        self.clock = clock
+        self.fetches = 0
+        self.hits = 0
+        self._value: Optional[str] = None
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def _load(self) -> str:
+        value = self.fetch()
+        with self._lock:
+            self.fetches += 1
+            self._value = value
+            self._fetched_at = self.clock()
+        return value
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._background_load, daemon=True)
+            self._refresh_thread.start()
+
+    def _background_load(self) -> None:
+        try:
+            self._load()
+        except Exception:
+            # The cached value stays valid until the TTL; the next
+            # synchronous fetch surfaces the error
+            pass
+
+    def get(self) -> str:
+        """Return the secret, fetching it only when the cache cannot serve it"""
+        if self._value is None or self.ttl_seconds <= 0:
+            return self._load()
+
+        age = self.clock() - self._fetched_at
+        if age >= self.ttl_seconds:
+            return self._load()
+
+        if age >= self.ttl_seconds - self.refresh_ahead_seconds:
+            self._refresh_in_background()
+        self.hits += 1
+        return self._value
+
+    def refresh_after_mismatch(self) -> Optional[str]:
+        """
+        Re-fetch the secret because a caller's value did not match it.
+
+        Returns the fresh value, or None when the cached value is too recent
+        to be worth re-checking (at most one forced fetch per
+        forced_refresh_interval_seconds).
+        """
+        if self._fetched_at is not None and \
+                self.clock() - self._fetched_at < self.forced_refresh_interval_seconds:
+            return None
+        return self._load()
+
+    def wait_for_refresh(self, timeout: Optional[float] = None) -> None:
+        """Block until a background refresh in flight has finished"""
+        thread = self._refresh_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'fetches': self.fetches}
@@ -0,0 +1,138 @@
+"""
+Where export files are written, and how clients download them.
+
+With EXPORT_BUCKET set, exports go to S3 (or an S3-compatible store at
+S3_ENDPOINT_URL, e.g. MinIO) and clients get a presigned GET URL. Without
+it they are written under EXPORT_DIR (default <tmp>/exports), which is
+meant for local development and scripts.
+
+    EXPORT_BUCKET               bucket for export files
+    S3_ENDPOINT_URL             endpoint override for S3-compatible stores
+    EXPORT_PART_SIZE_MB         multipart upload part size (default 8, minimum 5)
+    EXPORT_URL_EXPIRES_SECONDS  lifetime of download URLs (default 900)
+    EXPORT_DIR                  directory for local exports
+"""
+import itertools
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable
+from src.utils.lazy_import import lazy_module
+
+boto3 = lazy_module('boto3')
+botocore_config = lazy_module('botocore.config')
+
+# S3 rejects multipart parts below 5 MiB, except the last
+MIN_PART_SIZE = 5 * 1024 * 1024
+LOCAL_CHUNK_SIZE = 1024 * 1024
+
+
+def url_expires_seconds() -> int:
+    """Lifetime of download URLs"""
+    return int(os.environ.get('EXPORT_URL_EXPIRES_SECONDS', '900'))
+
+
+class LocalExportTarget:
+    """Writes exports into a directory and hands out file:// URLs"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.part_size = LOCAL_CHUNK_SIZE
+
+    def write(self, key: str, chunks: Iterable[bytes], content_type: str, filename: str) -> int:
+        """
+        Write chunks to key as they arrive; the file only appears once complete.
+
+        Returns:
+            Bytes written
+        """
+        path = os.path.join(self.directory, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = 0
+        with open(f'{path}.tmp', 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(f'{path}.tmp', path)
+        return size
+
+    def url(self, key: str, filename: str) -> str:
+        """Location of a written export"""
+        return Path(self.directory, key).resolve().as_uri()
+
+
+class S3ExportTarget:
+    """Uploads exports to a bucket part by part and hands out presigned URLs"""
+
+    def __init__(self, bucket: str, client, part_size: int):
+        self.bucket = bucket
+        self.client = client
+        self.part_size = max(part_size, MIN_PART_SIZE)
+
+    def write(self, key: str, chunks: Iterable[bytes], content_type: str, filename: str) -> int:
+        """
+        Upload chunks to key; chunks must be part_size bytes except the last.
+
+        A single chunk is sent with PutObject. Anything longer is a multipart
+        upload with one part per chunk, so only one part is held in memory,
+        and the upload is aborted if anything fails.
+
+        Returns:
+            Bytes uploaded
+        """
+        chunks = iter(chunks)
+        first = next(chunks, b'')
+        second = next(chunks, None)
+        attributes = {
+            'Bucket': self.bucket,
+            'Key': key,
+            'ContentType': content_type,
+            'ContentDisposition': f'attachment; filename="{filename}"'
+        }
+        if second is None:
+            self.client.put_object(Body=first, **attributes)
+            return len(first)
+
+        upload_id = self.client.create_multipart_upload(**attributes)['UploadId']
+        parts = []
+        size = 0
+        try:
+            for number, chunk in enumerate(itertools.chain((first, second), chunks), start=1):
+                response = self.client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=chunk
+                )
+                parts.append({'ETag': response['ETag'], 'PartNumber': number})
+                size += len(chunk)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+        return size
+
+    def url(self, key: str, filename: str) -> str:
+        """Presigned GET URL of an uploaded export"""
+        return self.client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': key},
+            ExpiresIn=url_expires_seconds()
+        )
+
+
+def _s3_client():
+    return boto3.client(
+        's3',
+        region_name=os.environ.get('AWS_REGION', 'eu-central-1'),
+        endpoint_url=os.environ.get('S3_ENDPOINT_URL') or None,
+        config=botocore_config.Config(signature_version='s3v4')
+    )
+
+
+def get_export_target():
+    """The target configured by the environment"""
+    bucket = os.environ.get('EXPORT_BUCKET')
+    if bucket:
+        part_size = int(float(os.environ.get('EXPORT_PART_SIZE_MB', '8')) * 1024 * 1024)
+        return S3ExportTarget(bucket, _s3_client(), part_size)
+    return LocalExportTarget(os.environ.get('EXPORT_DIR') or os.path.join(tempfile.gettempdir(), 'exports'))
@@ -0,0 +1,59 @@
+"""
+Deferred imports for cold-start sensitive dependencies.
+
+boto3, botocore and PyJWT take most of a handler's init time, but not every
+invocation path needs them (e.g. preflight requests, validation errors, the
+router resolving a route). With LAZY_IMPORTS enabled (the default) modules
+obtained through lazy_module are imported on first attribute access instead
+of at import time; set LAZY_IMPORTS=0 to import them eagerly.
+"""
+import importlib
+import os
+import threading
+from types import ModuleType
+from typing import Optional
+
+LAZY_IMPORTS = os.environ.get('LAZY_IMPORTS', '1').lower() not in ('0', 'false', 'no')
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access"""
+
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_module(name: str, lazy: Optional[bool] = None):
+    """
+    Return a module, or a LazyModule deferring its import.
+
+    Args:
+        name: Dotted module name, e.g. 'boto3' or 'botocore.config'
+        lazy: Override LAZY_IMPORTS for this module
+    """
+    if lazy is None:
+        lazy = LAZY_IMPORTS
+    return LazyModule(name) if lazy else importlib.import_module(name)
@@ -0,0 +1,113 @@
+"""
+Parsing of bulk order uploads into POST /orders payloads.
+
+Two formats are accepted:
+
+    jsonl  one POST /orders body per line; an optional orderRef names it
+           in the import report
+    csv    one line item per row, with a header naming the columns
+           orderRef, customerId, orderDate, productId, quantity,
+           unitPrice, discount, paidNow and notes; rows sharing an
+           orderRef form one order, rows without one are orders of their own
+
+Each parsed order carries the (first) line it came from, so the import
+report can point at it. Lines that cannot be parsed become orders with an
+error instead of failing the whole upload.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, List
+
+FORMATS = ('csv', 'jsonl')
+
+CSV_REQUIRED_COLUMNS = ('customerId', 'productId', 'quantity')
+
+# Columns describing the whole order rather than one of its lines
+CSV_ORDER_COLUMNS = ('customerId', 'orderDate', 'discount', 'paidNow', 'notes')
+CSV_LINE_COLUMNS = ('productId', 'quantity', 'unitPrice')
+
+
+def _entry(row: int, ref: Any, body: Any = None, error: str = None) -> Dict[str, Any]:
+    return {'row': row, 'ref': ref, 'body': body, 'error': error}
+
+
+def parse_jsonl(text: str) -> List[Dict[str, Any]]:
+    """Parse one order per non-blank line"""
+    entries = []
+    for row, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            body = json.loads(line)
+        except json.JSONDecodeError:
+            entries.append(_entry(row, None, error='Invalid JSON'))
+            continue
+        if not isinstance(body, dict):
+            entries.append(_entry(row, None, error='Each line must be a JSON object'))
+            continue
+        entries.append(_entry(row, body.pop('orderRef', None), body))
+    return entries
+
+
+def parse_csv(text: str) -> List[Dict[str, Any]]:
+    """
+    Parse line item rows, grouping rows that share an orderRef.
+
+    Empty cells count as absent. Order-level columns are taken from the
+    first row of an order; a later row that disagrees makes the order invalid.
+
+    Raises:
+        ValueError: If the header lacks a required column
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [column for column in CSV_REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header must include {', '.join(missing)}")
+
+    entries = []
+    by_ref: Dict[str, Dict[str, Any]] = {}
+    for values in reader:
+        row = reader.line_num
+        values = {
+            column: value.strip() for column, value in values.items()
+            if column and isinstance(value, str) and value.strip()
+        }
+        if not values:
+            continue
+        ref = values.get('orderRef')
+        line = {column: values[column] for column in CSV_LINE_COLUMNS if column in values}
+
+        entry = by_ref.get(ref) if ref else None
+        if entry is None:
+            body = {column: values[column] for column in CSV_ORDER_COLUMNS if column in values}
+            body['items'] = [line]
+            entry = _entry(row, ref, body)
+            entries.append(entry)
+            if ref:
+                by_ref[ref] = entry
+            continue
+
+        for column in CSV_ORDER_COLUMNS:
+            if column in values and values[column] != entry['body'].get(column):
+                entry['error'] = entry['error'] or f'Row {row} disagrees with row {entry["row"]} on {column}'
+        entry['body']['items'].append(line)
+    return entries
+
+
+def parse_order_batch(text: str, batch_format: str) -> List[Dict[str, Any]]:
+    """
+    Parse an upload into orders.
+
+    Returns:
+        Entries of {'row', 'ref', 'body', 'error'}; body is a POST /orders
+        payload, error is set when the order could not be read
+
+    Raises:
+        ValueError: If the format is unknown or the CSV header is incomplete
+    """
+    if batch_format == 'jsonl':
+        return parse_jsonl(text)
+    if batch_format == 'csv':
+        return parse_csv(text)
+    raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
@@ -0,0 +1,71 @@
+"""
+Validation of order payloads, shared by single and bulk order creation.
+"""
+from typing import Any, Dict
+
+
+class OrderValidationError(ValueError):
+    """Raised when an order payload is rejected; code is the API error code"""
+
+    def __init__(self, message: str, code: str = 'INVALID_INPUT'):
+        super().__init__(message)
+        self.code = code
+
+
+def _non_negative(value: Any, field: str) -> float:
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        raise OrderValidationError(f'{field} must be a valid number')
+    if number < 0:
+        raise OrderValidationError(f'{field} must be non-negative')
+    return number
+
+
+def validate_order(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check a POST /orders payload and normalize its numbers.
+
+    Returns:
+        Keyword arguments for order_repo.create_order
+
+    Raises:
+        OrderValidationError: With the message and code of the first problem
+    """
+    customer_id = body.get('customerId')
+    items = body.get('items', [])
+
+    if not customer_id:
+        raise OrderValidationError('customerId is required', 'MISSING_FIELD')
+    if not items or len(items) == 0:
+        raise OrderValidationError('items array is required and cannot be empty', 'MISSING_FIELD')
+    if not isinstance(items, list):
+        raise OrderValidationError('items must be an array')
+
+    for item in items:
+        if not isinstance(item, dict):
+            raise OrderValidationError('Each item must be an object')
+        if not item.get('productId'):
+            raise OrderValidationError('Each item must have a productId')
+        quantity = item.get('quantity')
+        if quantity is None:
+            raise OrderValidationError('Each item must have a quantity')
+        try:
+            quantity = float(quantity)
+        except (ValueError, TypeError):
+            raise OrderValidationError('Quantity must be a valid number')
+        if quantity <= 0:
+            raise OrderValidationError('Quantity must be positive')
+        item['quantity'] = quantity
+
+        if 'unitPrice' in item and item['unitPrice'] is not None:
+            item['unitPrice'] = _non_negative(item['unitPrice'], 'unitPrice')
+
+    return {
+        'customer_id': customer_id,
+        'order_date': body.get('orderDate'),
+        'items': items,
+        'discount': _non_negative(body.get('discount', 0), 'discount'),
+        'paid_now': _non_negative(body.get('paidNow', 0), 'paidNow'),
+        'notes': body.get('notes')
+    }
@@ -0,0 +1,100 @@
+"""
+Opaque, signed pagination tokens for list endpoints.
+
+A token wraps a DynamoDB ExclusiveStartKey so clients can resume a listing
+without seeing (or tampering with) the table's key layout.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+from typing import Any, Dict, Optional
+
+from src.auth import JWT_SECRET
+
+PAGINATION_SECRET = os.environ.get('PAGINATION_TOKEN_SECRET', JWT_SECRET)
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+
+class InvalidPaginationToken(ValueError):
+    """Raised when a nextToken or limit cannot be accepted"""
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def _sign(scope: str, payload: str) -> str:
+    message = f'{scope}.{payload}'.encode('utf-8')
+    return _b64encode(hmac.new(PAGINATION_SECRET.encode('utf-8'), message, hashlib.sha256).digest())
+
+
+def encode_next_token(key: Optional[Dict[str, Any]], scope: str) -> Optional[str]:
+    """
+    Encode a start key into a signed token.
+
+    Args:
+        key: DynamoDB key to resume from (string attributes only), or None
+        scope: Listing the token belongs to (e.g. "products"); a token is
+            rejected when presented to a different listing
+
+    Returns:
+        Token string, or None when there is nothing left to fetch
+    """
+    if not key:
+        return None
+    payload = _b64encode(json.dumps(key, separators=(',', ':'), sort_keys=True).encode('utf-8'))
+    return f'{payload}.{_sign(scope, payload)}'
+
+
+def decode_next_token(token: Optional[str], scope: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a token produced by encode_next_token and return its start key.
+
+    Raises:
+        InvalidPaginationToken: If the token is malformed, tampered with or
+            issued for another scope
+    """
+    if not token:
+        return None
+    try:
+        payload, signature = token.split('.')
+    except ValueError:
+        raise InvalidPaginationToken('nextToken is malformed')
+
+    if not hmac.compare_digest(signature, _sign(scope, payload)):
+        raise InvalidPaginationToken('nextToken is invalid')
+
+    try:
+        key = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        raise InvalidPaginationToken('nextToken is malformed')
+    if not isinstance(key, dict):
+        raise InvalidPaginationToken('nextToken is malformed')
+    return key
+
+
+def parse_limit(value: Optional[str], default: Optional[int] = DEFAULT_PAGE_LIMIT) -> Optional[int]:
+    """
+    Parse a limit query parameter, clamped to MAX_PAGE_LIMIT.
+
+    Raises:
+        InvalidPaginationToken: If the value is not a positive integer
+    """
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except (ValueError, TypeError):
+        raise InvalidPaginationToken('limit must be a positive integer')
+    if limit <= 0:
+        raise InvalidPaginationToken('limit must be a positive integer')
+    return min(limit, MAX_PAGE_LIMIT)
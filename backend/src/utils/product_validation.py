@@ -0,0 +1,159 @@
+"""
+Validation of product payloads, shared by single and bulk product writes.
+"""
+from typing import Any, Dict, Optional
+
+from src.db.search_index import MAX_NAME_LENGTH
+
+
+class ProductValidationError(ValueError):
+    """Raised when a product payload is rejected; code is the API error code"""
+
+    def __init__(self, message: str, code: str = 'INVALID_INPUT'):
+        super().__init__(message)
+        self.code = code
+
+
+# Prices a price rule may change
+PRICE_FIELDS = ('baseSellingPrice', 'baseBuyingPrice')
+
+
+def _discount(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        discount = float(value)
+    except (ValueError, TypeError):
+        raise ProductValidationError('discountPercent must be a valid number')
+    if discount < 0 or discount > 100:
+        raise ProductValidationError('discountPercent must be between 0 and 100')
+    return discount
+
+
+def _name(value: Any) -> Optional[str]:
+    if value is not None and len(str(value)) > MAX_NAME_LENGTH:
+        raise ProductValidationError(f'name must be at most {MAX_NAME_LENGTH} characters')
+    return value
+
+
+def _price(value: Any, field: str) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        price = float(value)
+    except (ValueError, TypeError):
+        raise ProductValidationError(f'{field} must be a valid number')
+    if price < 0:
+        raise ProductValidationError(f'{field} must be non-negative')
+    return price
+
+
+def validate_new_product(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check a POST /products payload.
+
+    Returns:
+        Keyword arguments for product_repo.create_product
+
+    Raises:
+        ProductValidationError: With the message and code of the first problem
+    """
+    name = body.get('name')
+    base_buying_price = body.get('baseBuyingPrice')
+    base_selling_price = body.get('baseSellingPrice')
+
+    if not name:
+        raise ProductValidationError('name is required', 'MISSING_FIELD')
+    if base_buying_price is None:
+        raise ProductValidationError('baseBuyingPrice is required', 'MISSING_FIELD')
+    if base_selling_price is None:
+        raise ProductValidationError('baseSellingPrice is required', 'MISSING_FIELD')
+
+    try:
+        base_buying_price = float(base_buying_price)
+        base_selling_price = float(base_selling_price)
+    except (ValueError, TypeError):
+        raise ProductValidationError('Prices must be valid numbers')
+    if base_buying_price < 0 or base_selling_price < 0:
+        raise ProductValidationError('Prices must be non-negative')
+
+    return {
+        'name': _name(name),
+        'base_buying_price': base_buying_price,
+        'base_selling_price': base_selling_price,
+        'discount_percent': _discount(body.get('discountPercent')),
+        'image_key': body.get('imageKey'),
+        'is_active': body.get('isActive', True)
+    }
+
+
+def validate_product_changes(body: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check a PATCH /products/{id} payload; absent fields stay unchanged.
+
+    Returns:
+        Keyword arguments for product_repo.update_product (without product_id)
+
+    Raises:
+        ProductValidationError: With the message and code of the first problem
+    """
+    return {
+        'name': _name(body.get('name')),
+        'base_buying_price': _price(body.get('baseBuyingPrice'), 'baseBuyingPrice'),
+        'base_selling_price': _price(body.get('baseSellingPrice'), 'baseSellingPrice'),
+        'discount_percent': _discount(body.get('discountPercent')),
+        'image_key': body.get('imageKey'),
+        'is_active': body.get('isActive')
+    }
+
+
+def validate_price_rule(rule: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check a price rule such as {"percent": 5, "search": "cola"}.
+
+    A rule raises (or lowers) prices by percent and/or a fixed amount and
+    selects products by search, productIds, or all=true; dryRun=true only
+    reports the changes.
+
+    Returns:
+        Keyword arguments for product_repo.apply_price_rule
+
+    Raises:
+        ProductValidationError: With the message of the first problem
+    """
+    percent = rule.get('percent')
+    amount = rule.get('amount')
+    if percent is None and amount is None:
+        raise ProductValidationError('A price rule needs percent or amount', 'MISSING_FIELD')
+    try:
+        percent = float(percent) if percent is not None else None
+        amount = float(amount) if amount is not None else None
+    except (ValueError, TypeError):
+        raise ProductValidationError('percent and amount must be valid numbers')
+    if percent is not None and percent <= -100:
+        raise ProductValidationError('percent must be greater than -100')
+
+    fields = rule.get('fields', ['baseSellingPrice'])
+    if isinstance(fields, str):
+        fields = [fields]
+    if not fields or not isinstance(fields, list) or any(field not in PRICE_FIELDS for field in fields):
+        raise ProductValidationError(f"fields must name prices among: {', '.join(PRICE_FIELDS)}")
+
+    product_ids = rule.get('productIds')
+    if product_ids is not None and (
+        not isinstance(product_ids, list) or not all(isinstance(product_id, str) for product_id in product_ids)
+    ):
+        raise ProductValidationError('productIds must be a list of product IDs')
+    search = rule.get('search')
+    if not (search or product_ids or rule.get('all') is True):
+        raise ProductValidationError('A price rule needs search, productIds or all=true', 'MISSING_FIELD')
+
+    return {
+        'percent': percent,
+        'amount': amount,
+        'fields': list(dict.fromkeys(fields)),
+        'search': search,
+        'product_ids': product_ids,
+        'include_inactive': rule.get('includeInactive') is True,
+        'dry_run': rule.get('dryRun') is True
+    }
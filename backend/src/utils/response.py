@@ -1,7 +1,51 @@
+import base64
+import gzip
+import hashlib
 import json
+import os
 from decimal import Decimal
 from typing import Any, Dict, Optional
 
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+# How Decimals (all DynamoDB numbers) are written to JSON:
+# 'number' - JSON numbers via float; exact for values up to 15 significant digits
+# 'string' - the Decimal's exact text as a JSON string
+DECIMAL_ENCODING = os.environ.get('DECIMAL_ENCODING', 'number')
+
+# The unbound Decimal methods are C functions, so the encoder converts each
+# Decimal without entering a Python frame, and they raise TypeError for any
+# other unsupported type just like a hand-written default would
+_ENCODERS = {
+    'number': json.JSONEncoder(default=Decimal.__float__, check_circular=False, separators=(',', ':')),
+    'string': json.JSONEncoder(default=Decimal.__str__, check_circular=False, separators=(',', ':'))
+}
+
+# Cache-Control sent with conditional GET responses, per policy name; each can
+# be overridden with CACHE_CONTROL_<POLICY>, e.g. CACHE_CONTROL_PRODUCTS.
+# 'no-cache' lets browsers keep the body but revalidate it (If-None-Match)
+# on every use, which costs a 304 instead of the full list when unchanged.
+CACHE_CONTROL_DEFAULTS = {
+    'products': 'private, no-cache',
+    'customers': 'private, no-cache'
+}
+
+# Bodies smaller than this are sent uncompressed (compression would not pay
+# for its CPU time and base64 overhead)
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+
+_JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'GET,POST,PATCH,DELETE,OPTIONS'
+}
+
 
 def decimal_default(obj):
     """JSON serializer for Decimal objects"""
@@ -10,18 +54,168 @@ def decimal_default(obj):
     raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
 
-def success_response(status_code: int, body: Any) -> Dict[str, Any]:
-    """Create a successful API Gateway response"""
-    return {
+def encode_json(body: Any, decimal_encoding: Optional[str] = None) -> str:
+    """
+    Serialize a response body, converting Decimals per decimal_encoding
+    (defaults to DECIMAL_ENCODING).
+    """
+    return _ENCODERS[decimal_encoding or DECIMAL_ENCODING].encode(body)
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick 'br' or 'gzip' for an Accept-Encoding header, or None for identity"""
+    accepted = _accepted_encodings(accept_encoding)
+    wildcard = accepted.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress_response(response: Dict[str, Any], event: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compress a response body in place when the client accepts it.
+    
+    Bodies under COMPRESSION_MIN_BYTES, empty bodies and requests without
+    Accept-Encoding are left as they are. Compressed bodies are base64
+    encoded with isBase64Encoded set, as API Gateway expects.
+    """
+    body = response.get('body')
+    if not event or not body or response.get('isBase64Encoded'):
+        return response
+    
+    data = body.encode('utf-8')
+    if len(data) < COMPRESSION_MIN_BYTES:
+        return response
+    
+    response['headers']['Vary'] = 'Accept-Encoding'
+    encoding = negotiate_encoding(get_header(event, 'Accept-Encoding'))
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+    elif encoding == 'gzip':
+        compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    else:
+        return response
+    
+    response['headers']['Content-Encoding'] = encoding
+    response['body'] = base64.b64encode(compressed).decode('ascii')
+    response['isBase64Encoded'] = True
+    return response
+
+
+def success_response(
+    status_code: int,
+    body: Any,
+    decimal_encoding: Optional[str] = None,
+    event: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Create a successful API Gateway response.
+    
+    Pass the request event to compress large bodies per its Accept-Encoding.
+    """
+    return compress_response({
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-            'Access-Control-Allow-Methods': 'GET,POST,PATCH,DELETE,OPTIONS'
-        },
-        'body': json.dumps(body, default=decimal_default)
-    }
+        'headers': dict(_JSON_HEADERS),
+        'body': encode_json(body, decimal_encoding)
+    }, event)
+
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """Read a request header case-insensitively (payload v2 lowercases names)"""
+    headers = event.get('headers') or {}
+    value = headers.get(name)
+    if value is None:
+        name = name.lower()
+        value = next((v for k, v in headers.items() if k.lower() == name), None)
+    return value
+
+
+def cache_control(policy: str) -> str:
+    """Cache-Control value for a policy name"""
+    return os.environ.get(f'CACHE_CONTROL_{policy.upper()}') or CACHE_CONTROL_DEFAULTS.get(policy, 'no-cache')
+
+
+def make_etag(encoded_body: str) -> str:
+    """
+    Weak validator derived from the serialized body.
+    
+    Weak, so it stays valid if the body is later transferred compressed.
+    """
+    digest = hashlib.blake2b(encoded_body.encode('utf-8'), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def conditional_response(
+    event: Dict[str, Any],
+    body: Any,
+    cache_policy: str,
+    decimal_encoding: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create a 200 response with ETag and Cache-Control, or an empty 304 when
+    the request's If-None-Match already names the current body.
+    The 200 body is compressed per the request's Accept-Encoding.
+    """
+    encoded = encode_json(body, decimal_encoding)
+    etag = make_etag(encoded)
+    headers = dict(_JSON_HEADERS)
+    headers['ETag'] = etag
+    headers['Cache-Control'] = cache_control(cache_policy)
+    headers['Access-Control-Expose-Headers'] = 'ETag'
+    
+    if etag_matches(get_header(event, 'If-None-Match'), etag):
+        del headers['Content-Type']
+        return {
+            'statusCode': 304,
+            'headers': headers,
+            'body': ''
+        }
+    
+    return compress_response({
+        'statusCode': 200,
+        'headers': headers,
+        'body': encoded
+    }, event)
 
 
 def error_response(status_code: int, message: str, code: Optional[str] = None) -> Dict[str, Any]:
@@ -34,12 +228,7 @@ def error_response(status_code: int, message: str, code: Optional[str] = None) -
     
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-            'Access-Control-Allow-Methods': 'GET,POST,PATCH,DELETE,OPTIONS'
-        },
+        'headers': dict(_JSON_HEADERS),
         'body': json.dumps(error_body)
     }
 
@@ -0,0 +1,63 @@
+"""
+Time-sortable identifiers (ULID).
+
+A ULID is 26 Crockford base32 characters: a 48-bit millisecond timestamp
+followed by 80 random bits, so IDs sort by creation time and the timestamp
+can be recovered from the ID alone.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_DECODE = {char: index for index, char in enumerate(_ALPHABET)}
+ULID_LENGTH = 26
+
+
+def new_ulid(timestamp: Optional[datetime] = None) -> str:
+    """
+    Generate a ULID for the given time (defaults to now).
+
+    Naive datetimes are treated as UTC.
+    """
+    if timestamp is None:
+        timestamp = datetime.now(timezone.utc)
+    elif timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+
+    millis = (timestamp - _EPOCH) // timedelta(milliseconds=1)
+    if not 0 <= millis < 2 ** 48:
+        raise ValueError('Timestamp is outside the ULID range')
+
+    value = (millis << 80) | int.from_bytes(os.urandom(10), 'big')
+    chars = []
+    for _ in range(ULID_LENGTH):
+        chars.append(_ALPHABET[value & 0x1F])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def is_ulid(value: str) -> bool:
+    """Check whether a string is a well-formed ULID"""
+    return (
+        isinstance(value, str)
+        and len(value) == ULID_LENGTH
+        and value[0] in '01234567'
+        and all(char in _DECODE for char in value)
+    )
+
+
+def ulid_timestamp(value: str) -> datetime:
+    """
+    Recover the (millisecond precision, UTC) timestamp encoded in a ULID.
+
+    Raises:
+        ValueError: If value is not a ULID
+    """
+    if not is_ulid(value):
+        raise ValueError(f'{value!r} is not a ULID')
+    number = 0
+    for char in value:
+        number = (number << 5) | _DECODE[char]
+    return _EPOCH + timedelta(milliseconds=number >> 80)
@@ -29,7 +29,8 @@ def dynamodb_table():
                 {'AttributeName': 'pk', 'AttributeType': 'S'},
                 {'AttributeName': 'sk', 'AttributeType': 'S'},
                 {'AttributeName': 'entityType', 'AttributeType': 'S'},
-                {'AttributeName': 'name', 'AttributeType': 'S'}
+                {'AttributeName': 'name', 'AttributeType': 'S'},
+                {'AttributeName': 'activeEntityType', 'AttributeType': 'S'}
             ],
             GlobalSecondaryIndexes=[
                 {
@@ -43,6 +44,18 @@ def dynamodb_table():
                         'ReadCapacityUnits': 5,
                         'WriteCapacityUnits': 5
                     }
+                },
+                {
+                    'IndexName': 'ActiveEntityIndex',
+                    'KeySchema': [
+                        {'AttributeName': 'activeEntityType', 'KeyType': 'HASH'},
+                        {'AttributeName': 'name', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'},
+                    'ProvisionedThroughput': {
+                        'ReadCapacityUnits': 5,
+                        'WriteCapacityUnits': 5
+                    }
                 }
             ],
             BillingMode='PAY_PER_REQUEST'
@@ -53,6 +66,10 @@ def dynamodb_table():
         dynamo_client.table = table
         dynamo_client.dynamodb = dynamodb
         
+        # Each test gets a fresh table, so nothing cached may carry over
+        from src.db.product_repo import catalog_cache
+        catalog_cache.clear()
+        
         yield table
 
 
@@ -82,3 +99,10 @@ def sample_customer():
         'isActive': True
     }
 
+
+
+@pytest.fixture
+def auth_headers():
+    """Authorization header carrying a valid token"""
+    from src.auth import generate_token
+    return {'Authorization': f'Bearer {generate_token("admin")}'}
@@ -0,0 +1,174 @@
+import time
+import jwt
+import pytest
+from datetime import datetime, timezone
+from src import auth, hs256
+from src.auth import (
+    generate_token,
+    verify_token,
+    extract_and_verify_token,
+    AuthenticationError,
+    VerifiedTokenCache,
+    token_cache
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+class TestAuth:
+    """Tests for token generation and verification"""
+    
+    def test_round_trip(self):
+        """Test that a generated token verifies"""
+        payload = verify_token(generate_token('admin'))
+        
+        assert payload['sub'] == 'admin'
+        assert payload['exp'] > payload['iat']
+    
+    def test_invalid_token(self):
+        """Test that a garbage token is rejected"""
+        with pytest.raises(AuthenticationError):
+            verify_token('not.a.token')
+    
+    def test_missing_header(self):
+        """Test that a request without Authorization is rejected"""
+        with pytest.raises(AuthenticationError):
+            extract_and_verify_token({'headers': {}})
+    
+    def test_repeat_verification_hits_cache(self, monkeypatch):
+        """Test that a verified token is not decoded again"""
+        token = generate_token('admin')
+        verify_token(token)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError('expected a cache hit')
+        
+        monkeypatch.setattr(auth.jwt, 'decode', fail)
+        
+        assert verify_token(token)['sub'] == 'admin'
+        assert token_cache.stats()['hits'] == 1
+    
+    def test_invalid_token_is_not_cached(self):
+        """Test that failed verifications are never remembered"""
+        token = generate_token('admin')
+        tampered = token[:-2] + ('AA' if token[-2:] != 'AA' else 'BB')
+        
+        for _ in range(2):
+            with pytest.raises(AuthenticationError):
+                verify_token(tampered)
+        
+        assert token_cache.stats()['size'] == 0
+
+
+class TestVerifiedTokenCache:
+    """Tests for the verified-token LRU"""
+    
+    def test_entries_expire_at_exp(self):
+        """Test that a cached payload is dropped once the token expires"""
+        now = [1000.0]
+        cache = VerifiedTokenCache(max_size=4, clock=lambda: now[0])
+        cache.put('token', {'sub': 'admin', 'exp': 1010})
+        
+        assert cache.get('token')['sub'] == 'admin'
+        now[0] = 1010.0
+        assert cache.get('token') is None
+        assert cache.stats()['size'] == 0
+    
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays within max_size"""
+        cache = VerifiedTokenCache(max_size=2, clock=lambda: 0)
+        cache.put('a', {'exp': 10})
+        cache.put('b', {'exp': 10})
+        cache.get('a')
+        cache.put('c', {'exp': 10})
+        
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.stats()['size'] == 2
+
+
+class TestHs256:
+    """Cross-compatibility of the built-in HS256 backend with PyJWT"""
+    
+    SECRET = 'x' * 48
+    
+    def test_default_backend_is_builtin(self):
+        """Test that tokens are handled without PyJWT by default"""
+        assert auth.JWT_BACKEND == 'builtin'
+        assert auth.jwt is hs256
+    
+    @pytest.mark.parametrize('payload', [
+        {'sub': 'admin', 'exp': 2000000000, 'iat': 1700000000},
+        {'sub': 'ädmin / ✓', 'exp': 2000000000, 'iat': 1700000000, 'scopes': ['a', 'b'], 'n': 1.5},
+        {'sub': 'admin', 'exp': datetime(2033, 5, 18, tzinfo=timezone.utc)},
+    ])
+    def test_tokens_are_byte_identical(self, payload):
+        """Test that encode matches jwt.encode exactly"""
+        assert hs256.encode(payload, self.SECRET) == jwt.encode(payload, self.SECRET, algorithm='HS256')
+    
+    def test_pyjwt_tokens_verify(self):
+        """Test that tokens issued by PyJWT decode with the built-in backend"""
+        token = jwt.encode({'sub': 'admin', 'exp': int(time.time()) + 60}, self.SECRET, algorithm='HS256')
+        
+        assert hs256.decode(token, self.SECRET, algorithms=['HS256'])['sub'] == 'admin'
+    
+    def test_builtin_tokens_verify_with_pyjwt(self):
+        """Test that generate_token output is accepted by PyJWT"""
+        payload = jwt.decode(generate_token('admin'), auth.JWT_SECRET, algorithms=['HS256'])
+        
+        assert payload['sub'] == 'admin'
+    
+    def test_expired(self):
+        """Test that exp in the past is rejected like PyJWT does"""
+        token = hs256.encode({'sub': 'admin', 'exp': 1000}, self.SECRET)
+        
+        with pytest.raises(hs256.ExpiredSignatureError):
+            hs256.decode(token, self.SECRET, now=1000)
+        with pytest.raises(jwt.ExpiredSignatureError):
+            jwt.decode(token, self.SECRET, algorithms=['HS256'])
+        assert hs256.decode(token, self.SECRET, now=999)['exp'] == 1000
+    
+    def test_issued_in_future(self):
+        """Test that iat after now is rejected"""
+        token = hs256.encode({'sub': 'admin', 'iat': 2000}, self.SECRET)
+        
+        with pytest.raises(hs256.ImmatureSignatureError):
+            hs256.decode(token, self.SECRET, now=1999)
+        assert hs256.decode(token, self.SECRET, now=1999, leeway=1)['iat'] == 2000
+    
+    def test_non_integer_exp(self):
+        """Test that a non-numeric exp claim is rejected"""
+        token = hs256.encode({'sub': 'admin', 'exp': 'soon'}, self.SECRET)
+        
+        with pytest.raises(hs256.InvalidTokenError):
+            hs256.decode(token, self.SECRET)
+    
+    @pytest.mark.parametrize('token', [
+        '',
+        'abc',
+        'a.b',
+        'a.b.c',
+        jwt.encode({'sub': 'admin'}, 'y' * 48, algorithm='HS256'),
+        jwt.encode({'sub': 'admin'}, None, algorithm='none'),
+        jwt.encode({'sub': 'admin'}, 'x' * 64, algorithm='HS512'),
+    ])
+    def test_untrusted_tokens_rejected(self, token):
+        """Test malformed, wrongly signed and non-HS256 tokens"""
+        with pytest.raises(hs256.InvalidTokenError):
+            hs256.decode(token, self.SECRET, algorithms=['HS256'])
+        with pytest.raises(jwt.InvalidTokenError):
+            jwt.decode(token, self.SECRET, algorithms=['HS256'])
+    
+    def test_tampered_payload_rejected(self):
+        """Test that changing the claims invalidates the signature"""
+        header, _, signature = hs256.encode({'sub': 'admin'}, self.SECRET).split('.')
+        forged = hs256.encode({'sub': 'root'}, self.SECRET).split('.')[1]
+        
+        with pytest.raises(hs256.DecodeError):
+            hs256.decode(f'{header}.{forged}.{signature}', self.SECRET)
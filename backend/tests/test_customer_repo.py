@@ -4,9 +4,31 @@ from src.db.customer_repo import (
     get_customer,
     update_customer_debt,
     list_customers,
+    list_customers_page,
     get_customer_orders,
-    get_customer_debt_adjustments
+    get_customer_debt_adjustments,
+    get_customer_activity,
+    get_customer_ledger
 )
+from src.db.product_repo import create_product
+from src.db.order_repo import create_order
+from src.db.debt_repo import create_debt_adjustment
+
+
+@pytest.fixture
+def customer_history():
+    """A customer with three orders and two debt adjustments, interleaved in time"""
+    customer = create_customer('Test Customer', 'Location', '123')
+    product = create_product('Test Product', 10.0, 15.0)
+    for day in (1, 3, 5):
+        create_order(
+            customer['id'], f'2024-01-0{day}T10:00:00Z',
+            [{'productId': product['id'], 'quantity': 1, 'unitPrice': 10.0}],
+            paid_now=2.0
+        )
+    create_debt_adjustment(customer['id'], -5.0, 'Cash payment', '2024-01-02T10:00:00Z')
+    create_debt_adjustment(customer['id'], 1.5, 'Fee', '2024-01-04T10:00:00Z')
+    return customer
 
 
 class TestCustomerRepo:
@@ -80,6 +102,20 @@ class TestCustomerRepo:
         assert len(customers) == 2  # Only active customers
         assert all(c.get('isActive', True) for c in customers)
     
+    def test_list_customers_reads_only_active_index(self, dynamodb_table):
+        """Test that inactive customers are not read by the default listing"""
+        create_customer('Customer 1', 'Location 1', '123')
+        create_customer('Inactive Customer', 'Location 2', '456', is_active=False)
+        
+        queries = []
+        dynamodb_table.meta.client.meta.events.register(
+            'provide-client-params.dynamodb.Query', lambda params, **kwargs: queries.append(params)
+        )
+        customers, _ = list_customers_page()
+        
+        assert [c['name'] for c in customers] == ['Customer 1']
+        assert [q['IndexName'] for q in queries] == ['ActiveEntityIndex']
+    
     def test_list_customers_with_search(self, dynamodb_table):
         """Test listing customers with search filter"""
         create_customer('Ahmed Market', 'Nazareth', '123')
@@ -91,6 +127,31 @@ class TestCustomerRepo:
         assert len(customers) == 2
         assert all('Ahmed' in c['name'] for c in customers)
     
+    def test_list_customers_page_with_search(self, dynamodb_table):
+        """Test that paging applies the search filter before counting the limit"""
+        create_customer('Ahmed Market', 'Nazareth', '123')
+        create_customer('Bakery', 'Haifa', '456')
+        create_customer('Ahmed Store', 'Tel Aviv', '789')
+        
+        first, next_key = list_customers_page(limit=1, search='ahmed')
+        assert [c['name'] for c in first] == ['Ahmed Market']
+        
+        second, next_key = list_customers_page(limit=1, start_key=next_key, search='ahmed')
+        assert [c['name'] for c in second] == ['Ahmed Store']
+        assert next_key is None
+    
+    def test_list_customers_page_fields(self, dynamodb_table):
+        """Test that listing and searching read only the requested fields plus keys"""
+        create_customer('Ahmed Market', 'Haifa', '123', email='a@example.com')
+        
+        listed, _ = list_customers_page(fields=['id', 'phone'])
+        searched, _ = list_customers_page(search='ahmed', fields=['id', 'phone'])
+        
+        for customers in (listed, searched):
+            assert customers[0]['phone'] == '123'
+            assert 'email' not in customers[0]
+            assert 'location' not in customers[0]
+    
     def test_get_customer_orders(self, dynamodb_table):
         """Test getting customer orders"""
         customer = create_customer('Test Customer', 'Location', '123')
@@ -110,4 +171,61 @@ class TestCustomerRepo:
         
         assert isinstance(adjustments, list)
         # Initially empty, but function should work
+    
+    def test_get_customer_activity(self, dynamodb_table, customer_history):
+        """Test reading META, recent orders and adjustments"""
+        activity = get_customer_activity(customer_history['id'], order_limit=2, debt_limit=1)
+        
+        assert activity['customer']['id'] == customer_history['id']
+        assert [o['orderDate'][:10] for o in activity['orders']] == ['2024-01-05', '2024-01-03']
+        assert [a['reason'] for a in activity['debtAdjustments']] == ['Fee']
+    
+    def test_get_customer_activity_reads_are_bounded(self, dynamodb_table):
+        """Test that a long order history is not read to find the customer"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        with dynamodb_table.batch_writer() as batch:
+            for day in range(1, 29):
+                batch.put_item(Item={
+                    'pk': f"CUSTOMER#{customer['id']}",
+                    'sk': f'ORDER#2024-02-{day:02d}T10:00:00Z#order-{day}',
+                    'entityType': 'ORDER',
+                    'orderDate': f'2024-02-{day:02d}T10:00:00Z',
+                    'totalAmount': 10,
+                    'items': [{'productId': 'p1', 'quantity': 1}]
+                })
+        create_debt_adjustment(customer['id'], -5.0, 'Cash payment', '2024-01-02T10:00:00Z')
+        
+        scanned = []
+        dynamodb_table.meta.client.meta.events.register(
+            'after-call.dynamodb.Query', lambda parsed, **kwargs: scanned.append(parsed['ScannedCount'])
+        )
+        
+        activity = get_customer_activity(customer['id'], order_limit=3, debt_limit=3)
+        
+        assert len(activity['orders']) == 3
+        assert len(activity['debtAdjustments']) == 1
+        assert sorted(scanned) == [1, 3]
+    
+    def test_get_customer_activity_skips_line_items(self, dynamodb_table, customer_history):
+        """Test that orders are read without their line items"""
+        activity = get_customer_activity(customer_history['id'])
+        
+        assert activity['orders']
+        assert all('items' not in order for order in activity['orders'])
+        assert 'pk' not in activity['customer']
+    
+    def test_get_customer_activity_missing_customer(self, dynamodb_table):
+        """Test that an unknown customer returns None"""
+        assert get_customer_activity('nonexistent-id') is None
+    
+    def test_get_customer_ledger(self, dynamodb_table, customer_history):
+        """Test the merged ledger with running balances"""
+        ledger = get_customer_ledger(customer_history['id'], limit=4)
+        entries = ledger['entries']
+        
+        assert [e['type'] for e in entries] == ['ORDER', 'DEBT_ADJUSTMENT', 'ORDER', 'DEBT_ADJUSTMENT']
+        assert [float(e['amount']) for e in entries] == [8.0, 1.5, 8.0, -5.0]
+        # 3 orders adding 8 each, -5 and +1.5 in adjustments
+        assert float(ledger['customer']['totalDebt']) == 20.5
+        assert [float(e['balanceAfter']) for e in entries] == [20.5, 12.5, 11.0, 3.0]
 
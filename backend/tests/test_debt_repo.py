@@ -1,6 +1,13 @@
 import pytest
+from decimal import Decimal
+from src.db import debt_repo
 from src.db.debt_repo import create_debt_adjustment
-from src.db.customer_repo import create_customer, get_customer
+from src.db.customer_repo import (
+    create_customer,
+    get_customer,
+    update_customer_debt,
+    CustomerNotFoundError
+)
 
 
 class TestDebtRepo:
@@ -108,4 +115,65 @@ class TestDebtRepo:
         else:
             total_debt_float = float(total_debt)
         assert abs(total_debt_float - 50.0) < 0.01
+    
+    def test_debt_adjustment_returns_new_balance(self, dynamodb_table):
+        """Test that balanceAfter matches the stored total without a read-back"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        create_debt_adjustment(customer['id'], 30.0, 'Initial debt')
+        
+        adjustment = create_debt_adjustment(customer['id'], -12.5, 'Payment received')
+        
+        assert adjustment['balanceAfter'] == Decimal('17.5')
+        assert get_customer(customer['id'])['totalDebt'] == Decimal('17.5')
+    
+    def test_debt_adjustment_one_write(self, dynamodb_table):
+        """Test that an adjustment costs one read and one transactional write"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        calls = []
+        dynamodb_table.meta.client.meta.events.register(
+            'before-call.dynamodb.*', lambda model, **kwargs: calls.append(model.name)
+        )
+        
+        create_debt_adjustment(customer['id'], 10.0, 'Added debt')
+        
+        assert calls == ['GetItem', 'TransactWriteItems']
+    
+    def test_debt_adjustment_unknown_customer(self, dynamodb_table):
+        """Test that nothing is written for a missing customer"""
+        with pytest.raises(CustomerNotFoundError):
+            create_debt_adjustment('nonexistent-id', 10.0, 'Added debt')
+        
+        assert dynamodb_table.scan()['Items'] == []
+    
+    def test_debt_adjustment_retries_when_balance_moves(self, dynamodb_table, monkeypatch):
+        """Test that a balance changed after the read is not overwritten"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        real_read = debt_repo._read_total_debt
+        reads = []
+        
+        def read_then_race(customer_id):
+            balance = real_read(customer_id)
+            if not reads:
+                # Another writer changes the balance after our first read
+                update_customer_debt(customer_id, 5.0)
+            reads.append(balance)
+            return balance
+        
+        monkeypatch.setattr(debt_repo, '_read_total_debt', read_then_race)
+        
+        adjustment = create_debt_adjustment(customer['id'], 10.0, 'Added debt')
+        
+        assert len(reads) == 2
+        assert adjustment['balanceAfter'] == Decimal('15')
+        assert get_customer(customer['id'])['totalDebt'] == Decimal('15')
+    
+    def test_debt_adjustment_same_timestamp(self, dynamodb_table):
+        """Test that an adjustment never overwrites another one"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        create_debt_adjustment(customer['id'], 10.0, 'First', '2024-01-01T10:00:00Z')
+        
+        with pytest.raises(ValueError):
+            create_debt_adjustment(customer['id'], 20.0, 'Second', '2024-01-01T10:00:00Z')
+        
+        assert get_customer(customer['id'])['totalDebt'] == Decimal('10')
 
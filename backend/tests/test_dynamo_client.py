@@ -0,0 +1,40 @@
+import pytest
+from src.db import dynamo_client
+
+
+@pytest.fixture
+def fresh_client():
+    """Run with nothing cached and restore the test table afterwards"""
+    saved = dynamo_client.dynamodb, dynamo_client.table
+    dynamo_client.reset()
+    yield
+    dynamo_client.dynamodb, dynamo_client.table = saved
+
+
+class TestDynamoClient:
+    """Tests for the lazy DynamoDB client factory"""
+    
+    def test_nothing_built_until_first_use(self, fresh_client):
+        """Test that the resource is created on demand and then reused"""
+        assert dynamo_client.dynamodb is None
+        
+        table = dynamo_client.get_table()
+        
+        assert dynamo_client.dynamodb is not None
+        assert dynamo_client.get_table() is table
+        assert table.name == 'distribution-app-dev'
+    
+    def test_client_settings_from_environment(self, fresh_client, monkeypatch):
+        """Test pool size, timeouts, retries and endpoint override"""
+        monkeypatch.setenv('DYNAMODB_ENDPOINT_URL', 'http://localhost:8000')
+        monkeypatch.setenv('DYNAMODB_MAX_POOL_CONNECTIONS', '20')
+        monkeypatch.setenv('DYNAMODB_READ_TIMEOUT', '1.5')
+        
+        client = dynamo_client.get_client()
+        config = client.meta.config
+        
+        assert client.meta.endpoint_url == 'http://localhost:8000'
+        assert config.max_pool_connections == 20
+        assert config.read_timeout == 1.5
+        assert config.tcp_keepalive is True
+        assert config.retries['mode'] == 'adaptive'
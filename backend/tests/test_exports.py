@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+import boto3
+import pytest
+from moto.s3 import models as s3_models
+from src.db.exports import run_export
+from src.db.customer_repo import create_customer, update_customer_debt
+from src.db.product_repo import create_product, update_product
+from src.utils.export_targets import S3ExportTarget, get_export_target
+
+
+@pytest.fixture
+def local_target(tmp_path, monkeypatch):
+    """Exports written under a temporary EXPORT_DIR"""
+    monkeypatch.delenv('EXPORT_BUCKET', raising=False)
+    monkeypatch.setenv('EXPORT_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def export_bucket(monkeypatch):
+    """A mocked bucket and parts small enough to force multipart uploads"""
+    boto3.client('s3', region_name='eu-central-1').create_bucket(
+        Bucket='exports',
+        CreateBucketConfiguration={'LocationConstraint': 'eu-central-1'}
+    )
+    monkeypatch.setattr(s3_models, 'S3_UPLOAD_PART_MIN_SIZE', 256)
+    monkeypatch.setenv('EXPORT_BUCKET', 'exports')
+    target = get_export_target()
+    target.part_size = 256
+    return target
+
+
+def read_export(local_target, report):
+    with open(local_target / report['key'], encoding='utf-8') as f:
+        return f.read()
+
+
+class TestExports:
+    """Tests for streaming CSV/JSONL exports"""
+
+    def test_product_csv_export(self, local_target):
+        """Test that active products are exported with effective prices"""
+        create_product('Water', 0.5, 1.0, discount_percent=10)
+        create_product('Cola, 1L', 1.0, 2.0)
+        retired = create_product('Retired', 1.0, 1.0)
+        update_product(retired['id'], is_active=False)
+
+        report = run_export('products')
+
+        rows = list(csv.DictReader(io.StringIO(read_export(local_target, report))))
+        assert report['rows'] == 2
+        assert report['url'].startswith('file://')
+        assert [row['name'] for row in rows] == ['Cola, 1L', 'Water']
+        assert rows[1]['effectiveSellingPrice'] == '0.90'
+        assert rows[1]['isActive'] == 'true'
+
+    def test_effective_prices_are_exact(self, local_target):
+        """Test that discounted prices are written as cents, not binary floats"""
+        create_product('Juice', 1.1, 3.41, discount_percent=10)
+
+        row = next(csv.DictReader(io.StringIO(read_export(local_target, run_export('products')))))
+
+        assert row['effectiveBuyingPrice'] == '0.99'
+        assert row['effectiveSellingPrice'] == '3.07'
+
+    def test_formula_cells_are_neutralised(self, local_target):
+        """Test that text starting like a formula is prefixed with a quote"""
+        customer = create_customer('=HYPERLINK("http://x")', 'Town', '123', notes='@SUM(A1)')
+        update_customer_debt(customer['id'], -4)
+
+        report = run_export('customers')
+
+        row = next(csv.DictReader(io.StringIO(read_export(local_target, report))))
+        assert row['name'] == '\'=HYPERLINK("http://x")'
+        assert row['notes'] == "'@SUM(A1)"
+        assert row['totalDebt'] == '-4.0'
+
+    def test_inactive_products_on_request(self, local_target):
+        """Test that includeInactive also exports inactive products"""
+        retired = create_product('Retired', 1.0, 1.0)
+        update_product(retired['id'], is_active=False)
+
+        assert run_export('products', include_inactive=True)['rows'] == 1
+
+    def test_customer_jsonl_export_lists_debtors(self, local_target):
+        """Test that customers without debt are left out unless asked for"""
+        debtor = create_customer('Debtor', 'Town', '123')
+        create_customer('Settled', 'Town', '456')
+        update_customer_debt(debtor['id'], 12.5)
+
+        report = run_export('customers', 'jsonl')
+
+        lines = read_export(local_target, report).splitlines()
+        assert [json.loads(line)['name'] for line in lines] == ['Debtor']
+        assert json.loads(lines[0])['totalDebt'] == 12.5
+        assert run_export('customers', 'jsonl', with_debt_only=False)['rows'] == 2
+
+    def test_empty_export_has_header(self, local_target):
+        """Test that a CSV export with no rows still has its header"""
+        report = run_export('customers')
+
+        assert report['rows'] == 0
+        assert read_export(local_target, report).startswith('id,name,')
+
+    def test_unknown_dataset_or_format(self, local_target):
+        """Test that unknown datasets and formats are rejected"""
+        with pytest.raises(ValueError):
+            run_export('orders')
+        with pytest.raises(ValueError):
+            run_export('products', 'xlsx')
+
+    def test_s3_multipart_export(self, export_bucket):
+        """Test that a large export is uploaded in parts and can be downloaded"""
+        for i in range(20):
+            create_product(f'Product {i:02d}', 1.0, 2.0)
+
+        report = run_export('products', target=export_bucket)
+
+        body = boto3.client('s3', region_name='eu-central-1').get_object(Bucket='exports', Key=report['key'])
+        text = body['Body'].read().decode('utf-8')
+        assert report['bytes'] > 2 * 256
+        assert len(text.encode('utf-8')) == report['bytes']
+        assert len(text.splitlines()) == 21
+        assert body['ContentDisposition'] == f'attachment; filename="{report["filename"]}"'
+        assert 'X-Amz-Signature' in report['url']
+
+    def test_s3_small_export_is_single_put(self, export_bucket):
+        """Test that an export of one part is sent with PutObject"""
+        report = run_export('customers', target=export_bucket)
+
+        body = boto3.client('s3', region_name='eu-central-1').get_object(Bucket='exports', Key=report['key'])
+        assert body['Body'].read() == b'id,name,location,phone,email,notes,totalDebt,isActive,createdAt,updatedAt\n'
+
+    def test_failed_upload_is_aborted(self, export_bucket, monkeypatch):
+        """Test that a multipart upload is aborted when a part fails"""
+        real_upload_part = export_bucket.client.upload_part
+        calls = []
+
+        def failing_upload_part(**params):
+            calls.append(params['PartNumber'])
+            if len(calls) == 2:
+                raise ConnectionError('connection reset')
+            return real_upload_part(**params)
+
+        monkeypatch.setattr(export_bucket.client, 'upload_part', failing_upload_part)
+        with pytest.raises(ConnectionError):
+            export_bucket.write('exports/x.csv', iter([b'a' * 256, b'b' * 256, b'c']), 'text/csv', 'x.csv')
+
+        uploads = export_bucket.client.list_multipart_uploads(Bucket='exports')
+        assert not uploads.get('Uploads')
+
+    def test_s3_target_enforces_minimum_part_size(self):
+        """Test that parts are never configured below the S3 minimum"""
+        assert S3ExportTarget('exports', None, 1024).part_size == 5 * 1024 * 1024
@@ -4,14 +4,23 @@ from src.handlers.create_product import handler as create_product_handler
 from src.handlers.get_products import handler as get_products_handler
 from src.handlers.get_product import handler as get_product_handler
 from src.handlers.update_product import handler as update_product_handler
+from src.handlers.bulk_update_products import handler as bulk_update_products_handler
 from src.handlers.create_customer import handler as create_customer_handler
 from src.handlers.get_customers import handler as get_customers_handler
 from src.handlers.get_customer_detail import handler as get_customer_detail_handler
 from src.handlers.create_order import handler as create_order_handler
+from src.handlers.import_orders import handler as import_orders_handler
 from src.handlers.get_customer_orders import handler as get_customer_orders_handler
+from src.handlers.get_customer_ledger import handler as get_customer_ledger_handler
 from src.handlers.adjust_customer_debt import handler as adjust_customer_debt_handler
-from src.db.product_repo import create_product
+from src.handlers.get_sales_report import handler as get_sales_report_handler
+from src.handlers.sales_rollup_stream import handler as sales_rollup_stream_handler
+from src.handlers.create_export import handler as create_export_handler
+from src.handlers import login
+from src.db.product_repo import create_product, update_product
 from src.db.customer_repo import create_customer
+from src.db.debt_repo import create_debt_adjustment
+from src.db.order_repo import create_order
 
 
 class TestProductHandlers:
@@ -51,6 +60,18 @@ class TestProductHandlers:
         body = json.loads(response['body'])
         assert 'message' in body
     
+    def test_create_product_handler_rejects_long_name(self, dynamodb_table, auth_headers):
+        """Test that a name too long for the search index is rejected"""
+        event = {
+            'headers': auth_headers,
+            'body': json.dumps({'name': 'x ' * 60, 'baseBuyingPrice': 1.0, 'baseSellingPrice': 2.0})
+        }
+        
+        response = create_product_handler(event, None)
+        
+        assert response['statusCode'] == 400
+        assert json.loads(response['body'])['code'] == 'INVALID_INPUT'
+    
     def test_get_products_handler(self, dynamodb_table):
         """Test getting list of products"""
         create_product('Product 1', 10.0, 15.0)
@@ -63,6 +84,66 @@ class TestProductHandlers:
         body = json.loads(response['body'])
         assert len(body['items']) == 2
     
+    def test_get_products_handler_paginates(self, dynamodb_table, auth_headers):
+        """Test walking the product list with limit and nextToken"""
+        for i in range(3):
+            create_product(f'Product {i}', 10.0, 15.0)
+        
+        event = {'headers': auth_headers, 'queryStringParameters': {'limit': '2'}}
+        body = json.loads(get_products_handler(event, None)['body'])
+        assert [p['name'] for p in body['items']] == ['Product 0', 'Product 1']
+        assert body['nextToken']
+        
+        event['queryStringParameters'] = {'limit': '2', 'nextToken': body['nextToken']}
+        body = json.loads(get_products_handler(event, None)['body'])
+        assert [p['name'] for p in body['items']] == ['Product 2']
+        assert body['nextToken'] is None
+    
+    def test_get_products_handler_rejects_foreign_token(self, dynamodb_table, auth_headers):
+        """Test that a customers token cannot be replayed against products"""
+        create_customer('Customer 1', 'Location 1', '123')
+        create_customer('Customer 2', 'Location 2', '456')
+        
+        event = {'headers': auth_headers, 'queryStringParameters': {'limit': '1'}}
+        token = json.loads(get_customers_handler(event, None)['body'])['nextToken']
+        
+        event['queryStringParameters'] = {'nextToken': token}
+        response = get_products_handler(event, None)
+        
+        assert response['statusCode'] == 400
+    
+    def test_get_products_handler_not_modified(self, dynamodb_table, auth_headers):
+        """Test that an unchanged list is answered with 304 until a product changes"""
+        product = create_product('Product 1', 10.0, 15.0)
+        first = get_products_handler({'headers': auth_headers}, None)
+        etag = first['headers']['ETag']
+        
+        repeat = get_products_handler({'headers': {**auth_headers, 'if-none-match': etag}}, None)
+        assert repeat['statusCode'] == 304
+        assert repeat['body'] == ''
+        
+        update_product(product['id'], base_selling_price=16.0)
+        changed = get_products_handler({'headers': {**auth_headers, 'if-none-match': etag}}, None)
+        assert changed['statusCode'] == 200
+        assert changed['headers']['ETag'] != etag
+    
+    def test_get_products_handler_fields(self, dynamodb_table, auth_headers):
+        """Test the summary shape, a sparse fieldset and an unknown field"""
+        create_product('Product 1', 10.0, 20.0, discount_percent=10)
+        
+        event = {'headers': auth_headers}
+        summary = json.loads(get_products_handler(event, None)['body'])['items'][0]
+        assert summary['effectiveSellingPrice'] == 18.0
+        assert 'createdAt' not in summary and 'pk' not in summary
+        
+        event['queryStringParameters'] = {'fields': 'id,effectiveSellingPrice'}
+        sparse = json.loads(get_products_handler(event, None)['body'])['items'][0]
+        assert set(sparse) == {'id', 'effectiveSellingPrice'}
+        assert sparse['effectiveSellingPrice'] == 18.0
+        
+        event['queryStringParameters'] = {'fields': 'id,cost'}
+        assert get_products_handler(event, None)['statusCode'] == 400
+    
     def test_get_product_handler(self, dynamodb_table):
         """Test getting a single product"""
         product = create_product('Test Product', 10.0, 15.0)
@@ -95,6 +176,22 @@ class TestProductHandlers:
         assert abs(body['baseSellingPrice'] - 20.0) < 0.01
 
 
+    def test_bulk_update_products_handler(self, dynamodb_table, auth_headers):
+        """Test a bulk upsert and a dry-run price rule"""
+        product = create_product('Test Product', 10.0, 15.0)
+        
+        event = {'headers': auth_headers, 'body': json.dumps({'products': [{'id': product['id'], 'discountPercent': 10}]})}
+        body = json.loads(bulk_update_products_handler(event, None)['body'])
+        assert body['results'] == [{'index': 0, 'id': product['id'], 'status': 'updated'}]
+        
+        event['body'] = json.dumps({'rule': {'percent': 10, 'productIds': [product['id']], 'dryRun': True}})
+        body = json.loads(bulk_update_products_handler(event, None)['body'])
+        assert body['results'][0]['prices'] == {'baseSellingPrice': {'from': 15.0, 'to': 16.5}}
+        
+        event['body'] = json.dumps({'rule': {'percent': 10}})
+        assert bulk_update_products_handler(event, None)['statusCode'] == 400
+
+
 class TestCustomerHandlers:
     """Tests for customer Lambda handlers"""
     
@@ -129,6 +226,18 @@ class TestCustomerHandlers:
         
         assert response['statusCode'] == 400
     
+    def test_create_customer_handler_rejects_long_name(self, dynamodb_table, auth_headers):
+        """Test that a name too long for the search index is rejected"""
+        event = {
+            'headers': auth_headers,
+            'body': json.dumps({'name': 'x ' * 60, 'location': 'Town', 'phone': '123'})
+        }
+        
+        response = create_customer_handler(event, None)
+        
+        assert response['statusCode'] == 400
+        assert json.loads(response['body'])['code'] == 'INVALID_INPUT'
+    
     def test_get_customers_handler(self, dynamodb_table):
         """Test getting list of customers"""
         create_customer('Customer 1', 'Location 1', '123')
@@ -141,6 +250,18 @@ class TestCustomerHandlers:
         body = json.loads(response['body'])
         assert len(body['items']) == 2
     
+    def test_get_customers_handler_fields(self, dynamodb_table, auth_headers):
+        """Test that customers are listed in their summary shape unless fields asks otherwise"""
+        create_customer('Customer 1', 'Location 1', '123', email='c1@example.com')
+        
+        event = {'headers': auth_headers}
+        summary = json.loads(get_customers_handler(event, None)['body'])['items'][0]
+        assert set(summary) == {'id', 'name', 'location', 'phone', 'totalDebt', 'isActive'}
+        
+        event['queryStringParameters'] = {'fields': 'name,email'}
+        sparse = json.loads(get_customers_handler(event, None)['body'])['items'][0]
+        assert sparse == {'name': 'Customer 1', 'email': 'c1@example.com'}
+    
     def test_get_customer_detail_handler(self, dynamodb_table):
         """Test getting customer detail"""
         customer = create_customer('Test Customer', 'Location', '123')
@@ -154,6 +275,46 @@ class TestCustomerHandlers:
         body = json.loads(response['body'])
         assert body['customer']['id'] == customer['id']
         assert 'recentOrders' in body
+    
+    def test_get_customer_detail_handler_with_history(self, dynamodb_table, auth_headers):
+        """Test that detail includes recent orders and debt adjustments"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        create_debt_adjustment(customer['id'], 4.0, 'Opening balance')
+        
+        response = get_customer_detail_handler({
+            'headers': auth_headers,
+            'pathParameters': {'id': customer['id']}
+        }, None)
+        
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['recentOrders'] == []
+        assert [a['reason'] for a in body['recentDebtAdjustments']] == ['Opening balance']
+    
+    def test_get_customer_ledger_handler(self, dynamodb_table, auth_headers):
+        """Test the ledger endpoint"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        create_debt_adjustment(customer['id'], 4.0, 'Opening balance')
+        
+        response = get_customer_ledger_handler({
+            'headers': auth_headers,
+            'pathParameters': {'id': customer['id']},
+            'queryStringParameters': {'limit': '5'}
+        }, None)
+        
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['items'][0]['type'] == 'DEBT_ADJUSTMENT'
+        assert body['items'][0]['balanceAfter'] == 4.0
+    
+    def test_get_customer_ledger_handler_not_found(self, dynamodb_table, auth_headers):
+        """Test the ledger of an unknown customer"""
+        response = get_customer_ledger_handler({
+            'headers': auth_headers,
+            'pathParameters': {'id': 'nonexistent-id'}
+        }, None)
+        
+        assert response['statusCode'] == 404
 
 
 class TestOrderHandlers:
@@ -184,6 +345,22 @@ class TestOrderHandlers:
         assert body['customerId'] == customer['id']
         assert len(body['items']) == 1
     
+    def test_create_order_handler_unknown_customer(self, dynamodb_table, auth_headers):
+        """Test that ordering for a missing customer returns 404"""
+        product = create_product('Test Product', 10.0, 15.0)
+        
+        event = {
+            'headers': auth_headers,
+            'body': json.dumps({
+                'customerId': 'nonexistent-customer-id',
+                'items': [{'productId': product['id'], 'quantity': 1}]
+            })
+        }
+        
+        response = create_order_handler(event, None)
+        
+        assert response['statusCode'] == 404
+    
     def test_create_order_handler_missing_items(self, dynamodb_table):
         """Test order creation with missing items"""
         customer = create_customer('Test Customer', 'Location', '123')
@@ -200,6 +377,87 @@ class TestOrderHandlers:
         assert response['statusCode'] == 400
 
 
+    def test_get_customer_orders_handler_fields(self, dynamodb_table, auth_headers):
+        """Test that line items are only returned when requested"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        create_order(customer['id'], None, [{'productId': product['id'], 'quantity': 2}])
+        
+        event = {'headers': auth_headers, 'pathParameters': {'id': customer['id']}}
+        summary = json.loads(get_customer_orders_handler(event, None)['body'])['items'][0]
+        assert set(summary) == {'id', 'orderDate', 'totalAmount', 'paidNow', 'debtChange'}
+        
+        event['queryStringParameters'] = {'fields': 'id,items'}
+        detailed = json.loads(get_customer_orders_handler(event, None)['body'])['items'][0]
+        assert detailed['items'][0]['quantity'] == 2
+        
+        event['queryStringParameters'] = {'fields': 'pk'}
+        assert get_customer_orders_handler(event, None)['statusCode'] == 400
+
+
+    def test_get_customer_orders_handler_window_and_cursor(self, dynamodb_table, auth_headers):
+        """Test reading a month of orders page by page"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        for order_date in ('2024-01-15', '2024-02-01', '2024-02-10', '2024-02-20', '2024-03-01'):
+            create_order(customer['id'], order_date, [{'productId': product['id'], 'quantity': 1}])
+        
+        params = {'from': '2024-02-01', 'to': '2024-02-29', 'limit': '2'}
+        event = {'headers': auth_headers, 'pathParameters': {'id': customer['id']}, 'queryStringParameters': params}
+        first = json.loads(get_customer_orders_handler(event, None)['body'])
+        
+        event['queryStringParameters'] = {**params, 'nextToken': first['nextToken']}
+        second = json.loads(get_customer_orders_handler(event, None)['body'])
+        
+        dates = [o['orderDate'][:10] for o in first['items'] + second['items']]
+        assert dates == ['2024-02-20', '2024-02-10', '2024-02-01']
+        assert second['nextToken'] is None
+        
+        # A token only resumes the window it was issued for
+        event['queryStringParameters'] = {'to': '2024-03-31', 'nextToken': first['nextToken']}
+        assert get_customer_orders_handler(event, None)['statusCode'] == 400
+        
+        event['queryStringParameters'] = {'from': 'February'}
+        assert get_customer_orders_handler(event, None)['statusCode'] == 400
+
+
+    def test_import_orders_handler_csv(self, dynamodb_table, auth_headers):
+        """Test importing a CSV upload, base64-encoded as API Gateway sends it"""
+        import base64
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        text = (
+            'orderRef,customerId,productId,quantity\n'
+            f"A,{customer['id']},{product['id']},2\n"
+            f"A,{customer['id']},{product['id']},1\n"
+            f"B,{customer['id']},{product['id']},0\n"
+        )
+        
+        event = {
+            'headers': {**auth_headers, 'content-type': 'text/csv; charset=utf-8'},
+            'body': base64.b64encode(text.encode()).decode(),
+            'isBase64Encoded': True
+        }
+        response = import_orders_handler(event, None)
+        
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['summary'] == {'total': 2, 'created': 1, 'invalid': 1, 'failed': 0}
+        assert [(r['ref'], r['status']) for r in body['results']] == [('A', 'created'), ('B', 'invalid')]
+    
+    def test_import_orders_handler_format(self, dynamodb_table, auth_headers):
+        """Test that the upload format comes from format= or the content type"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        line = json.dumps({'customerId': customer['id'], 'items': [{'productId': product['id'], 'quantity': 1}]})
+        
+        event = {'headers': auth_headers, 'body': line, 'queryStringParameters': {'format': 'jsonl'}}
+        assert import_orders_handler(event, None)['statusCode'] == 200
+        
+        event = {'headers': {**auth_headers, 'content-type': 'application/json'}, 'body': line}
+        assert import_orders_handler(event, None)['statusCode'] == 400
+
+
 class TestDebtHandlers:
     """Tests for debt adjustment Lambda handlers"""
     
@@ -237,4 +495,152 @@ class TestDebtHandlers:
         response = adjust_customer_debt_handler(event, None)
         
         assert response['statusCode'] == 400
+    
+    def test_adjust_customer_debt_handler_returns_new_total(self, dynamodb_table, auth_headers):
+        """Test that newTotalDebt reflects the adjustment"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        create_debt_adjustment(customer['id'], 40.0, 'Opening balance')
+        
+        response = adjust_customer_debt_handler({
+            'headers': auth_headers,
+            'pathParameters': {'id': customer['id']},
+            'body': json.dumps({'amount': -15, 'reason': 'Cash payment'})
+        }, None)
+        
+        assert response['statusCode'] == 201
+        assert json.loads(response['body'])['newTotalDebt'] == 25.0
+    
+    def test_adjust_customer_debt_handler_unknown_customer(self, dynamodb_table, auth_headers):
+        """Test that adjusting a missing customer returns 404"""
+        response = adjust_customer_debt_handler({
+            'headers': auth_headers,
+            'pathParameters': {'id': 'nonexistent-id'},
+            'body': json.dumps({'amount': 10, 'reason': 'Fee'})
+        }, None)
+        
+        assert response['statusCode'] == 404
+
+
 
+class TestSalesReportHandlers:
+    """Tests for the sales rollup consumer and report handlers"""
+    
+    def test_stream_handler_and_report(self, dynamodb_table, auth_headers, monkeypatch):
+        """Test folding stream records in and reading them back"""
+        from src.db.event_feed import local_feed
+        monkeypatch.setattr(local_feed, 'enabled', True)
+        local_feed.clear()
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        create_order(customer['id'], '2024-05-01', [{'productId': product['id'], 'quantity': 2}])
+        
+        local_feed.drain(lambda records: sales_rollup_stream_handler({'Records': records}, None))
+        
+        event = {'headers': auth_headers, 'queryStringParameters': {'from': '2024-05-01', 'to': '2024-05-07'}}
+        body = json.loads(get_sales_report_handler(event, None)['body'])
+        assert body['items'] == [{
+            'day': '2024-05-01', 'orderCount': 1, 'totalAmount': 30.0,
+            'paidNow': 0.0, 'debtChange': 30.0, 'discount': 0.0
+        }]
+        
+        event['queryStringParameters'] = {'day': '2024-05-01'}
+        body = json.loads(get_sales_report_handler(event, None)['body'])
+        assert body['items'][0]['productId'] == product['id']
+        assert body['items'][0]['quantity'] == 2
+    
+    def test_report_rejects_bad_window(self, dynamodb_table, auth_headers):
+        """Test that an invalid window is a 400"""
+        event = {'headers': auth_headers, 'queryStringParameters': {'from': '2024-05-07', 'to': '2024-05-01'}}
+        
+        assert get_sales_report_handler(event, None)['statusCode'] == 400
+
+
+class TestExportHandlers:
+    """Tests for the export handler"""
+    
+    def test_create_export(self, dynamodb_table, auth_headers, tmp_path, monkeypatch):
+        """Test that an export is written and its location returned"""
+        monkeypatch.delenv('EXPORT_BUCKET', raising=False)
+        monkeypatch.setenv('EXPORT_DIR', str(tmp_path))
+        create_product('Test Product', 10.0, 15.0)
+        
+        event = {
+            'headers': auth_headers,
+            'pathParameters': {'dataset': 'products'},
+            'queryStringParameters': {'format': 'JSONL'}
+        }
+        response = create_export_handler(event, None)
+        
+        assert response['statusCode'] == 200
+        body = json.loads(response['body'])
+        assert body['rows'] == 1
+        assert body['format'] == 'jsonl'
+        assert (tmp_path / body['key']).exists()
+    
+    def test_create_export_unknown_dataset(self, dynamodb_table, auth_headers):
+        """Test that an unknown dataset is a 400"""
+        event = {'headers': auth_headers, 'pathParameters': {'dataset': 'orders'}}
+        
+        assert create_export_handler(event, None)['statusCode'] == 400
+
+
+class TestLoginHandler:
+    """Tests for the login Lambda handler"""
+    
+    @pytest.fixture
+    def password_parameter(self, dynamodb_table, monkeypatch):
+        """Store the password in (mocked) SSM and start with an empty cache"""
+        import boto3
+        ssm = boto3.client('ssm', region_name='eu-central-1')
+        ssm.put_parameter(Name=login.PASSWORD_PARAMETER_NAME, Value='first', Type='SecureString')
+        monkeypatch.setattr(login, 'ssm_client', ssm)
+        
+        calls = []
+        real_fetch = login.stored_password_secret.fetch
+        
+        def counting_fetch():
+            calls.append(1)
+            return real_fetch()
+        
+        monkeypatch.setattr(login.stored_password_secret, 'fetch', counting_fetch)
+        monkeypatch.setattr(login.stored_password_secret, '_value', None)
+        monkeypatch.setattr(login.stored_password_secret, '_fetched_at', None)
+        return ssm, calls
+    
+    def test_login_reuses_cached_password(self, password_parameter):
+        """Test that repeat logins do not call SSM"""
+        ssm, calls = password_parameter
+        
+        for _ in range(3):
+            response = login.handler({'body': json.dumps({'password': 'first'})}, None)
+            assert response['statusCode'] == 200
+            assert json.loads(response['body'])['token']
+        
+        assert len(calls) == 1
+    
+    def test_login_picks_up_rotated_password(self, password_parameter, monkeypatch):
+        """Test that a mismatch re-fetches a password rotated since caching"""
+        ssm, calls = password_parameter
+        monkeypatch.setattr(login.stored_password_secret, 'forced_refresh_interval_seconds', 0)
+        login.handler({'body': json.dumps({'password': 'first'})}, None)
+        
+        ssm.put_parameter(Name=login.PASSWORD_PARAMETER_NAME, Value='second', Type='SecureString', Overwrite=True)
+        response = login.handler({'body': json.dumps({'password': 'second'})}, None)
+        
+        assert response['statusCode'] == 200
+        assert len(calls) == 2
+    
+    def test_login_missing_parameter(self, password_parameter):
+        """Test that a missing password parameter is reported as such"""
+        ssm, calls = password_parameter
+        ssm.delete_parameter(Name=login.PASSWORD_PARAMETER_NAME)
+        
+        response = login.handler({'body': json.dumps({'password': 'first'})}, None)
+        
+        assert response['statusCode'] == 500
+        assert json.loads(response['body'])['message'] == 'Password parameter not found in SSM'
+    
+    def test_login_wrong_password(self, password_parameter):
+        """Test that a wrong password is rejected"""
+        response = login.handler({'body': json.dumps({'password': 'wrong'})}, None)
+        assert response['statusCode'] == 401
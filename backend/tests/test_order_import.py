@@ -0,0 +1,194 @@
+import pytest
+from decimal import Decimal
+from src.db import order_import
+from src.db.order_import import import_orders, MAX_IMPORT_ORDERS
+from src.db.event_feed import local_feed
+from src.db.customer_repo import create_customer, get_customer
+from src.db.product_repo import create_product
+from src.db.order_repo import get_customer_orders_list
+
+
+def entry(row, body, ref=None, error=None):
+    return {'row': row, 'ref': ref, 'body': body, 'error': error}
+
+
+@pytest.fixture
+def catalog():
+    """Two customers and a product"""
+    return {
+        'alice': create_customer('Alice', 'Location', '123'),
+        'bob': create_customer('Bob', 'Location', '456'),
+        'cola': create_product('Cola', 2.0, 3.0)
+    }
+
+
+@pytest.fixture
+def transactions(monkeypatch):
+    """Operation lists of the transactions the import writes"""
+    written = []
+    real_write = order_import.transact_write
+
+    def recording_write(operations):
+        written.append(operations)
+        return real_write(operations)
+
+    monkeypatch.setattr(order_import, 'transact_write', recording_write)
+    return written
+
+
+class TestOrderImport:
+    """Tests for bulk order imports"""
+
+    def test_import_creates_orders_and_coalesces_debt(self, dynamodb_table, catalog, transactions):
+        """Test that each customer's debt is updated once with the sum of its orders"""
+        alice, bob, cola = catalog['alice']['id'], catalog['bob']['id'], catalog['cola']['id']
+        report = import_orders([
+            entry(1, {'customerId': alice, 'items': [{'productId': cola, 'quantity': 2}]}, ref='a1'),
+            entry(2, {'customerId': bob, 'items': [{'productId': cola, 'quantity': 1}], 'paidNow': 3}),
+            entry(3, {'customerId': alice, 'items': [{'productId': cola, 'quantity': 4}], 'paidNow': 5})
+        ])
+
+        assert report['summary'] == {'total': 3, 'created': 3, 'invalid': 0, 'failed': 0}
+        assert [r['row'] for r in report['results']] == [1, 2, 3]
+        assert report['results'][0]['ref'] == 'a1'
+        assert all(r['orderId'] for r in report['results'])
+
+        # Three orders and two debt updates in a single transaction
+        assert len(transactions) == 1
+        updates = [op for op in transactions[0] if 'Update' in op]
+        assert len(updates) == 2
+
+        assert get_customer(alice)['totalDebt'] == Decimal('13')  # 6 + 12 - 5
+        assert get_customer(bob)['totalDebt'] == Decimal('0')
+        assert len(get_customer_orders_list(alice)) == 2
+
+    def test_invalid_rows_are_reported_and_not_written(self, dynamodb_table, catalog):
+        """Test that rows failing validation or lookups are reported with their codes"""
+        alice, cola = catalog['alice']['id'], catalog['cola']['id']
+        report = import_orders([
+            entry(1, {'customerId': alice, 'items': [{'productId': cola, 'quantity': 1}]}),
+            entry(2, {'items': [{'productId': cola, 'quantity': 1}]}),
+            entry(3, {'customerId': alice, 'items': [{'productId': cola, 'quantity': -1}]}),
+            entry(4, {'customerId': 'nobody', 'items': [{'productId': cola, 'quantity': 1}]}),
+            entry(5, {'customerId': alice, 'items': [{'productId': 'missing', 'quantity': 1}]}),
+            entry(6, None, error='Invalid JSON')
+        ])
+
+        results = {r['row']: r for r in report['results']}
+        assert results[1]['status'] == 'created'
+        assert results[2]['code'] == 'MISSING_FIELD'
+        assert results[3]['error'] == 'Quantity must be positive'
+        assert results[4]['code'] == 'NOT_FOUND'
+        assert results[5]['error'] == 'Product missing not found'
+        assert results[6]['error'] == 'Invalid JSON'
+        assert report['summary'] == {'total': 6, 'created': 1, 'invalid': 5, 'failed': 0}
+        assert get_customer(alice)['totalDebt'] == Decimal('3')
+
+    def test_malformed_items_are_reported_per_row(self, dynamodb_table, catalog):
+        """Test that items which are not a list of objects only reject their own row"""
+        alice, cola = catalog['alice']['id'], catalog['cola']['id']
+        report = import_orders([
+            entry(1, {'customerId': alice, 'items': [5]}),
+            entry(2, {'customerId': alice, 'items': 'ab'}),
+            entry(3, {'customerId': alice, 'items': [{'productId': cola, 'quantity': 1}]})
+        ])
+
+        results = {r['row']: r for r in report['results']}
+        assert results[1]['error'] == 'Each item must be an object'
+        assert results[2]['error'] == 'items must be an array'
+        assert results[3]['status'] == 'created'
+        assert report['summary'] == {'total': 3, 'created': 1, 'invalid': 2, 'failed': 0}
+
+    def test_products_are_fetched_once(self, dynamodb_table, catalog, monkeypatch):
+        """Test that pricing every order takes one batched product fetch"""
+        batches = []
+        real_fetch = order_import.get_products_by_ids
+
+        def recording_fetch(product_ids):
+            batches.append(list(product_ids))
+            return real_fetch(product_ids)
+
+        monkeypatch.setattr(order_import, 'get_products_by_ids', recording_fetch)
+        water = create_product('Water', 1.0, 1.5)
+        import_orders([
+            entry(row, {
+                'customerId': catalog['alice']['id'],
+                'items': [{'productId': catalog['cola']['id'], 'quantity': 1}, {'productId': water['id'], 'quantity': 1}]
+            })
+            for row in range(1, 21)
+        ])
+
+        assert len(batches) == 1
+
+    def test_large_import_is_split_into_transactions(self, dynamodb_table, catalog, transactions):
+        """Test that no transaction exceeds 100 operations, even for one customer"""
+        alice, bob, cola = catalog['alice']['id'], catalog['bob']['id'], catalog['cola']['id']
+        entries = [
+            entry(row, {'customerId': alice if row % 3 else bob, 'items': [{'productId': cola, 'quantity': 1}]})
+            for row in range(1, 301)
+        ]
+        # moto's in-memory backend is not thread-safe
+        report = import_orders(entries, max_workers=1)
+
+        assert report['summary']['created'] == 300
+        assert all(len(operations) <= 100 for operations in transactions)
+        assert get_customer(alice)['totalDebt'] == Decimal('600')
+        assert get_customer(bob)['totalDebt'] == Decimal('300')
+
+    def test_cancelled_transaction_only_fails_its_group(self, dynamodb_table, catalog, monkeypatch):
+        """Test that a customer deleted after the check fails only that customer's orders"""
+        alice, cola = catalog['alice']['id'], catalog['cola']['id']
+        real_lookup = order_import.get_customers_by_ids
+        monkeypatch.setattr(
+            order_import, 'get_customers_by_ids',
+            lambda ids, fields=None: {**real_lookup(ids, fields), 'ghost': {'id': 'ghost'}}
+        )
+
+        report = import_orders([
+            entry(1, {'customerId': alice, 'items': [{'productId': cola, 'quantity': 1}]}),
+            entry(2, {'customerId': 'ghost', 'items': [{'productId': cola, 'quantity': 1}]})
+        ])
+
+        assert [r['status'] for r in report['results']] == ['created', 'failed']
+        assert report['results'][1]['error'] == 'Customer ghost not found'
+        assert get_customer(alice)['totalDebt'] == Decimal('3')
+
+    def test_uncertain_failure_is_not_retried(self, dynamodb_table, catalog, monkeypatch):
+        """Test that a transaction that may have committed is reported, not written again"""
+        alice, bob, cola = catalog['alice']['id'], catalog['bob']['id'], catalog['cola']['id']
+        real_write = order_import.transact_write
+        calls = []
+
+        def commit_then_time_out(operations):
+            calls.append(operations)
+            real_write(operations)
+            raise TimeoutError('read timeout')
+
+        monkeypatch.setattr(order_import, 'transact_write', commit_then_time_out)
+        report = import_orders([
+            entry(1, {'customerId': alice, 'items': [{'productId': cola, 'quantity': 1}]}),
+            entry(2, {'customerId': bob, 'items': [{'productId': cola, 'quantity': 1}]})
+        ], max_workers=1)
+
+        assert len(calls) == 1
+        assert [r['status'] for r in report['results']] == ['failed', 'failed']
+        assert get_customer(alice)['totalDebt'] == Decimal('3')
+        assert get_customer(bob)['totalDebt'] == Decimal('3')
+
+    def test_created_orders_are_published(self, dynamodb_table, catalog, monkeypatch):
+        """Test that imported orders reach the local stream stand-in"""
+        monkeypatch.setattr(local_feed, 'enabled', True)
+        local_feed.clear()
+        import_orders([
+            entry(1, {'customerId': catalog['alice']['id'], 'items': [{'productId': catalog['cola']['id'], 'quantity': 1}]})
+        ])
+
+        assert local_feed.pending() == 1
+        local_feed.clear()
+
+    def test_rejects_empty_and_oversized_uploads(self, dynamodb_table):
+        """Test the bounds on the number of orders"""
+        with pytest.raises(ValueError):
+            import_orders([])
+        with pytest.raises(ValueError):
+            import_orders([entry(row, {}) for row in range(MAX_IMPORT_ORDERS + 1)])
@@ -1,7 +1,7 @@
 import pytest
-from src.db.order_repo import create_order, get_customer_orders_list
+from src.db.order_repo import create_order, get_order, get_customer_orders_list, get_customer_orders_page
 from src.db.product_repo import create_product
-from src.db.customer_repo import create_customer
+from src.db.customer_repo import create_customer, CustomerNotFoundError
 
 
 class TestOrderRepo:
@@ -37,6 +37,37 @@ class TestOrderRepo:
         assert 'id' in order
         assert 'orderDate' in order
     
+    def test_create_order_prices_lines_in_one_batch(self, dynamodb_table, monkeypatch):
+        """Test that repeated and distinct products are fetched in a single batch"""
+        from src.db import order_repo
+        customer = create_customer('Test Customer', 'Location', '123')
+        cola = create_product('Cola', 2.0, 4.0)
+        water = create_product('Water', 1.0, 2.0, discount_percent=50)
+        
+        batches = []
+        real_fetch = order_repo.get_products_by_ids
+        
+        def recording_fetch(product_ids):
+            batches.append(list(product_ids))
+            return real_fetch(product_ids)
+        
+        monkeypatch.setattr(order_repo, 'get_products_by_ids', recording_fetch)
+        
+        order = create_order(
+            customer_id=customer['id'],
+            order_date=None,
+            items=[
+                {'productId': cola['id'], 'quantity': 2.0},
+                {'productId': water['id'], 'quantity': 3.0},
+                {'productId': cola['id'], 'quantity': 1.0},
+                {'productId': water['id'], 'quantity': 1.0, 'unitPrice': 5.0}
+            ]
+        )
+        
+        assert len(batches) == 1
+        assert [line['unitPrice'] for line in order['items']] == [4, 1, 4, 5]
+        assert order['subtotal'] == 20
+    
     def test_create_order_with_custom_price(self, dynamodb_table):
         """Test creating an order with custom unit price"""
         customer = create_customer('Test Customer', 'Location', '123')
@@ -128,6 +159,22 @@ class TestOrderRepo:
                 ]
             )
     
+    def test_create_order_nonexistent_customer(self, dynamodb_table):
+        """Test that an order for a missing customer is rejected without writing"""
+        product = create_product('Test Product', 10.0, 15.0)
+        
+        with pytest.raises(CustomerNotFoundError):
+            create_order(
+                customer_id='nonexistent-customer-id',
+                order_date=None,
+                items=[{'productId': product['id'], 'quantity': 1.0}]
+            )
+        
+        assert get_customer_orders_list('nonexistent-customer-id') == []
+        assert 'Item' not in dynamodb_table.get_item(
+            Key={'pk': 'CUSTOMER#nonexistent-customer-id', 'sk': 'META'}
+        )
+    
     def test_get_customer_orders_list(self, dynamodb_table):
         """Test getting list of customer orders"""
         customer = create_customer('Test Customer', 'Location', '123')
@@ -149,4 +196,128 @@ class TestOrderRepo:
         
         assert len(orders) == 2
         assert all(o['customerId'] == customer['id'] for o in orders)
+    
+    def test_get_customer_orders_list_projection(self, dynamodb_table):
+        """Test that fields limits the attributes read"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        create_order(
+            customer_id=customer['id'],
+            order_date=None,
+            items=[{'productId': product['id'], 'quantity': 1.0, 'unitPrice': 15.0}]
+        )
+        
+        orders = get_customer_orders_list(customer['id'], fields=['id', 'totalAmount'])
+        
+        assert set(orders[0]) == {'id', 'totalAmount'}
+    
+    def test_get_customer_orders_page_date_window(self, dynamodb_table):
+        """Test that a date window is read as a key range, inclusive at both ends"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        for order_date in ('2024-01-31T23:59:59.999Z', '2024-02-01T00:00:00Z', '2024-02-15T12:00:00Z',
+                           '2024-02-29T23:59:59.999Z', '2024-03-01T00:00:00Z'):
+            create_order(customer['id'], order_date, [{'productId': product['id'], 'quantity': 1}])
+        
+        queries = []
+        dynamodb_table.meta.client.meta.events.register(
+            'provide-client-params.dynamodb.Query', lambda params, **kwargs: queries.append(params)
+        )
+        orders, next_key = get_customer_orders_page(
+            customer['id'], limit=None, date_from='2024-02-01', date_to='2024-02-29'
+        )
+        
+        assert [o['orderDate'][:10] for o in orders] == ['2024-02-29', '2024-02-15', '2024-02-01']
+        assert next_key is None
+        assert 'BETWEEN' in queries[0]['KeyConditionExpression']
+        
+        orders, _ = get_customer_orders_page(customer['id'], date_from='2024-02-15T12:00:00+00:00')
+        assert [o['orderDate'][:10] for o in orders] == ['2024-03-01', '2024-02-29', '2024-02-15']
+    
+    def test_get_customer_orders_page_date_window_legacy_keys(self, dynamodb_table):
+        """Test that orders stored before ULID sort keys are inside a window on their first day"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        for sk in ('ORDER#2024-02-01T00:00:00', 'ORDER#2024-02-01T00:00:00+00:00', 'ORDER#2024-01-31T23:59:59+00:00'):
+            dynamodb_table.put_item(Item={
+                'pk': f"CUSTOMER#{customer['id']}", 'sk': sk, 'entityType': 'ORDER',
+                'id': sk, 'customerId': customer['id']
+            })
+        
+        orders, _ = get_customer_orders_page(customer['id'], limit=None, date_from='2024-02-01', date_to='2024-02-29')
+        
+        assert sorted(o['sk'] for o in orders) == ['ORDER#2024-02-01T00:00:00', 'ORDER#2024-02-01T00:00:00+00:00']
+    
+    def test_get_customer_orders_page_resumes_from_key(self, dynamodb_table):
+        """Test paging through a window with the returned key"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        for day in range(1, 6):
+            create_order(customer['id'], f'2024-01-0{day}', [{'productId': product['id'], 'quantity': 1}])
+        
+        first, next_key = get_customer_orders_page(customer['id'], limit=2, date_to='2024-01-04')
+        second, next_key = get_customer_orders_page(customer['id'], limit=2, start_key=next_key, date_to='2024-01-04')
+        
+        assert [o['orderDate'][:10] for o in first] == ['2024-01-04', '2024-01-03']
+        assert [o['orderDate'][:10] for o in second] == ['2024-01-02', '2024-01-01']
+        assert next_key is None
+    
+    def test_get_customer_orders_page_invalid_window(self, dynamodb_table):
+        """Test that unparseable or reversed windows are rejected"""
+        with pytest.raises(ValueError):
+            get_customer_orders_page('customer-1', date_from='last tuesday')
+        with pytest.raises(ValueError):
+            get_customer_orders_page('customer-1', date_from='2024-02-01', date_to='2024-01-01')
+
 
+    def test_same_order_date_does_not_overwrite(self, dynamodb_table):
+        """Test that two orders with the same orderDate are both kept"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        
+        for _ in range(2):
+            create_order(
+                customer_id=customer['id'],
+                order_date='2024-03-01',
+                items=[{'productId': product['id'], 'quantity': 1.0, 'unitPrice': 15.0}]
+            )
+        
+        assert len(get_customer_orders_list(customer['id'])) == 2
+    
+    def test_get_order(self, dynamodb_table):
+        """Test fetching an order directly by its ID"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        product = create_product('Test Product', 10.0, 15.0)
+        
+        older = create_order(
+            customer_id=customer['id'],
+            order_date='2024-01-15T10:00:00Z',
+            items=[{'productId': product['id'], 'quantity': 1.0, 'unitPrice': 15.0}]
+        )
+        create_order(
+            customer_id=customer['id'],
+            order_date=None,
+            items=[{'productId': product['id'], 'quantity': 2.0, 'unitPrice': 15.0}]
+        )
+        
+        order = get_order(customer['id'], older['id'])
+        
+        assert order['id'] == older['id']
+        assert order['orderDate'] == '2024-01-15T10:00:00+00:00'
+        assert order['sk'].startswith('ORDER#2024-01-15T10:00:00.000Z#')
+        assert get_order('other-customer', older['id']) is None
+    
+    def test_get_legacy_order(self, dynamodb_table):
+        """Test that orders stored with random IDs are still found"""
+        customer = create_customer('Test Customer', 'Location', '123')
+        dynamodb_table.put_item(Item={
+            'pk': f"CUSTOMER#{customer['id']}",
+            'sk': 'ORDER#2023-05-01T08:00:00+00:00',
+            'entityType': 'ORDER',
+            'id': '6f1c3f8e-0b52-4c1f-9a57-2b8f3f4d9e10',
+            'customerId': customer['id']
+        })
+        
+        order = get_order(customer['id'], '6f1c3f8e-0b52-4c1f-9a57-2b8f3f4d9e10')
+        
+        assert order['sk'] == 'ORDER#2023-05-01T08:00:00+00:00'
+        assert get_order(customer['id'], 'missing-id') is None
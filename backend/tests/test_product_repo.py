@@ -1,10 +1,16 @@
 import pytest
+from decimal import Decimal
 from src.db.product_repo import (
     create_product,
     get_product,
+    get_products_by_ids,
     update_product,
     list_products,
-    compute_effective_price
+    list_products_page,
+    compute_effective_price,
+    bulk_upsert_products,
+    apply_price_rule,
+    get_catalog_version
 )
 
 
@@ -49,6 +55,73 @@ class TestProductRepo:
         result = get_product('nonexistent-id')
         assert result is None
     
+    def test_get_products_by_ids(self, dynamodb_table):
+        """Test batch fetching products with duplicates and missing IDs"""
+        cola = create_product('Cola', 2.0, 3.5)
+        water = create_product('Water', 1.0, 2.0)
+        
+        products = get_products_by_ids([cola['id'], water['id'], cola['id'], 'missing-id'])
+        
+        assert set(products) == {cola['id'], water['id']}
+        assert products[water['id']]['name'] == 'Water'
+    
+    def test_get_products_by_ids_chunks_large_requests(self, dynamodb_table):
+        """Test that more than 100 keys are split across BatchGetItem calls"""
+        ids = [create_product(f'Product {i}', 1.0, 2.0)['id'] for i in range(105)]
+        
+        products = get_products_by_ids(ids)
+        
+        assert len(products) == 105
+    
+    def test_get_products_by_ids_retries_unprocessed_keys(self, dynamodb_table, monkeypatch):
+        """Test that UnprocessedKeys are requested again"""
+        from src.db import batch, dynamo_client
+        cola = create_product('Cola', 2.0, 3.5)
+        water = create_product('Water', 1.0, 2.0)
+        real = dynamo_client.get_dynamodb()
+        calls = []
+        
+        class ThrottlingDynamo:
+            def batch_get_item(self, RequestItems):
+                calls.append(RequestItems)
+                response = real.batch_get_item(RequestItems=RequestItems)
+                if len(calls) == 1:
+                    # Pretend the second key was throttled
+                    table_name = list(RequestItems)[0]
+                    keys = RequestItems[table_name]['Keys']
+                    response['Responses'][table_name] = [
+                        item for item in response['Responses'][table_name]
+                        if item['pk'] == keys[0]['pk']
+                    ]
+                    response['UnprocessedKeys'] = {table_name: {'Keys': keys[1:]}}
+                return response
+        
+        monkeypatch.setattr(batch, 'get_dynamodb', lambda: ThrottlingDynamo())
+        monkeypatch.setattr(batch.time, 'sleep', lambda seconds: None)
+        
+        products = get_products_by_ids([cola['id'], water['id']])
+        
+        assert set(products) == {cola['id'], water['id']}
+        assert len(calls) == 2
+    
+    def test_get_products_by_ids_gives_up_without_a_final_sleep(self, dynamodb_table, monkeypatch):
+        """Test that keys left unprocessed on the last attempt fail straight away"""
+        from src.db import batch
+        cola = create_product('Cola', 2.0, 3.5)
+        sleeps = []
+        
+        class ThrottledDynamo:
+            def batch_get_item(self, RequestItems):
+                return {'Responses': {}, 'UnprocessedKeys': RequestItems}
+        
+        monkeypatch.setattr(batch, 'get_dynamodb', lambda: ThrottledDynamo())
+        monkeypatch.setattr(batch.time, 'sleep', sleeps.append)
+        
+        with pytest.raises(RuntimeError):
+            get_products_by_ids([cola['id']])
+        
+        assert len(sleeps) == batch.BATCH_GET_MAX_ATTEMPTS - 1
+    
     def test_update_product(self, dynamodb_table, sample_product):
         """Test updating a product"""
         created = create_product(
@@ -92,6 +165,71 @@ class TestProductRepo:
         assert len(products) == 1
         assert 'Cola' in products[0]['name']
     
+    def test_search_reads_only_the_index(self, dynamodb_table, monkeypatch):
+        """Test that a search does not walk the full product list"""
+        from src.db import product_repo
+        create_product('Coca Cola', 2.0, 3.5)
+        create_product('Cola Zero', 2.0, 3.5)
+        create_product('Water', 1.0, 2.0)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError('search must not list every product')
+        
+        monkeypatch.setattr(product_repo, 'iter_products', fail)
+        
+        products = list_products(search='col')
+        
+        assert [p['name'] for p in products] == ['Coca Cola', 'Cola Zero']
+    
+    def test_search_matches_word_prefixes(self, dynamodb_table):
+        """Test that search matches the start of words, not any substring"""
+        create_product('Coca Cola', 2.0, 3.5)
+        
+        assert [p['name'] for p in list_products(search='cola')] == ['Coca Cola']
+        assert [p['name'] for p in list_products(search='coc')] == ['Coca Cola']
+        assert list_products(search='ola') == []
+    
+    def test_search_lists_each_match_once_across_pages(self, dynamodb_table):
+        """Test that a name with two matching words is not repeated on a later page"""
+        from src.db.product_repo import list_products_page
+        coca = create_product('Coca Cola', 1.0, 2.0)
+        cocoa = create_product('Cocoa', 1.0, 2.0)
+        
+        ids, start_key = [], None
+        for _ in range(4):
+            page, start_key = list_products_page(limit=1, start_key=start_key, search='co')
+            ids += [p['id'] for p in page]
+            if not start_key:
+                break
+        
+        assert sorted(ids) == sorted([coca['id'], cocoa['id']])
+    
+    def test_search_follows_rename(self, dynamodb_table):
+        """Test that renaming a product updates its search entries"""
+        product = create_product('Pepsi', 2.0, 3.5)
+        
+        update_product(product['id'], name='Mirinda Orange')
+        
+        assert list_products(search='pepsi') == []
+        assert [p['id'] for p in list_products(search='orange')] == [product['id']]
+    
+    def test_rebuild_search_index(self, dynamodb_table):
+        """Test indexing products written before the search index existed"""
+        from src.db.product_repo import rebuild_product_search_index
+        dynamodb_table.put_item(Item={
+            'pk': 'PRODUCT#legacy-1',
+            'sk': 'META',
+            'entityType': 'PRODUCT',
+            'id': 'legacy-1',
+            'name': 'Legacy Juice',
+            'isActive': True
+        })
+        assert list_products(search='juice') == []
+        
+        assert rebuild_product_search_index() == 1
+        
+        assert [p['id'] for p in list_products(search='juice')] == ['legacy-1']
+    
     def test_list_products_include_inactive(self, dynamodb_table):
         """Test listing products including inactive ones"""
         create_product('Active Product', 10.0, 15.0, is_active=True)
@@ -101,6 +239,170 @@ class TestProductRepo:
         
         assert len(products) == 2
     
+    def test_list_products_reads_only_active_index(self, dynamodb_table, monkeypatch):
+        """Test that the default listing queries the sparse index, not every product"""
+        from src.db.product_repo import catalog_cache
+        monkeypatch.setattr(catalog_cache, 'ttl_seconds', 0)
+        create_product('Active Product', 10.0, 15.0)
+        for i in range(3):
+            create_product(f'Discontinued {i}', 5.0, 10.0, is_active=False)
+        
+        queries = []
+        dynamodb_table.meta.client.meta.events.register(
+            'provide-client-params.dynamodb.Query', lambda params, **kwargs: queries.append(params)
+        )
+        products = list_products()
+        
+        assert [p['name'] for p in products] == ['Active Product']
+        assert [q['IndexName'] for q in queries] == ['ActiveEntityIndex']
+        
+        queries.clear()
+        assert len(list_products(include_inactive=True)) == 4
+        assert [q['IndexName'] for q in queries] == ['EntityTypeIndex']
+    
+    def test_update_product_maintains_active_index(self, dynamodb_table):
+        """Test that deactivating and reactivating moves a product out of and into the index"""
+        product = create_product('Cola', 2.0, 3.5)
+        
+        def indexed():
+            return dynamodb_table.query(
+                IndexName='ActiveEntityIndex',
+                KeyConditionExpression='activeEntityType = :type',
+                ExpressionAttributeValues={':type': 'PRODUCT'}
+            )['Items']
+        
+        update_product(product['id'], is_active=False)
+        assert indexed() == []
+        assert list_products() == []
+        
+        update_product(product['id'], is_active=True)
+        assert [item['id'] for item in indexed()] == [product['id']]
+        assert [p['id'] for p in list_products()] == [product['id']]
+    
+    def test_backfill_active_products(self, dynamodb_table):
+        """Test adding products written before the active index existed"""
+        from src.db.product_repo import backfill_active_products
+        for product_id, active in (('legacy-1', True), ('legacy-2', False)):
+            dynamodb_table.put_item(Item={
+                'pk': f'PRODUCT#{product_id}',
+                'sk': 'META',
+                'entityType': 'PRODUCT',
+                'id': product_id,
+                'name': f'Legacy {product_id}',
+                'isActive': active
+            })
+        assert list_products() == []
+        
+        assert backfill_active_products() == 1
+        assert backfill_active_products() == 0
+        
+        assert [p['id'] for p in list_products()] == ['legacy-1']
+    
+    def test_list_products_page_resumes_from_key(self, dynamodb_table):
+        """Test paging through products with limit and start key"""
+        for i in range(5):
+            create_product(f'Product {i}', 10.0, 15.0)
+        create_product('Product 2b', 5.0, 10.0, is_active=False)
+        
+        first, next_key = list_products_page(limit=2)
+        assert [p['name'] for p in first] == ['Product 0', 'Product 1']
+        assert next_key is not None
+        
+        second, next_key = list_products_page(limit=2, start_key=next_key)
+        assert [p['name'] for p in second] == ['Product 2', 'Product 3']
+        
+        third, next_key = list_products_page(limit=2, start_key=next_key)
+        assert [p['name'] for p in third] == ['Product 4']
+        assert next_key is None
+    
+    def test_list_products_follows_last_evaluated_key(self, dynamodb_table):
+        """Test that listing reads every DynamoDB page, not just the first"""
+        from src.db import pagination
+        for i in range(5):
+            create_product(f'Product {i}', 10.0, 15.0)
+        
+        products, _ = pagination.take_page(
+            pagination.iter_query(
+                dynamodb_table,
+                ('pk', 'sk', 'entityType', 'name'),
+                page_size=2,
+                IndexName='EntityTypeIndex',
+                KeyConditionExpression='entityType = :entityType',
+                ExpressionAttributeValues={':entityType': 'PRODUCT'}
+            )
+        )
+        
+        assert len(products) == 5
+    
+    def test_catalog_cache_serves_repeat_reads(self, dynamodb_table, monkeypatch):
+        """Test that repeat reads on a warm container skip DynamoDB"""
+        from src.db.product_repo import catalog_cache, catalog_cache_stats
+        product = create_product('Cola', 2.0, 3.5)
+        list_products()
+        get_product(product['id'])
+        
+        def fail(*args, **kwargs):
+            raise AssertionError('expected a cache hit')
+        
+        monkeypatch.setattr(dynamodb_table, 'query', fail)
+        monkeypatch.setattr(dynamodb_table, 'get_item', fail)
+        
+        assert [p['id'] for p in list_products()] == [product['id']]
+        assert get_product(product['id'])['name'] == 'Cola'
+        assert catalog_cache_stats()['hits'] >= 2
+    
+    def test_catalog_cache_copies_are_isolated(self, dynamodb_table):
+        """Test that callers decorating a product do not alter the cache"""
+        product = create_product('Cola', 2.0, 3.5)
+        
+        get_product(product['id'])['effectiveSellingPrice'] = 1.0
+        
+        assert 'effectiveSellingPrice' not in get_product(product['id'])
+    
+    def test_catalog_cache_picks_up_remote_writes(self, dynamodb_table, monkeypatch):
+        """Test that a version bump from another container invalidates after the check interval"""
+        from src.db.product_repo import catalog_cache, CATALOG_VERSION_KEY
+        now = [1000.0]
+        monkeypatch.setattr(catalog_cache, 'clock', lambda: now[0])
+        product = create_product('Cola', 2.0, 3.5)
+        assert get_product(product['id'])['name'] == 'Cola'
+        
+        # Another container renames the product and bumps the version
+        dynamodb_table.update_item(
+            Key={'pk': f"PRODUCT#{product['id']}", 'sk': 'META'},
+            UpdateExpression='SET #name = :name',
+            ExpressionAttributeNames={'#name': 'name'},
+            ExpressionAttributeValues={':name': 'Cola Light'}
+        )
+        dynamodb_table.update_item(
+            Key=CATALOG_VERSION_KEY,
+            UpdateExpression='ADD version :one',
+            ExpressionAttributeValues={':one': 1}
+        )
+        assert get_product(product['id'])['name'] == 'Cola'
+        
+        now[0] += catalog_cache.check_interval_seconds
+        assert get_product(product['id'])['name'] == 'Cola Light'
+        assert catalog_cache.stats()['invalidations'] >= 1
+    
+    def test_catalog_cache_ttl_bounds_staleness(self, dynamodb_table, monkeypatch):
+        """Test that data older than the TTL is reloaded even without a version bump"""
+        from src.db.product_repo import catalog_cache
+        now = [1000.0]
+        monkeypatch.setattr(catalog_cache, 'clock', lambda: now[0])
+        monkeypatch.setattr(catalog_cache, 'check_interval_seconds', 10 ** 6)
+        product = create_product('Cola', 2.0, 3.5)
+        get_product(product['id'])
+        
+        dynamodb_table.update_item(
+            Key={'pk': f"PRODUCT#{product['id']}", 'sk': 'META'},
+            UpdateExpression='SET baseSellingPrice = :price',
+            ExpressionAttributeValues={':price': 4}
+        )
+        
+        now[0] += catalog_cache.ttl_seconds
+        assert get_product(product['id'])['baseSellingPrice'] == 4
+    
     def test_compute_effective_price_no_discount(self):
         """Test computing effective price with no discount"""
         price = compute_effective_price(100.0, None)
@@ -117,3 +419,109 @@ class TestProductRepo:
         price = compute_effective_price(100.0, 25)
         assert price == 75.0
 
+
+class TestBulkProductChanges:
+    """Tests for bulk upserts and price rules (one worker: moto is not thread-safe)"""
+    
+    def test_bulk_upsert_products(self, dynamodb_table):
+        """Test creating, updating and rejecting products in one call"""
+        cola = create_product('Cola', 2.0, 3.0)
+        version = get_catalog_version()
+        
+        report = bulk_upsert_products([
+            {'id': cola['id'], 'name': 'Cola Classic', 'baseSellingPrice': 3.2},
+            {'name': 'Water', 'baseBuyingPrice': 0.5, 'baseSellingPrice': 1.0},
+            {'name': 'Juice'},
+            {'id': 'missing', 'baseSellingPrice': 1},
+            {'id': cola['id'], 'baseSellingPrice': 9},
+            {'id': cola['id'] + 'x', 'discountPercent': 150}
+        ], max_workers=1)
+        
+        statuses = [(r['index'], r['status'], r.get('code')) for r in report['results']]
+        assert statuses == [
+            (0, 'updated', None), (1, 'created', None), (2, 'invalid', 'MISSING_FIELD'),
+            (3, 'invalid', 'NOT_FOUND'), (4, 'invalid', 'INVALID_INPUT'), (5, 'invalid', 'INVALID_INPUT')
+        ]
+        assert report['summary'] == {'total': 6, 'created': 1, 'updated': 1, 'unchanged': 0, 'invalid': 4, 'failed': 0}
+        
+        # One version bump for the whole batch, and the rename is searchable
+        assert get_catalog_version() == version + 1
+        assert get_product(cola['id'])['baseSellingPrice'] == Decimal('3.2')
+        assert [p['name'] for p in list_products(search='classic')] == ['Cola Classic']
+        assert get_product(report['results'][1]['id'])['name'] == 'Water'
+    
+    def test_bulk_writes_do_not_share_the_table_resource(self, dynamodb_table, monkeypatch):
+        """Test that worker threads write through the client, not the Table resource"""
+        import threading
+        from src.db.dynamo_client import get_table
+        cola = create_product('Cola', 2.0, 3.0)
+        table = get_table()
+        real_update_item = table.update_item
+        threads = []
+        
+        def recording_update_item(**params):
+            threads.append(threading.current_thread())
+            return real_update_item(**params)
+        
+        monkeypatch.setattr(table, 'update_item', recording_update_item)
+        bulk_upsert_products([{'id': cola['id'], 'name': 'Cola Classic'}], max_workers=1)
+        apply_price_rule(['baseSellingPrice'], percent=10, product_ids=[cola['id']], max_workers=1)
+        
+        assert threads and all(thread is threading.main_thread() for thread in threads)
+        assert get_product(cola['id'])['baseSellingPrice'] == Decimal('3.3')
+        assert [p['name'] for p in list_products(search='classic')] == ['Cola Classic']
+    
+    def test_apply_price_rule_by_search(self, dynamodb_table):
+        """Test raising the prices of the products matching a search"""
+        cola = create_product('Cola', 2.0, 3.0)
+        zero = create_product('Cola Zero', 2.0, 2.99)
+        water = create_product('Water', 0.5, 1.0)
+        version = get_catalog_version()
+        
+        report = apply_price_rule(['baseSellingPrice', 'baseBuyingPrice'], percent=5, search='cola', max_workers=1)
+        
+        assert report['summary'] == {'total': 2, 'updated': 2, 'preview': 0, 'failed': 0}
+        assert get_product(cola['id'])['baseSellingPrice'] == Decimal('3.15')
+        assert get_product(zero['id'])['baseSellingPrice'] == Decimal('3.14')  # 3.1395 rounded
+        assert get_product(zero['id'])['baseBuyingPrice'] == Decimal('2.1')
+        assert get_product(water['id'])['baseSellingPrice'] == 1
+        assert get_catalog_version() == version + 1
+    
+    def test_apply_price_rule_dry_run_and_negative_prices(self, dynamodb_table):
+        """Test that a dry run writes nothing and prices cannot go negative"""
+        cola = create_product('Cola', 2.0, 3.0)
+        water = create_product('Water', 0.5, 1.0)
+        version = get_catalog_version()
+        
+        report = apply_price_rule(['baseSellingPrice'], amount=-2, product_ids=[cola['id'], water['id']], dry_run=True)
+        
+        results = {r['id']: r for r in report['results']}
+        assert results[cola['id']]['status'] == 'preview'
+        assert results[cola['id']]['prices']['baseSellingPrice']['to'] == 1
+        assert results[water['id']]['error'] == 'baseSellingPrice would become negative'
+        assert get_product(cola['id'])['baseSellingPrice'] == 3
+        assert get_catalog_version() == version
+    
+    def test_apply_price_rule_skips_concurrent_edits(self, dynamodb_table, monkeypatch):
+        """Test that a price changed after it was read is not overwritten"""
+        from src.db import product_repo
+        cola = create_product('Cola', 2.0, 3.0)
+        real_load = product_repo._load_products_by_ids
+        
+        def load_then_edit(product_ids):
+            products = real_load(product_ids)
+            update_product(cola['id'], base_selling_price=4.0)
+            return products
+        
+        monkeypatch.setattr(product_repo, '_load_products_by_ids', load_then_edit)
+        report = apply_price_rule(['baseSellingPrice'], percent=10, product_ids=[cola['id']])
+        
+        assert report['results'][0]['code'] == 'CONFLICT'
+        assert get_product(cola['id'])['baseSellingPrice'] == 4
+    
+    def test_bulk_size_limits(self, dynamodb_table):
+        """Test that empty selections are rejected"""
+        with pytest.raises(ValueError):
+            bulk_upsert_products([])
+        with pytest.raises(ValueError):
+            apply_price_rule(['baseSellingPrice'], percent=5, search='nothing')
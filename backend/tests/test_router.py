@@ -0,0 +1,81 @@
+import pytest
+import json
+from src import router
+from src.db.product_repo import create_product
+
+
+class TestRouter:
+    """Tests for the single-function API router"""
+    
+    def test_dispatch_by_route_key(self, dynamodb_table, auth_headers):
+        """Test that API Gateway's routeKey selects the handler"""
+        product = create_product('Cola', 2.0, 3.5)
+        
+        response = router.handler({
+            'routeKey': 'GET /products/{id}',
+            'pathParameters': {'id': product['id']},
+            'headers': auth_headers
+        }, None)
+        
+        assert response['statusCode'] == 200
+        assert json.loads(response['body'])['id'] == product['id']
+    
+    def test_dispatch_by_path(self, dynamodb_table, auth_headers):
+        """Test matching method and path behind a $default route"""
+        product = create_product('Cola', 2.0, 3.5)
+        
+        response = router.handler({
+            'routeKey': '$default',
+            'rawPath': f"/products/{product['id']}",
+            'requestContext': {'http': {'method': 'GET'}},
+            'headers': auth_headers
+        }, None)
+        
+        assert response['statusCode'] == 200
+        assert json.loads(response['body'])['id'] == product['id']
+    
+    def test_resolve_nested_route(self):
+        """Test path parameters on nested routes"""
+        route_key, params = router.resolve({
+            'rawPath': '/customers/abc/adjust-debt',
+            'requestContext': {'http': {'method': 'POST'}}
+        })
+        
+        assert route_key == 'POST /customers/{id}/adjust-debt'
+        assert params == {'id': 'abc'}
+    
+    def test_unknown_route(self):
+        """Test that unmatched requests return 404"""
+        response = router.handler({
+            'rawPath': '/nope',
+            'requestContext': {'http': {'method': 'GET'}}
+        }, None)
+        
+        assert response['statusCode'] == 404
+    
+    def test_preflight(self):
+        """Test that CORS preflight is answered without loading a handler"""
+        response = router.handler({
+            'rawPath': '/customers/abc/orders',
+            'requestContext': {'http': {'method': 'OPTIONS'}}
+        }, None)
+        
+        assert response['statusCode'] == 200
+        assert 'Access-Control-Allow-Origin' in response['headers']
+    
+    def test_handlers_imported_lazily(self, monkeypatch):
+        """Test that a handler module is imported once, on first use"""
+        imported = []
+        real_import = router.importlib.import_module
+        
+        def recording_import(name):
+            imported.append(name)
+            return real_import(name)
+        
+        monkeypatch.setattr(router, '_handlers', {})
+        monkeypatch.setattr(router.importlib, 'import_module', recording_import)
+        
+        for _ in range(2):
+            router.get_handler('get_products')
+        
+        assert imported == ['src.handlers.get_products']
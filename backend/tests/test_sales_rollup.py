@@ -0,0 +1,153 @@
+import pytest
+from decimal import Decimal
+from src.db import sales_rollup
+from src.db.event_feed import local_feed
+from src.db.sales_rollup import (
+    apply_order,
+    process_records,
+    backfill_sales_rollups,
+    get_daily_sales,
+    get_product_sales,
+    get_day_product_sales
+)
+from src.db.customer_repo import create_customer
+from src.db.product_repo import create_product
+from src.db.order_repo import create_order
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    """The local stand-in for the table stream, enabled and empty"""
+    monkeypatch.setattr(local_feed, 'enabled', True)
+    local_feed.clear()
+    yield local_feed
+    local_feed.clear()
+
+
+@pytest.fixture
+def catalog():
+    """A customer and two products"""
+    return {
+        'customer': create_customer('Test Customer', 'Location', '123'),
+        'cola': create_product('Cola', 2.0, 3.0),
+        'water': create_product('Water', 1.0, 1.5)
+    }
+
+
+class TestSalesRollup:
+    """Tests for the daily sales rollups"""
+    
+    def test_orders_are_rolled_up_from_the_feed(self, dynamodb_table, feed, catalog):
+        """Test per-day and per-product totals built from stream records"""
+        customer_id = catalog['customer']['id']
+        cola, water = catalog['cola']['id'], catalog['water']['id']
+        create_order(customer_id, '2024-05-01T09:00:00Z', [
+            {'productId': cola, 'quantity': 2},
+            {'productId': water, 'quantity': 4},
+            {'productId': cola, 'quantity': 1}
+        ], paid_now=5.0)
+        create_order(customer_id, '2024-05-01T17:30:00Z', [{'productId': cola, 'quantity': 10}])
+        create_order(customer_id, '2024-05-03T08:00:00Z', [{'productId': water, 'quantity': 2}])
+        
+        assert feed.drain(process_records) == 3
+        
+        days = get_daily_sales('2024-05-01', '2024-05-31')
+        assert [d['day'] for d in days] == ['2024-05-01', '2024-05-03']
+        assert days[0]['orderCount'] == 2
+        assert days[0]['totalAmount'] == Decimal('45')
+        assert days[0]['paidNow'] == Decimal('5')
+        
+        by_product = {p['productId']: p for p in get_day_product_sales('2024-05-01')}
+        assert by_product[cola]['quantity'] == 13
+        assert by_product[cola]['orderCount'] == 2
+        assert by_product[cola]['productName'] == 'Cola'
+        assert by_product[water]['revenue'] == Decimal('6')
+        
+        history = get_product_sales(water, '2024-05-01', '2024-05-03')
+        assert [(d['day'], d['quantity']) for d in history] == [('2024-05-01', 4), ('2024-05-03', 2)]
+    
+    def test_redelivered_records_are_counted_once(self, dynamodb_table, feed, catalog):
+        """Test that a replayed stream batch does not double the counters"""
+        create_order(catalog['customer']['id'], '2024-05-01', [{'productId': catalog['cola']['id'], 'quantity': 1}])
+        batches = []
+        feed.drain(batches.append)
+        
+        assert process_records(batches[0]) == {'applied': 1, 'duplicates': 0, 'skipped': 0}
+        assert process_records(batches[0]) == {'applied': 0, 'duplicates': 1, 'skipped': 0}
+        
+        assert get_daily_sales('2024-05-01', '2024-05-01')[0]['orderCount'] == 1
+    
+    def test_other_records_are_skipped(self, dynamodb_table, feed, catalog):
+        """Test that only inserted orders are folded in"""
+        feed.publish('INSERT', catalog['customer'])
+        feed.publish('MODIFY', catalog['cola'], catalog['cola'])
+        
+        counts = []
+        feed.drain(lambda records: counts.append(process_records(records)))
+        
+        assert counts == [{'applied': 0, 'duplicates': 0, 'skipped': 2}]
+    
+    def test_large_order_is_applied_in_chunks(self, dynamodb_table, monkeypatch, catalog):
+        """Test that an order needing several transactions is still counted once"""
+        monkeypatch.setattr(sales_rollup, 'ROLLUP_MAX_UPDATES_PER_TRANSACTION', 2)
+        order = create_order(catalog['customer']['id'], '2024-05-01', [
+            {'productId': catalog['cola']['id'], 'quantity': 1},
+            {'productId': catalog['water']['id'], 'quantity': 1}
+        ])
+        
+        assert apply_order(order) is True
+        assert apply_order(order) is False
+        
+        assert get_daily_sales('2024-05-01', '2024-05-01')[0]['orderCount'] == 1
+        assert len(get_day_product_sales('2024-05-01')) == 2
+    
+    def test_backfill_sales_rollups(self, dynamodb_table, catalog):
+        """Test folding in orders written without a feed"""
+        for day in ('2024-05-01', '2024-05-02'):
+            create_order(catalog['customer']['id'], day, [{'productId': catalog['cola']['id'], 'quantity': 1}])
+        
+        assert backfill_sales_rollups() == 2
+        assert backfill_sales_rollups() == 0
+        assert len(get_daily_sales('2024-05-01', '2024-05-02')) == 2
+    
+    def test_backfill_runs_once(self, dynamodb_table, catalog):
+        """Test that a completed backfill is not repeated after markers expire"""
+        create_order(catalog['customer']['id'], '2024-05-01', [{'productId': catalog['cola']['id'], 'quantity': 1}])
+        assert backfill_sales_rollups() == 1
+        
+        # Expired or not, the markers are no longer what prevents a recount
+        for item in dynamodb_table.scan()['Items']:
+            if item['pk'].startswith('ROLLUP#') and item['sk'].startswith('CHUNK#'):
+                dynamodb_table.delete_item(Key={'pk': item['pk'], 'sk': item['sk']})
+        
+        assert backfill_sales_rollups() == 0
+        assert get_daily_sales('2024-05-01', '2024-05-01')[0]['orderCount'] == 1
+    
+    def test_backfill_refuses_counted_days_with_expired_markers(self, dynamodb_table, catalog):
+        """Test that orders counted longer ago than the marker lifetime block a first backfill"""
+        from datetime import datetime, timedelta, timezone
+        order = create_order(catalog['customer']['id'], '2024-05-01', [{'productId': catalog['cola']['id'], 'quantity': 1}])
+        apply_order(order)
+        dynamodb_table.delete_item(Key={'pk': f"ROLLUP#{order['id']}", 'sk': 'CHUNK#0'})
+        
+        with pytest.raises(RuntimeError):
+            backfill_sales_rollups(now=datetime.now(timezone.utc) + timedelta(days=8))
+        assert get_daily_sales('2024-05-01', '2024-05-01')[0]['orderCount'] == 1
+    
+    def test_backfill_within_marker_lifetime(self, dynamodb_table, catalog):
+        """Test that backdated orders the stream counted recently are skipped by a first backfill"""
+        counted = create_order(catalog['customer']['id'], '2024-05-01', [{'productId': catalog['cola']['id'], 'quantity': 1}])
+        apply_order(counted)
+        create_order(catalog['customer']['id'], '2024-04-30', [{'productId': catalog['cola']['id'], 'quantity': 1}])
+        
+        assert backfill_sales_rollups() == 1
+        assert [day['orderCount'] for day in get_daily_sales('2024-04-30', '2024-05-01')] == [1, 1]
+    
+    def test_report_window_is_validated(self, dynamodb_table):
+        """Test that malformed, reversed and oversized windows are rejected"""
+        with pytest.raises(ValueError):
+            get_daily_sales('May', '2024-05-31')
+        with pytest.raises(ValueError):
+            get_daily_sales('2024-05-31', '2024-05-01')
+        with pytest.raises(ValueError):
+            get_daily_sales('2020-01-01', '2024-01-01')
@@ -0,0 +1,69 @@
+import pytest
+from src.secret_provider import CachedSecret, constant_time_equals
+
+
+class FakeSource:
+    """Secret source that counts fetches"""
+    
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestCachedSecret:
+    """Tests for the TTL-cached secret provider"""
+    
+    def test_serves_from_cache_within_ttl(self):
+        """Test that repeat reads do not fetch again"""
+        now = [0.0]
+        source = FakeSource('s3cret')
+        secret = CachedSecret(source, ttl_seconds=60, clock=lambda: now[0])
+        
+        assert secret.get() == 's3cret'
+        now[0] = 59.0
+        assert secret.get() == 's3cret'
+        assert source.calls == 1
+        
+        now[0] = 60.0
+        source.value = 'rotated'
+        assert secret.get() == 'rotated'
+        assert source.calls == 2
+    
+    def test_refreshes_ahead_in_background(self):
+        """Test that the value is refreshed before it expires"""
+        now = [0.0]
+        source = FakeSource('old')
+        secret = CachedSecret(source, ttl_seconds=60, refresh_ahead_seconds=10, clock=lambda: now[0])
+        secret.get()
+        
+        now[0] = 55.0
+        source.value = 'new'
+        assert secret.get() == 'old'
+        secret.wait_for_refresh(timeout=5)
+        
+        assert secret.get() == 'new'
+        assert source.calls == 2
+    
+    def test_forced_refresh_is_rate_limited(self):
+        """Test that mismatches trigger at most one fetch per interval"""
+        now = [0.0]
+        source = FakeSource('s3cret')
+        secret = CachedSecret(source, ttl_seconds=300, forced_refresh_interval_seconds=30, clock=lambda: now[0])
+        secret.get()
+        
+        assert secret.refresh_after_mismatch() is None
+        now[0] = 30.0
+        source.value = 'rotated'
+        assert secret.refresh_after_mismatch() == 'rotated'
+        assert secret.refresh_after_mismatch() is None
+        assert source.calls == 2
+    
+    def test_constant_time_equals(self):
+        """Test secret comparison"""
+        assert constant_time_equals('abc', 'abc')
+        assert not constant_time_equals('abc', 'abd')
+        assert not constant_time_equals(123, '123')
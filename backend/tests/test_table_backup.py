@@ -0,0 +1,149 @@
+import os
+import pytest
+from src.db import table_backup
+from src.db.dynamo_client import create_raw_client, get_dynamodb
+from src.db.table_backup import export_table, restore_table, read_shard, encode_item, decode_item
+from src.db.customer_repo import create_customer
+from src.db.product_repo import create_product
+from src.db.order_repo import create_order
+
+
+@pytest.fixture
+def populated(dynamodb_table):
+    """Products, customers and orders, plus their index and catalog items"""
+    products = [create_product(f'Product {i}', 1.0, 2.0) for i in range(6)]
+    customers = [create_customer(f'Customer {i}', 'Location', '123') for i in range(4)]
+    for i in range(8):
+        create_order(customers[i % 4]['id'], None, [{'productId': products[i % 6]['id'], 'quantity': 1}])
+    return dynamodb_table
+
+
+def scan_all(table_name):
+    client = create_raw_client()
+    items = []
+    params = {'TableName': table_name}
+    while True:
+        response = client.scan(**params)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return sorted(items, key=lambda item: (item['pk']['S'], item['sk']['S']))
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def create_empty_table(name):
+    return get_dynamodb().create_table(
+        TableName=name,
+        KeySchema=[{'AttributeName': 'pk', 'KeyType': 'HASH'}, {'AttributeName': 'sk', 'KeyType': 'RANGE'}],
+        AttributeDefinitions=[{'AttributeName': 'pk', 'AttributeType': 'S'}, {'AttributeName': 'sk', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+class TestTableBackup:
+    """Tests for table export and restore (one worker: moto is not thread-safe)"""
+
+    def test_export_and_restore_round_trip(self, populated, tmp_path):
+        """Test that a restored table holds exactly the exported items"""
+        manifest = export_table(str(tmp_path), total_segments=4, max_workers=1, page_size=3)
+
+        source = scan_all(populated.name)
+        assert manifest['itemCount'] == len(source)
+        assert manifest['entityTypes']['PRODUCT']['items'] == 6
+        assert manifest['entityTypes']['CUSTOMER']['items'] == 4
+        assert manifest['entityTypes']['ORDER']['items'] == 8
+        assert manifest['entityTypes']['CATALOG']['items'] == 1
+        for shard in manifest['entityTypes']['ORDER']['shards']:
+            assert all(item['entityType'] == {'S': 'ORDER'} for item in read_shard(os.path.join(tmp_path, shard)))
+
+        create_empty_table('restored')
+        restored = restore_table(str(tmp_path), max_workers=1, table_name='restored')
+
+        assert restored == {name: entry['items'] for name, entry in manifest['entityTypes'].items()}
+        assert scan_all('restored') == source
+
+    def test_interrupted_export_resumes(self, populated, tmp_path, monkeypatch):
+        """Test that a rerun continues from the checkpoints without duplicating items"""
+        client = create_raw_client()
+        real_scan = client.scan
+        calls = []
+
+        def failing_scan(**params):
+            # Segment 1 fails on its second page
+            if params['Segment'] == 1 and 'ExclusiveStartKey' in params and not calls:
+                calls.append(params)
+                raise ConnectionError('connection reset')
+            return real_scan(**params)
+
+        monkeypatch.setattr(client, 'scan', failing_scan)
+        monkeypatch.setattr(table_backup, 'create_raw_client', lambda: client)
+        with pytest.raises(ConnectionError):
+            export_table(str(tmp_path), total_segments=2, max_workers=1, page_size=2)
+        assert not os.path.exists(tmp_path / 'manifest.json')
+
+        # Bytes written after the last checkpoint are dropped on resume
+        shard = next((tmp_path / 'data').glob('*/segment-0001.jsonl.gz'))
+        with open(shard, 'ab') as f:
+            f.write(b'partial page')
+
+        monkeypatch.setattr(client, 'scan', real_scan)
+        manifest = export_table(str(tmp_path), total_segments=2, max_workers=1, page_size=2)
+
+        exported = [
+            item
+            for entry in manifest['entityTypes'].values()
+            for path in entry['shards']
+            for item in read_shard(os.path.join(tmp_path, path))
+        ]
+        keys = [(item['pk']['S'], item['sk']['S']) for item in exported]
+        assert len(keys) == len(set(keys)) == len(scan_all(populated.name))
+
+    def test_export_directory_parameters_are_fixed(self, populated, tmp_path):
+        """Test that an export cannot be resumed with another segment count"""
+        export_table(str(tmp_path), total_segments=2, max_workers=1)
+
+        with pytest.raises(ValueError):
+            export_table(str(tmp_path), total_segments=3, max_workers=1)
+
+    def test_restore_selected_types(self, populated, tmp_path):
+        """Test restoring some entity types into another table"""
+        export_table(str(tmp_path), total_segments=2, max_workers=1)
+        create_empty_table('restored')
+
+        restored = restore_table(str(tmp_path), max_workers=1, table_name='restored', entity_types=['PRODUCT', 'CUSTOMER'])
+
+        assert restored == {'PRODUCT': 6, 'CUSTOMER': 4}
+        assert len(scan_all('restored')) == 10
+
+    def test_restore_requires_complete_export(self, dynamodb_table, tmp_path):
+        """Test that an unfinished export is not restored"""
+        with pytest.raises(ValueError):
+            restore_table(str(tmp_path))
+
+    def test_binary_values_round_trip(self):
+        """Test that binary attributes survive JSON encoding"""
+        item = {
+            'pk': {'S': 'X'},
+            'blob': {'B': b'\x00\xff'},
+            'nested': {'M': {'parts': {'L': [{'BS': [b'a', b'b']}, {'N': '1'}]}}}
+        }
+
+        assert decode_item(encode_item(item)) == item
+
+    def test_batch_write_retries_unprocessed_items(self, dynamodb_table, monkeypatch):
+        """Test that unprocessed items are sent again"""
+        client = create_raw_client()
+        real_write = client.batch_write_item
+        requests = []
+
+        def throttled_write(RequestItems):
+            requests.append(RequestItems)
+            if len(requests) == 1:
+                return {'UnprocessedItems': RequestItems}
+            return real_write(RequestItems=RequestItems)
+
+        monkeypatch.setattr(client, 'batch_write_item', throttled_write)
+        monkeypatch.setattr(table_backup.time, 'sleep', lambda seconds: None)
+        table_backup._batch_write(client, dynamodb_table.name, [{'pk': {'S': 'A'}, 'sk': {'S': 'B'}}])
+
+        assert len(requests) == 2
+        assert dynamodb_table.get_item(Key={'pk': 'A', 'sk': 'B'})['Item'] == {'pk': 'A', 'sk': 'B'}
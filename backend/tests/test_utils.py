@@ -1,6 +1,31 @@
 import pytest
 import json
-from src.utils.response import success_response, error_response
+from src.utils.response import (
+    success_response,
+    error_response,
+    conditional_response,
+    etag_matches,
+    negotiate_encoding
+)
+from src.utils.pagination import (
+    encode_next_token,
+    decode_next_token,
+    parse_limit,
+    InvalidPaginationToken,
+    MAX_PAGE_LIMIT
+)
+from src.utils.ulid import new_ulid, is_ulid, ulid_timestamp
+from src.utils.lazy_import import LazyModule, lazy_module
+from src.utils.order_batch import parse_order_batch
+from src.utils.order_validation import validate_order, OrderValidationError
+from src.utils.export_stream import encode_rows, chunked
+from src.db.projection import (
+    parse_fields,
+    stored_fields,
+    projection_params,
+    project,
+    InvalidFieldsError
+)
 
 
 class TestResponseUtils:
@@ -19,6 +44,32 @@ class TestResponseUtils:
         assert parsed_body['message'] == 'Success'
         assert parsed_body['data']['id'] == '123'
     
+    def test_success_response_decimal_number(self):
+        """Test that Decimals are written as JSON numbers by default"""
+        from decimal import Decimal
+        response = success_response(200, {'price': Decimal('12.34'), 'qty': Decimal('3')})
+        
+        assert json.loads(response['body']) == {'price': 12.34, 'qty': 3}
+    
+    def test_success_response_decimal_string(self):
+        """Test that the string mode keeps the exact Decimal text"""
+        from decimal import Decimal
+        response = success_response(200, {'price': Decimal('12.50')}, decimal_encoding='string')
+        
+        assert json.loads(response['body']) == {'price': '12.50'}
+    
+    def test_success_response_rejects_unknown_types(self):
+        """Test that non-JSON types still raise TypeError"""
+        with pytest.raises(TypeError):
+            success_response(200, {'value': object()})
+    
+    def test_response_headers_are_not_shared(self):
+        """Test that modifying one response's headers leaves others intact"""
+        first = success_response(200, {})
+        first['headers']['ETag'] = '"x"'
+        
+        assert 'ETag' not in success_response(200, {})['headers']
+    
     def test_error_response(self):
         """Test creating an error response"""
         response = error_response(400, 'Bad Request', 'INVALID_INPUT')
@@ -38,4 +89,326 @@ class TestResponseUtils:
         parsed_body = json.loads(response['body'])
         assert parsed_body['message'] == 'Internal Server Error'
         assert 'code' not in parsed_body
+    
+    def test_conditional_response_sets_validators(self):
+        """Test that conditional responses carry ETag and Cache-Control"""
+        response = conditional_response({}, {'items': [1]}, 'products')
+        
+        assert response['statusCode'] == 200
+        assert response['headers']['ETag'].startswith('W/"')
+        assert response['headers']['Cache-Control'] == 'private, no-cache'
+        assert json.loads(response['body']) == {'items': [1]}
+    
+    def test_conditional_response_not_modified(self):
+        """Test that a matching If-None-Match yields an empty 304"""
+        etag = conditional_response({}, {'items': [1]}, 'products')['headers']['ETag']
+        
+        response = conditional_response({'headers': {'if-none-match': etag}}, {'items': [1]}, 'products')
+        
+        assert response['statusCode'] == 304
+        assert response['body'] == ''
+        assert response['headers']['ETag'] == etag
+    
+    def test_conditional_response_changed_body(self):
+        """Test that a stale ETag gets the full body"""
+        etag = conditional_response({}, {'items': [1]}, 'products')['headers']['ETag']
+        
+        response = conditional_response({'headers': {'If-None-Match': etag}}, {'items': [2]}, 'products')
+        
+        assert response['statusCode'] == 200
+        assert response['headers']['ETag'] != etag
+    
+    def test_cache_control_override(self, monkeypatch):
+        """Test that a policy can be configured from the environment"""
+        monkeypatch.setenv('CACHE_CONTROL_CUSTOMERS', 'private, max-age=30')
+        
+        response = conditional_response({}, {}, 'customers')
+        
+        assert response['headers']['Cache-Control'] == 'private, max-age=30'
+    
+    @pytest.mark.parametrize('header,expected', [
+        (None, False),
+        ('*', True),
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"xyz", W/"abc"', True),
+        ('"abcd"', False),
+    ])
+    def test_etag_matches(self, header, expected):
+        """Test weak If-None-Match comparison"""
+        assert etag_matches(header, 'W/"abc"') is expected
+    
+    def test_large_body_is_gzipped(self):
+        """Test that a large body is gzip encoded for clients that accept it"""
+        import base64
+        import gzip
+        body = {'items': [{'name': f'Product {i}'} for i in range(200)]}
+        
+        response = success_response(200, body, event={'headers': {'accept-encoding': 'gzip, deflate'}})
+        
+        assert response['isBase64Encoded'] is True
+        assert response['headers']['Content-Encoding'] == 'gzip'
+        assert response['headers']['Vary'] == 'Accept-Encoding'
+        assert json.loads(gzip.decompress(base64.b64decode(response['body']))) == body
+    
+    def test_small_body_is_not_compressed(self):
+        """Test that bodies under the threshold are sent as they are"""
+        response = success_response(200, {'id': '1'}, event={'headers': {'accept-encoding': 'gzip'}})
+        
+        assert 'isBase64Encoded' not in response
+        assert 'Content-Encoding' not in response['headers']
+    
+    def test_no_compression_without_accept_encoding(self):
+        """Test that clients without Accept-Encoding get plain JSON"""
+        body = {'items': [{'name': f'Product {i}'} for i in range(200)]}
+        
+        response = success_response(200, body, event={'headers': {}})
+        
+        assert json.loads(response['body']) == body
+        assert response['headers']['Vary'] == 'Accept-Encoding'
+    
+    @pytest.mark.parametrize('header,expected', [
+        (None, None),
+        ('identity', None),
+        ('gzip', 'gzip'),
+        ('GZIP;q=0.5, identity', 'gzip'),
+        ('gzip;q=0', None),
+        ('*', 'gzip'),
+        ('*, gzip;q=0', None),
+    ])
+    def test_negotiate_encoding(self, header, expected, monkeypatch):
+        """Test Accept-Encoding negotiation with q-values (without brotli)"""
+        from src.utils import response
+        monkeypatch.setattr(response, 'brotli', None)
+        
+        assert negotiate_encoding(header) == expected
+    
+    def test_negotiate_prefers_brotli_when_available(self, monkeypatch):
+        """Test that br wins when the module is installed and accepted"""
+        from src.utils import response
+        monkeypatch.setattr(response, 'brotli', object())
+        
+        assert negotiate_encoding('gzip, br') == 'br'
+        assert negotiate_encoding('gzip, br;q=0') == 'gzip'
+
+
+
+class TestPaginationUtils:
+    """Tests for pagination token helpers"""
+    
+    def test_token_round_trip(self):
+        """Test that a start key survives encoding"""
+        key = {'pk': 'PRODUCT#1', 'sk': 'META', 'entityType': 'PRODUCT', 'name': 'Cola'}
+        token = encode_next_token(key, 'products')
+        
+        assert 'PRODUCT#1' not in token
+        assert decode_next_token(token, 'products') == key
+    
+    def test_empty_key_has_no_token(self):
+        """Test that an exhausted listing yields no token"""
+        assert encode_next_token(None, 'products') is None
+        assert decode_next_token(None, 'products') is None
+    
+    def test_tampered_token_rejected(self):
+        """Test that modifying the payload invalidates the signature"""
+        token = encode_next_token({'pk': 'PRODUCT#1'}, 'products')
+        other = encode_next_token({'pk': 'PRODUCT#2'}, 'products')
+        forged = other.split('.')[0] + '.' + token.split('.')[1]
+        
+        with pytest.raises(InvalidPaginationToken):
+            decode_next_token(forged, 'products')
+        with pytest.raises(InvalidPaginationToken):
+            decode_next_token('garbage', 'products')
+    
+    def test_parse_limit(self):
+        """Test limit parsing and clamping"""
+        assert parse_limit(None, default=None) is None
+        assert parse_limit('10') == 10
+        assert parse_limit('100000') == MAX_PAGE_LIMIT
+        with pytest.raises(InvalidPaginationToken):
+            parse_limit('0')
+        with pytest.raises(InvalidPaginationToken):
+            parse_limit('abc')
 
+
+class TestProjection:
+    """Tests for sparse fieldset helpers"""
+    
+    def test_parse_fields(self):
+        """Test defaults, wildcard, de-duplication and validation"""
+        allowed = ('id', 'name', 'items')
+        assert parse_fields(None, allowed, ('id',)) == ['id']
+        assert parse_fields(' ', allowed, ('id',)) == ['id']
+        assert parse_fields('*', allowed, ('id',)) is None
+        assert parse_fields('name, id,name', allowed, ('id',)) == ['name', 'id']
+        with pytest.raises(InvalidFieldsError):
+            parse_fields('id,pk', allowed, ('id',))
+    
+    def test_stored_fields(self):
+        """Test that computed fields are replaced by their sources"""
+        computed = {'effectivePrice': ('basePrice', 'discount')}
+        assert stored_fields(['id', 'effectivePrice', 'discount'], computed) == ['id', 'basePrice', 'discount']
+        assert stored_fields(None, computed) is None
+    
+    def test_projection_params(self):
+        """Test that every attribute is aliased and required ones are added once"""
+        params = projection_params(['name', 'id'], required=('pk', 'name'))
+        
+        assert params['ProjectionExpression'] == '#p0, #p1, #p2'
+        assert params['ExpressionAttributeNames'] == {'#p0': 'name', '#p1': 'id', '#p2': 'pk'}
+        assert projection_params(None, required=('pk',)) == {}
+    
+    def test_project(self):
+        """Test trimming items to the requested fields"""
+        item = {'pk': 'X', 'id': '1', 'name': 'Cola'}
+        assert project(item, ['id', 'name', 'missing']) == {'id': '1', 'name': 'Cola'}
+        assert project(item, None) is item
+
+
+class TestOrderBatch:
+    """Tests for parsing bulk order uploads"""
+    
+    def test_parse_csv_groups_rows_by_order_ref(self):
+        """Test that rows sharing an orderRef become one order"""
+        text = (
+            'orderRef,customerId,productId,quantity,unitPrice,paidNow\n'
+            'A,c1,p1,2,,10\n'
+            'A,c1,p2,1,4.5,\n'
+            ',c2,p1,3,,\n'
+        )
+        entries = parse_order_batch(text, 'csv')
+        
+        assert [(e['row'], e['ref']) for e in entries] == [(2, 'A'), (4, None)]
+        assert entries[0]['body'] == {
+            'customerId': 'c1',
+            'paidNow': '10',
+            'items': [{'productId': 'p1', 'quantity': '2'}, {'productId': 'p2', 'quantity': '1', 'unitPrice': '4.5'}]
+        }
+        assert entries[1]['body']['customerId'] == 'c2'
+    
+    def test_parse_csv_conflicting_rows(self):
+        """Test that rows of one order disagreeing on the customer are an error"""
+        text = 'orderRef,customerId,productId,quantity\nA,c1,p1,1\nA,c2,p1,1\n'
+        
+        assert parse_order_batch(text, 'csv')[0]['error'] == 'Row 3 disagrees with row 2 on customerId'
+    
+    def test_parse_csv_requires_columns(self):
+        """Test that a header without the required columns is rejected"""
+        with pytest.raises(ValueError):
+            parse_order_batch('customerId,quantity\nc1,1\n', 'csv')
+    
+    def test_parse_jsonl(self):
+        """Test that each line is an order and bad lines are reported"""
+        text = '{"orderRef": "A", "customerId": "c1", "items": []}\n\nnot json\n[1]\n'
+        entries = parse_order_batch(text, 'jsonl')
+        
+        assert entries[0] == {'row': 1, 'ref': 'A', 'body': {'customerId': 'c1', 'items': []}, 'error': None}
+        assert [(e['row'], e['error']) for e in entries[1:]] == [
+            (3, 'Invalid JSON'), (4, 'Each line must be a JSON object')
+        ]
+    
+    def test_unknown_format(self):
+        """Test that only csv and jsonl are accepted"""
+        with pytest.raises(ValueError):
+            parse_order_batch('', 'xml')
+    
+    def test_validate_order(self):
+        """Test that payloads are normalized and rejected with API error codes"""
+        order_input = validate_order({'customerId': 'c1', 'items': [{'productId': 'p1', 'quantity': '2'}], 'paidNow': '5'})
+        assert order_input['items'][0]['quantity'] == 2.0
+        assert order_input['paid_now'] == 5.0
+        
+        with pytest.raises(OrderValidationError) as missing:
+            validate_order({'items': [{'productId': 'p1', 'quantity': 1}]})
+        assert missing.value.code == 'MISSING_FIELD'
+        
+        with pytest.raises(OrderValidationError, match='discount must be a valid number'):
+            validate_order({'customerId': 'c1', 'items': [{'productId': 'p1', 'quantity': 1}], 'discount': 'x'})
+
+
+class TestExportStream:
+    """Tests for incremental export encoding"""
+    
+    def test_csv_rows(self):
+        """Test that CSV lines are quoted and keep Decimal text"""
+        from decimal import Decimal
+        rows = [{'name': 'Cola, 1L', 'price': Decimal('1.50'), 'isActive': True}, {'name': 'Water'}]
+        
+        text = b''.join(encode_rows(iter(rows), ['name', 'price', 'isActive'], 'csv')).decode()
+        
+        assert text == 'name,price,isActive\n"Cola, 1L",1.50,true\nWater,,\n'
+    
+    def test_unknown_format_is_rejected_before_reading(self):
+        """Test that a bad format fails before any row is pulled"""
+        def rows():
+            raise AssertionError('rows were read')
+            yield
+        
+        with pytest.raises(ValueError):
+            encode_rows(rows(), ['name'], 'xlsx')
+    
+    def test_chunked(self):
+        """Test that pieces are regrouped into fixed-size chunks"""
+        assert list(chunked([b'abc', b'defgh', b'', b'ij'], 4)) == [b'abcd', b'efgh', b'ij']
+        assert list(chunked([], 4)) == []
+
+
+class TestUlid:
+    """Tests for ULID helpers"""
+    
+    def test_timestamp_round_trip(self):
+        """Test that the encoded timestamp is recovered to the millisecond"""
+        from datetime import datetime, timezone
+        timestamp = datetime(2024, 1, 15, 10, 0, 0, 123456, tzinfo=timezone.utc)
+        ulid = new_ulid(timestamp)
+        
+        assert is_ulid(ulid)
+        assert ulid_timestamp(ulid) == timestamp.replace(microsecond=123000)
+    
+    def test_ulids_sort_by_time(self):
+        """Test that later IDs sort after earlier ones"""
+        from datetime import datetime
+        assert new_ulid(datetime(2024, 1, 1)) < new_ulid(datetime(2024, 1, 2))
+    
+    def test_rejects_non_ulid(self):
+        """Test that random UUIDs are not mistaken for ULIDs"""
+        assert not is_ulid('6f1c3f8e-0b52-4c1f-9a57-2b8f3f4d9e10')
+        with pytest.raises(ValueError):
+            ulid_timestamp('not-a-ulid')
+
+
+class TestLazyImport:
+    """Tests for deferred module imports"""
+    
+    def test_lazy_module_imports_on_first_access(self):
+        """Test that a lazy module is only imported when used"""
+        module = lazy_module('json', lazy=True)
+        
+        assert isinstance(module, LazyModule)
+        assert not module.loaded
+        assert module.dumps([1]) == '[1]'
+        assert module.loaded
+    
+    def test_eager_mode_returns_module(self):
+        """Test that eager mode returns the module itself"""
+        assert lazy_module('json', lazy=False) is json
+    
+    @pytest.mark.parametrize('lazy,expected', [('1', False), ('0', True)])
+    def test_handler_import_defers_dependencies(self, lazy, expected):
+        """Test that importing a handler skips boto3 and jwt in lazy mode"""
+        import os
+        import subprocess
+        import sys
+        
+        code = (
+            'import sys, src.handlers.login, src.handlers.get_products; '
+            "print('boto3' in sys.modules, 'jwt' in sys.modules)"
+        )
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, LAZY_IMPORTS=lazy, JWT_BACKEND='pyjwt', AWS_DEFAULT_REGION='eu-central-1')
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=backend_dir, env=env, capture_output=True, text=True, check=True
+        )
+        
+        assert result.stdout.split() == [str(expected), str(expected)]
@@ -82,6 +82,7 @@ function CustomersPage() {
         <input
           type="text"
           placeholder="Search customers..."
+          title="Finds names with a word starting with the search text"
           value={searchTerm}
           onChange={handleSearch}
           className="search-input"
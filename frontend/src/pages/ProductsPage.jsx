@@ -95,6 +95,7 @@ function ProductsPage() {
         <input
           type="text"
           placeholder="Search products..."
+          title="Finds names with a word starting with the search text"
           value={searchTerm}
           onChange={handleSearch}
           className="search-input"
@@ -5,6 +5,7 @@ resource "aws_lambda_permission" "api_gw_products" {
     list   = aws_lambda_function.get_products
     get    = aws_lambda_function.get_product
     update = aws_lambda_function.update_product
+    bulk   = aws_lambda_function.bulk_update_products
   }
 
   statement_id  = "AllowExecutionFromAPIGateway"
@@ -19,6 +20,7 @@ resource "aws_lambda_permission" "api_gw_customers" {
     create = aws_lambda_function.create_customer
     list   = aws_lambda_function.get_customers
     detail = aws_lambda_function.get_customer_detail
+    ledger = aws_lambda_function.get_customer_ledger
   }
 
   statement_id  = "AllowExecutionFromAPIGateway"
@@ -31,6 +33,7 @@ resource "aws_lambda_permission" "api_gw_customers" {
 resource "aws_lambda_permission" "api_gw_orders" {
   for_each = {
     create = aws_lambda_function.create_order
+    import = aws_lambda_function.import_orders
     list   = aws_lambda_function.get_customer_orders
   }
 
@@ -41,6 +44,22 @@ resource "aws_lambda_permission" "api_gw_orders" {
   source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
 }
 
+resource "aws_lambda_permission" "api_gw_reports" {
+  statement_id  = "AllowExecutionFromAPIGateway"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.get_sales_report.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
+resource "aws_lambda_permission" "api_gw_exports" {
+  statement_id  = "AllowExecutionFromAPIGateway"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.create_export.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
 resource "aws_lambda_permission" "api_gw_debt" {
   statement_id  = "AllowExecutionFromAPIGateway"
   action        = "lambda:InvokeFunction"
@@ -49,6 +68,14 @@ resource "aws_lambda_permission" "api_gw_debt" {
   source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
 }
 
+resource "aws_lambda_permission" "api_gw_router" {
+  statement_id  = "AllowExecutionFromAPIGateway"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.api_router.function_name
+  principal     = "apigateway.amazonaws.com"
+  source_arn    = "${aws_apigatewayv2_api.main.execution_arn}/*/*"
+}
+
 resource "aws_lambda_permission" "api_gw_login" {
   statement_id  = "AllowExecutionFromAPIGateway"
   action        = "lambda:InvokeFunction"
@@ -58,6 +85,19 @@ resource "aws_lambda_permission" "api_gw_login" {
 }
 
 # API Gateway Integrations
+resource "aws_apigatewayv2_integration" "api_router" {
+  api_id = aws_apigatewayv2_api.main.id
+
+  integration_type       = "AWS_PROXY"
+  integration_uri        = aws_lambda_function.api_router.invoke_arn
+  integration_method     = "POST"
+  payload_format_version = "2.0"
+}
+
+locals {
+  api_router_target = "integrations/${aws_apigatewayv2_integration.api_router.id}"
+}
+
 resource "aws_apigatewayv2_integration" "create_product" {
   api_id = aws_apigatewayv2_api.main.id
 
@@ -90,6 +130,14 @@ resource "aws_apigatewayv2_integration" "update_product" {
   integration_method = "POST"
 }
 
+resource "aws_apigatewayv2_integration" "bulk_update_products" {
+  api_id = aws_apigatewayv2_api.main.id
+
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.bulk_update_products.invoke_arn
+  integration_method = "POST"
+}
+
 resource "aws_apigatewayv2_integration" "create_customer" {
   api_id = aws_apigatewayv2_api.main.id
 
@@ -122,6 +170,14 @@ resource "aws_apigatewayv2_integration" "create_order" {
   integration_method = "POST"
 }
 
+resource "aws_apigatewayv2_integration" "import_orders" {
+  api_id = aws_apigatewayv2_api.main.id
+
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.import_orders.invoke_arn
+  integration_method = "POST"
+}
+
 resource "aws_apigatewayv2_integration" "get_customer_orders" {
   api_id = aws_apigatewayv2_api.main.id
 
@@ -130,6 +186,30 @@ resource "aws_apigatewayv2_integration" "get_customer_orders" {
   integration_method = "POST"
 }
 
+resource "aws_apigatewayv2_integration" "get_customer_ledger" {
+  api_id = aws_apigatewayv2_api.main.id
+
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.get_customer_ledger.invoke_arn
+  integration_method = "POST"
+}
+
+resource "aws_apigatewayv2_integration" "get_sales_report" {
+  api_id = aws_apigatewayv2_api.main.id
+
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.get_sales_report.invoke_arn
+  integration_method = "POST"
+}
+
+resource "aws_apigatewayv2_integration" "create_export" {
+  api_id = aws_apigatewayv2_api.main.id
+
+  integration_type   = "AWS_PROXY"
+  integration_uri    = aws_lambda_function.create_export.invoke_arn
+  integration_method = "POST"
+}
+
 resource "aws_apigatewayv2_integration" "adjust_customer_debt" {
   api_id = aws_apigatewayv2_api.main.id
 
@@ -150,101 +230,134 @@ resource "aws_apigatewayv2_integration" "login" {
 resource "aws_apigatewayv2_route" "create_product" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "POST /products"
-  target    = "integrations/${aws_apigatewayv2_integration.create_product.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.create_product.id}"
 }
 
 resource "aws_apigatewayv2_route" "get_products" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "GET /products"
-  target    = "integrations/${aws_apigatewayv2_integration.get_products.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_products.id}"
 }
 
 resource "aws_apigatewayv2_route" "get_product" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "GET /products/{id}"
-  target    = "integrations/${aws_apigatewayv2_integration.get_product.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_product.id}"
 }
 
 resource "aws_apigatewayv2_route" "update_product" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "PATCH /products/{id}"
-  target    = "integrations/${aws_apigatewayv2_integration.update_product.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.update_product.id}"
+}
+
+resource "aws_apigatewayv2_route" "bulk_update_products" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "POST /products/bulk"
+  # Always its own function: it needs the memory_size the router does not have
+  target    = "integrations/${aws_apigatewayv2_integration.bulk_update_products.id}"
 }
 
 resource "aws_apigatewayv2_route" "create_customer" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "POST /customers"
-  target    = "integrations/${aws_apigatewayv2_integration.create_customer.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.create_customer.id}"
 }
 
 resource "aws_apigatewayv2_route" "get_customers" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "GET /customers"
-  target    = "integrations/${aws_apigatewayv2_integration.get_customers.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_customers.id}"
 }
 
 resource "aws_apigatewayv2_route" "get_customer_detail" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "GET /customers/{id}"
-  target    = "integrations/${aws_apigatewayv2_integration.get_customer_detail.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_customer_detail.id}"
 }
 
 resource "aws_apigatewayv2_route" "create_order" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "POST /orders"
-  target    = "integrations/${aws_apigatewayv2_integration.create_order.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.create_order.id}"
+}
+
+resource "aws_apigatewayv2_route" "import_orders" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "POST /orders/import"
+  # Always its own function: it needs the memory_size the router does not have
+  target    = "integrations/${aws_apigatewayv2_integration.import_orders.id}"
 }
 
 resource "aws_apigatewayv2_route" "get_customer_orders" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "GET /customers/{id}/orders"
-  target    = "integrations/${aws_apigatewayv2_integration.get_customer_orders.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_customer_orders.id}"
+}
+
+resource "aws_apigatewayv2_route" "get_customer_ledger" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /customers/{id}/ledger"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_customer_ledger.id}"
 }
 
 resource "aws_apigatewayv2_route" "adjust_customer_debt" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "POST /customers/{id}/adjust-debt"
-  target    = "integrations/${aws_apigatewayv2_integration.adjust_customer_debt.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.adjust_customer_debt.id}"
+}
+
+resource "aws_apigatewayv2_route" "get_sales_report" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "GET /reports/sales"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_sales_report.id}"
+}
+
+resource "aws_apigatewayv2_route" "create_export" {
+  api_id    = aws_apigatewayv2_api.main.id
+  route_key = "POST /exports/{dataset}"
+  # Always its own function: it needs the memory_size the router does not have
+  target    = "integrations/${aws_apigatewayv2_integration.create_export.id}"
 }
 
 resource "aws_apigatewayv2_route" "login" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "POST /login"
-  target    = "integrations/${aws_apigatewayv2_integration.login.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.login.id}"
 }
 
 # CORS preflight for /login
 resource "aws_apigatewayv2_route" "options_login" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "OPTIONS /login"
-  target    = "integrations/${aws_apigatewayv2_integration.login.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.login.id}"
 }
 
 # CORS preflight for /products
 resource "aws_apigatewayv2_route" "options_products" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "OPTIONS /products"
-  target    = "integrations/${aws_apigatewayv2_integration.get_products.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_products.id}"
 }
 
 # CORS preflight for /customers
 resource "aws_apigatewayv2_route" "options_customers" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "OPTIONS /customers"
-  target    = "integrations/${aws_apigatewayv2_integration.get_customers.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_customers.id}"
 }
 
 # CORS preflight for /orders
 resource "aws_apigatewayv2_route" "options_orders" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "OPTIONS /orders"
-  target    = "integrations/${aws_apigatewayv2_integration.create_order.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.create_order.id}"
 }
 
 # CORS preflight for other routes (catch-all)
 resource "aws_apigatewayv2_route" "options" {
   api_id    = aws_apigatewayv2_api.main.id
   route_key = "OPTIONS /{proxy+}"
-  target    = "integrations/${aws_apigatewayv2_integration.get_products.id}"
+  target    = var.use_api_router ? local.api_router_target : "integrations/${aws_apigatewayv2_integration.get_products.id}"
 }
 
@@ -67,6 +67,25 @@ resource "aws_lambda_function" "update_product" {
   source_code_hash = filebase64sha256("${path.module}/../backend/deploy/update_product.zip")
 }
 
+# Lambda function for bulk product upserts and price rules
+resource "aws_lambda_function" "bulk_update_products" {
+  filename         = "${path.module}/../backend/deploy/bulk_update_products.zip"
+  function_name    = "${var.app_name}-bulk-update-products-${var.environment}"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "src.handlers.bulk_update_products.handler"
+  runtime         = "python3.12"
+  timeout         = 30
+  memory_size     = 512
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.main.name
+    }
+  }
+
+  source_code_hash = filebase64sha256("${path.module}/../backend/deploy/bulk_update_products.zip")
+}
+
 # Lambda functions for customers
 resource "aws_lambda_function" "create_customer" {
   filename         = "${path.module}/../backend/deploy/create_customer.zip"
@@ -137,6 +156,26 @@ resource "aws_lambda_function" "create_order" {
   source_code_hash = filebase64sha256("${path.module}/../backend/deploy/create_order.zip")
 }
 
+# Lambda function for bulk order imports; the extra memory also buys CPU
+# for validating and pricing large uploads
+resource "aws_lambda_function" "import_orders" {
+  filename         = "${path.module}/../backend/deploy/import_orders.zip"
+  function_name    = "${var.app_name}-import-orders-${var.environment}"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "src.handlers.import_orders.handler"
+  runtime         = "python3.12"
+  timeout         = 30
+  memory_size     = 512
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.main.name
+    }
+  }
+
+  source_code_hash = filebase64sha256("${path.module}/../backend/deploy/import_orders.zip")
+}
+
 resource "aws_lambda_function" "get_customer_orders" {
   filename         = "${path.module}/../backend/deploy/get_customer_orders.zip"
   function_name    = "${var.app_name}-get-customer-orders-${var.environment}"
@@ -154,6 +193,23 @@ resource "aws_lambda_function" "get_customer_orders" {
   source_code_hash = filebase64sha256("${path.module}/../backend/deploy/get_customer_orders.zip")
 }
 
+resource "aws_lambda_function" "get_customer_ledger" {
+  filename         = "${path.module}/../backend/deploy/get_customer_ledger.zip"
+  function_name    = "${var.app_name}-get-customer-ledger-${var.environment}"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "src.handlers.get_customer_ledger.handler"
+  runtime         = "python3.12"
+  timeout         = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.main.name
+    }
+  }
+
+  source_code_hash = filebase64sha256("${path.module}/../backend/deploy/get_customer_ledger.zip")
+}
+
 # Lambda function for debt adjustments
 resource "aws_lambda_function" "adjust_customer_debt" {
   filename         = "${path.module}/../backend/deploy/adjust_customer_debt.zip"
@@ -172,6 +228,108 @@ resource "aws_lambda_function" "adjust_customer_debt" {
   source_code_hash = filebase64sha256("${path.module}/../backend/deploy/adjust_customer_debt.zip")
 }
 
+# Lambda function for sales reports
+resource "aws_lambda_function" "get_sales_report" {
+  filename         = "${path.module}/../backend/deploy/get_sales_report.zip"
+  function_name    = "${var.app_name}-get-sales-report-${var.environment}"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "src.handlers.get_sales_report.handler"
+  runtime         = "python3.12"
+  timeout         = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.main.name
+    }
+  }
+
+  source_code_hash = filebase64sha256("${path.module}/../backend/deploy/get_sales_report.zip")
+}
+
+# Lambda function for CSV/JSONL exports; output is streamed to S3 in parts,
+# so memory does not grow with the number of rows
+resource "aws_lambda_function" "create_export" {
+  filename         = "${path.module}/../backend/deploy/create_export.zip"
+  function_name    = "${var.app_name}-create-export-${var.environment}"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "src.handlers.create_export.handler"
+  runtime         = "python3.12"
+  timeout         = 30
+  memory_size     = 512
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.main.name
+      EXPORT_BUCKET       = aws_s3_bucket.exports.id
+    }
+  }
+
+  source_code_hash = filebase64sha256("${path.module}/../backend/deploy/create_export.zip")
+}
+
+# Lambda function folding new orders from the table stream into sales rollups
+resource "aws_lambda_function" "sales_rollup_stream" {
+  filename         = "${path.module}/../backend/deploy/sales_rollup_stream.zip"
+  function_name    = "${var.app_name}-sales-rollup-stream-${var.environment}"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "src.handlers.sales_rollup_stream.handler"
+  runtime         = "python3.12"
+  timeout         = 60
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.main.name
+    }
+  }
+
+  source_code_hash = filebase64sha256("${path.module}/../backend/deploy/sales_rollup_stream.zip")
+}
+
+# Only new orders are delivered to the rollup consumer. A failing batch is
+# split to isolate the bad record, which is retried a few times and then
+# recorded on the failure queue instead of blocking the shard
+resource "aws_lambda_event_source_mapping" "sales_rollup_stream" {
+  event_source_arn  = aws_dynamodb_table.main.stream_arn
+  function_name     = aws_lambda_function.sales_rollup_stream.arn
+  starting_position = "LATEST"
+  batch_size        = 100
+
+  bisect_batch_on_function_error = true
+  maximum_retry_attempts         = 5
+  maximum_record_age_in_seconds  = 3600
+
+  destination_config {
+    on_failure {
+      destination_arn = aws_sqs_queue.sales_rollup_failures.arn
+    }
+  }
+
+  filter_criteria {
+    filter {
+      pattern = jsonencode({
+        eventName = ["INSERT"]
+        dynamodb = {
+          Keys = {
+            sk = { S = [{ prefix = "ORDER#" }] }
+          }
+        }
+      })
+    }
+  }
+}
+
+# Stream batches the rollup consumer gave up on; each message names the
+# shard and sequence numbers of the orders that were not counted
+resource "aws_sqs_queue" "sales_rollup_failures" {
+  name                      = "${var.app_name}-sales-rollup-failures-${var.environment}"
+  message_retention_seconds = 1209600
+
+  tags = {
+    Name        = "${var.app_name}-sales-rollup-failures-${var.environment}"
+    Environment = var.environment
+  }
+}
+
 # Lambda function for login
 resource "aws_lambda_function" "login" {
   filename         = "${path.module}/../backend/deploy/login.zip"
@@ -190,3 +348,25 @@ resource "aws_lambda_function" "login" {
   source_code_hash = filebase64sha256("${path.module}/../backend/deploy/login.zip")
 }
 
+
+# Single function serving the API routes (see src/router.py); API Gateway
+# routes target it when var.use_api_router is set. It keeps the default
+# memory size: the bulk import, bulk product and export routes, which need
+# 512 MB, always target their own functions and are left out of the
+# router's ROUTES
+resource "aws_lambda_function" "api_router" {
+  filename         = "${path.module}/../backend/deploy/router.zip"
+  function_name    = "${var.app_name}-api-router-${var.environment}"
+  role            = aws_iam_role.lambda_role.arn
+  handler         = "src.router.handler"
+  runtime         = "python3.12"
+  timeout         = 30
+
+  environment {
+    variables = {
+      DYNAMODB_TABLE_NAME = aws_dynamodb_table.main.name
+    }
+  }
+
+  source_code_hash = filebase64sha256("${path.module}/../backend/deploy/router.zip")
+}
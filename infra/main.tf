@@ -9,6 +9,10 @@ resource "aws_dynamodb_table" "main" {
   hash_key       = "pk"
   range_key      = "sk"
 
+  # New items feed consumers such as the sales rollups
+  stream_enabled   = true
+  stream_view_type = "NEW_IMAGE"
+
   attribute {
     name = "pk"
     type = "S"
@@ -29,6 +33,11 @@ resource "aws_dynamodb_table" "main" {
     type = "S"
   }
 
+  attribute {
+    name = "activeEntityType"
+    type = "S"
+  }
+
   # Optional GSI for listing products/customers by entityType
   global_secondary_index {
     name            = "EntityTypeIndex"
@@ -37,6 +46,20 @@ resource "aws_dynamodb_table" "main" {
     projection_type = "ALL"
   }
 
+  # Sparse GSI: only active products/customers carry activeEntityType
+  global_secondary_index {
+    name            = "ActiveEntityIndex"
+    hash_key        = "activeEntityType"
+    range_key       = "name"
+    projection_type = "ALL"
+  }
+
+  # Sales rollup markers (ROLLUP#<orderId>) expire on their own
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+
   tags = {
     Name        = "${var.app_name}-${var.environment}"
     Environment = var.environment
@@ -79,6 +102,57 @@ resource "aws_s3_bucket_public_access_block" "product_images" {
   restrict_public_buckets  = true
 }
 
+# S3 Bucket for CSV/JSONL exports, downloaded through presigned URLs
+resource "aws_s3_bucket" "exports" {
+  bucket = "${var.app_name}-exports-${var.environment}"
+
+  tags = {
+    Name        = "${var.app_name}-exports-${var.environment}"
+    Environment = var.environment
+  }
+}
+
+resource "aws_s3_bucket_server_side_encryption_configuration" "exports" {
+  bucket = aws_s3_bucket.exports.id
+
+  rule {
+    apply_server_side_encryption_by_default {
+      sse_algorithm = "AES256"
+    }
+  }
+}
+
+resource "aws_s3_bucket_public_access_block" "exports" {
+  bucket = aws_s3_bucket.exports.id
+
+  block_public_acls       = true
+  block_public_policy     = true
+  ignore_public_acls      = true
+  restrict_public_buckets  = true
+}
+
+# Export files are only fetched right after they are written
+resource "aws_s3_bucket_lifecycle_configuration" "exports" {
+  bucket = aws_s3_bucket.exports.id
+
+  rule {
+    id     = "expire-exports"
+    status = "Enabled"
+
+    filter {
+      prefix = "exports/"
+    }
+
+    expiration {
+      days = 1
+    }
+
+    abort_incomplete_multipart_upload {
+      days_after_initiation = 1
+    }
+  }
+}
+
 # IAM Role for Lambda functions
 resource "aws_iam_role" "lambda_role" {
   name = "${var.app_name}-lambda-role-${var.environment}"
@@ -130,13 +204,32 @@ resource "aws_iam_role_policy" "lambda_policy" {
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
           "dynamodb:Query",
-          "dynamodb:Scan"
+          "dynamodb:Scan",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem"
         ]
         Resource = [
           aws_dynamodb_table.main.arn,
           "${aws_dynamodb_table.main.arn}/index/*"
         ]
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ]
+        Resource = "${aws_dynamodb_table.main.arn}/stream/*"
+      },
+      {
+        Effect = "Allow"
+        Action = [
+          "sqs:SendMessage"
+        ]
+        Resource = aws_sqs_queue.sales_rollup_failures.arn
+      },
       {
         Effect = "Allow"
         Action = [
@@ -153,6 +246,15 @@ resource "aws_iam_role_policy" "lambda_policy" {
         ]
         Resource = aws_s3_bucket.product_images.arn
       },
+      {
+        Effect = "Allow"
+        Action = [
+          "s3:GetObject",
+          "s3:PutObject",
+          "s3:AbortMultipartUpload"
+        ]
+        Resource = "${aws_s3_bucket.exports.arn}/exports/*"
+      },
       {
         Effect = "Allow"
         Action = [
@@ -8,6 +8,16 @@ output "s3_bucket_name" {
   value       = aws_s3_bucket.product_images.id
 }
 
+output "exports_bucket_name" {
+  description = "Name of the S3 bucket for CSV/JSONL exports"
+  value       = aws_s3_bucket.exports.id
+}
+
+output "sales_rollup_failures_queue_url" {
+  description = "URL of the SQS queue recording stream batches the sales rollup consumer gave up on"
+  value       = aws_sqs_queue.sales_rollup_failures.url
+}
+
 output "api_gateway_url" {
   description = "API Gateway HTTP API endpoint URL"
   value       = aws_apigatewayv2_api.main.api_endpoint
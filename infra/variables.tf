@@ -15,3 +15,9 @@ variable "app_name" {
   type        = string
   default     = "distribution-app"
 }
+
+variable "use_api_router" {
+  description = "Route every API request to the single router function instead of one function per route"
+  type        = bool
+  default     = true
+}